@@ -0,0 +1,41 @@
+"""index post, comment and like lookups
+
+Revision ID: 0b6d2e4f8a91
+Revises: f3a9c1d2e8b7
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0b6d2e4f8a91'
+down_revision: Union[str, Sequence[str], None] = 'f3a9c1d2e8b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_posts_author_id', 'posts', ['author_id']),
+    ('ix_posts_created_at_id', 'posts', [sa.text('created_at DESC'), 'id']),
+    ('ix_comments_post_id_created_at', 'comments', ['post_id', 'created_at']),
+    ('ix_comments_author_id', 'comments', ['author_id']),
+    ('ix_likes_post_id', 'likes', ['post_id']),
+    ('ix_users_created_at', 'users', ['created_at']),
+]
+
+
+def upgrade() -> None:
+    # Built without locking writes; a failed CONCURRENTLY build leaves an
+    # INVALID index behind, which must be dropped before re-running.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,47 @@
+"""order pagination indexes by id for uuid7 tiebreaks
+
+Revision ID: 5c8e1f0a7b32
+Revises: 0b6d2e4f8a91
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '5c8e1f0a7b32'
+down_revision: Union[str, Sequence[str], None] = '0b6d2e4f8a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (old index, new index, table, old columns, new columns)
+REPLACEMENTS = [
+    (
+        'ix_posts_created_at_id', 'ix_posts_created_at_id_desc', 'posts',
+        [sa.text('created_at DESC'), 'id'], [sa.text('created_at DESC'), sa.text('id DESC')],
+    ),
+    (
+        'ix_comments_post_id_created_at', 'ix_comments_post_id_created_at_id', 'comments',
+        ['post_id', 'created_at'], ['post_id', 'created_at', 'id'],
+    ),
+]
+
+
+def upgrade() -> None:
+    # Ids are generated as uuid7 from here on; no existing rows change. The
+    # new index is built before the old one is dropped, so pagination always
+    # has one to use.
+    with op.get_context().autocommit_block():
+        for old, new, table, _, columns in REPLACEMENTS:
+            op.create_index(new, table, columns, postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(old, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for old, new, table, columns, _ in reversed(REPLACEMENTS):
+            op.create_index(old, table, columns, postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(new, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,194 @@
+"""optionally partition likes by post and comments by month
+
+Revision ID: 7d4a9e2c1f60
+Revises: 5c8e1f0a7b32
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import context, op
+
+
+revision: str = '7d4a9e2c1f60'
+down_revision: Union[str, Sequence[str], None] = '5c8e1f0a7b32'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The layouts as of this revision, kept here rather than imported from
+# app.core.partitions so later edits there can't change what this does.
+LIKES_REFERENCES = {
+    'uq_user_post_like': 'UNIQUE (user_id, post_id)',
+    'likes_user_id_fkey': 'FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE',
+    'likes_post_id_fkey': 'FOREIGN KEY (post_id) REFERENCES posts (id) ON DELETE CASCADE',
+}
+COMMENTS_REFERENCES = {
+    'comments_post_id_fkey': 'FOREIGN KEY (post_id) REFERENCES posts (id) ON DELETE CASCADE',
+    'comments_author_id_fkey': 'FOREIGN KEY (author_id) REFERENCES users (id) ON DELETE CASCADE',
+}
+LAYOUTS = {
+    'likes': {
+        'partitioned': {
+            'key': ('id', 'post_id'),
+            'constraints': {'likes_pkey': 'PRIMARY KEY (id, post_id)', **LIKES_REFERENCES},
+            'partition_by': 'HASH (post_id)',
+        },
+        'plain': {
+            'key': ('id',),
+            'constraints': {'likes_pkey': 'PRIMARY KEY (id)', **LIKES_REFERENCES},
+            'partition_by': None,
+        },
+        'indexes': {'ix_likes_post_id': '(post_id)'},
+    },
+    'comments': {
+        'partitioned': {
+            'key': ('id', 'created_at'),
+            'constraints': {'comments_pkey': 'PRIMARY KEY (id, created_at)', **COMMENTS_REFERENCES},
+            'partition_by': 'RANGE (created_at)',
+        },
+        'plain': {
+            'key': ('id',),
+            'constraints': {'comments_pkey': 'PRIMARY KEY (id)', **COMMENTS_REFERENCES},
+            'partition_by': None,
+        },
+        'indexes': {
+            'ix_comments_post_id_created_at_id': '(post_id, created_at, id)',
+            'ix_comments_author_id': '(author_id)',
+        },
+    },
+}
+LIKES_HASH_PARTITIONS = 16
+COMMENT_PARTITION_MONTHS_AHEAD = 3
+BATCH_SIZE = 10_000
+
+
+def _requested() -> bool:
+    return context.get_x_argument(as_dictionary=True).get('partition', '').lower() in ('1', 'true', 'yes')
+
+
+def _is_partitioned(conn, table: str) -> bool:
+    return conn.execute(
+        sa.text('SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))'),
+        {'table': table}
+    ).scalar()
+
+
+def _month(day: date, offset: int = 0) -> date:
+    months = day.year * 12 + day.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def _partitions(conn, table: str, new: str) -> list[str]:
+    if table == 'likes':
+        return [
+            f'CREATE TABLE likes_p{i} PARTITION OF {new} '
+            f'FOR VALUES WITH (MODULUS {LIKES_HASH_PARTITIONS}, REMAINDER {i})'
+            for i in range(LIKES_HASH_PARTITIONS)
+        ]
+    today = datetime.now(timezone.utc).date()
+    oldest = conn.execute(sa.text('SELECT min(created_at) FROM comments')).scalar()
+    month, last = _month(oldest.date() if oldest else today), _month(today, COMMENT_PARTITION_MONTHS_AHEAD)
+    statements = []
+    while month <= last:
+        statements.append(
+            f"CREATE TABLE comments_y{month.year}m{month.month:02d} PARTITION OF {new} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_month(month, 1).isoformat()}')"
+        )
+        month = _month(month, 1)
+    statements.append(f'CREATE TABLE comments_default PARTITION OF {new} DEFAULT')
+    return statements
+
+
+def _rebuild(conn, table: str, shape: str) -> None:
+    # Online rebuild: copy, mirror writes with a trigger, backfill in keyset
+    # batches, check counts, then swap under a lock held only for the DDL.
+    layout, indexes, new = LAYOUTS[table][shape], LAYOUTS[table]['indexes'], f'{table}_new'
+
+    if conn.execute(sa.text('SELECT to_regclass(:new)'), {'new': new}).scalar() is None:
+        partition_by = f" PARTITION BY {layout['partition_by']}" if layout['partition_by'] else ''
+        conn.exec_driver_sql(f'CREATE TABLE {new} (LIKE {table} INCLUDING DEFAULTS){partition_by}')
+        for statement in _partitions(conn, table, new) if layout['partition_by'] else []:
+            conn.exec_driver_sql(statement)
+        for name, definition in layout['constraints'].items():
+            conn.exec_driver_sql(f'ALTER TABLE {new} ADD CONSTRAINT {name}_new {definition}')
+        for name, columns in indexes.items():
+            conn.exec_driver_sql(f'CREATE INDEX {name}_new ON {new} {columns}')
+        match = ' AND '.join(f'{column} = OLD.{column}' for column in layout['key'])
+        conn.exec_driver_sql(f"""
+            CREATE FUNCTION {new}_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                    DELETE FROM {new} WHERE {match};
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO {new} SELECT NEW.* ON CONFLICT DO NOTHING;
+                END IF;
+                RETURN NULL;
+            END $$
+        """)
+        conn.exec_driver_sql(
+            f'CREATE TRIGGER {new}_sync AFTER INSERT OR UPDATE OR DELETE ON {table} '
+            f'FOR EACH ROW EXECUTE FUNCTION {new}_sync()'
+        )
+
+    copy_batch = sa.text(f"""
+        WITH batch AS (
+            SELECT * FROM {table} WHERE id > CAST(:last AS uuid) ORDER BY id LIMIT :batch_size FOR SHARE
+        ), copied AS (
+            INSERT INTO {new} SELECT * FROM batch ON CONFLICT DO NOTHING
+        )
+        SELECT (SELECT count(*) FROM batch), (SELECT CAST(id AS text) FROM batch ORDER BY id DESC LIMIT 1)
+    """)
+    last = '00000000-0000-0000-0000-000000000000'
+    while True:
+        count, last_id = conn.execute(copy_batch, {'last': last, 'batch_size': BATCH_SIZE}).one()
+        if count < BATCH_SIZE:
+            break
+        last = last_id
+
+    live, copy = conn.execute(sa.text(f'SELECT (SELECT count(*) FROM {table}), (SELECT count(*) FROM {new})')).one()
+    if live != copy:
+        raise RuntimeError(f'{new} has {copy} rows but {table} has {live}; re-run to resume the backfill')
+
+    renames = [
+        *(f'ALTER TABLE {table} RENAME CONSTRAINT {name}_new TO {name};' for name in layout['constraints']),
+        *(f'ALTER INDEX {name}_new RENAME TO {name};' for name in indexes),
+    ]
+    conn.exec_driver_sql(f"""
+        DO $$
+        BEGIN
+            PERFORM set_config('lock_timeout', '5s', true);
+            LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE;
+            DROP TRIGGER {new}_sync ON {table};
+            DROP FUNCTION {new}_sync();
+            DROP TABLE {table};
+            ALTER TABLE {new} RENAME TO {table};
+            {' '.join(renames)}
+        END $$
+    """)
+
+
+def upgrade() -> None:
+    # Opt in with `alembic -x partition=true upgrade head`. Without it this
+    # revision changes nothing; scripts/partition_tables.py converts the
+    # tables later. Existing rows are backfilled online, batch by batch.
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql' or not _requested():
+        return
+    with op.get_context().autocommit_block():
+        for table in ('likes', 'comments'):
+            if not _is_partitioned(conn, table):
+                _rebuild(conn, table, 'partitioned')
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for table in ('comments', 'likes'):
+            if _is_partitioned(conn, table):
+                _rebuild(conn, table, 'plain')
@@ -0,0 +1,26 @@
+"""add users.token_version
+
+Revision ID: 9b3f6d2a4c18
+Revises: 7d4a9e2c1f60
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '9b3f6d2a4c18'
+down_revision: Union[str, Sequence[str], None] = '7d4a9e2c1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default: Postgres adds the column without rewriting the table.
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,42 @@
+"""index verification token expiry and owner
+
+Revision ID: f3a9c1d2e8b7
+Revises: e7f1a2b3c4d5
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'f3a9c1d2e8b7'
+down_revision: Union[str, Sequence[str], None] = 'e7f1a2b3c4d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The table may already hold millions of abandoned tokens; build the
+    # indexes without blocking registrations.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_email_verification_tokens_expires_at', 'email_verification_tokens', ['expires_at'],
+            postgresql_using='brin', postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_email_verification_tokens_user_id', 'email_verification_tokens', ['user_id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_email_verification_tokens_user_id', table_name='email_verification_tokens',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            'ix_email_verification_tokens_expires_at', table_name='email_verification_tokens',
+            postgresql_concurrently=True, if_exists=True
+        )
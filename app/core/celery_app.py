@@ -1,9 +1,62 @@
 from app.core.config import settings
 from celery import Celery
+from kombu import Exchange, Queue
+
+EMAIL_QUEUE = "email"
+MAINTENANCE_QUEUE = "maintenance"
+EMAIL_TASKS = ("app.tasks.send_email_task", "app.tasks.send_email_batch_task")
 
 celery = Celery(
     "worker",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
     include=["app.tasks"]
-)
\ No newline at end of file
+)
+
+celery.conf.update(
+    # Latency-sensitive email gets its own queue (and worker) so a slow
+    # maintenance job can never sit in front of a verification email.
+    task_queues=tuple(
+        Queue(name, Exchange(name), routing_key=name)
+        for name in (EMAIL_QUEUE, MAINTENANCE_QUEUE)
+    ),
+    task_default_queue=MAINTENANCE_QUEUE,
+    task_routes={name: {"queue": EMAIL_QUEUE} for name in EMAIL_TASKS},
+    # The Redis transport emulates priorities with one list per step; lower is served first.
+    broker_transport_options={
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(10)),
+        "sep": ":",
+    },
+    task_default_priority=5,
+    # Nothing reads task return values; tasks that need one must opt in with
+    # ignore_result=False, and even then results only live for an hour.
+    task_ignore_result=True,
+    result_expires=settings.CELERY_RESULT_EXPIRES,
+    # Maintenance jobs are locked, set-based deletes that are safe to run
+    # twice, so they ack after completion and a crashed worker's job is
+    # redelivered. Sending email is not: redelivery would resend everything
+    # that already went out, so email tasks ack on receipt (a lost
+    # verification email can be resent on request). Either way one worker
+    # doesn't hoard messages another could be running.
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    task_annotations={name: {"acks_late": False} for name in EMAIL_TASKS},
+    worker_prefetch_multiplier=1,
+    # Each job takes a Redis lock (app.core.jobs), so running more than one
+    # beat, or a run that outlasts its interval, can't overlap.
+    beat_schedule={
+        "cleanup-unverified-users": {
+            "task": "app.tasks.cleanup_unverified_users",
+            "schedule": settings.CLEANUP_INTERVAL_SECONDS,
+        },
+        "prune-expired-verification-tokens": {
+            "task": "app.tasks.prune_expired_verification_tokens",
+            "schedule": settings.TOKEN_PRUNE_INTERVAL_SECONDS,
+        },
+        "create-comment-partitions": {
+            "task": "app.tasks.create_comment_partitions",
+            "schedule": settings.COMMENT_PARTITION_INTERVAL_SECONDS,
+        },
+    },
+)
@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from typing import Literal
 from pydantic_settings import BaseSettings
 
 load_dotenv()
@@ -7,15 +8,65 @@ load_dotenv()
 
 class Settings(BaseSettings):
     DATABASE_URL: str
-    
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0
+    # Recycle before server, proxy or load balancer idle timeouts close connections underneath us.
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Set when connecting through pgbouncer in transaction mode; disables prepared statement caching.
+    DB_PGBOUNCER: bool = False
+    # Optional streaming replica for safe reads; clients that just wrote stay on the primary.
+    DATABASE_REPLICA_URL: str | None = None
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    # Per-statement limits for API requests (Postgres only); a cancelled statement returns 504.
+    DB_STATEMENT_TIMEOUT: float = 5.0
+    # Listings and search, where an unlucky filter or deep page can scan far.
+    DB_LIST_STATEMENT_TIMEOUT: float = 2.0
+    DB_ADMIN_STATEMENT_TIMEOUT: float = 60.0
+
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
     VERIFICATION_TOKEN_EXPIRE_HOURS: int = 24
+    # "redis" keeps verification tokens in Redis with a native TTL instead of Postgres.
+    VERIFICATION_TOKEN_STORE: Literal["database", "redis"] = "database"
+    # Bearer token a scraper must send to read /metrics; unset, the endpoint is off.
+    METRICS_TOKEN: str | None = None
     UNVERIFIED_USER_CLEANUP_HOURS: int = 48
+    CLEANUP_BATCH_SIZE: int = 1000
+    # Scheduled runs stop after this many batches and pick up on the next run.
+    CLEANUP_MAX_BATCHES_PER_RUN: int = 50
+    CLEANUP_INTERVAL_SECONDS: float = 3600.0
+    TOKEN_PRUNE_INTERVAL_SECONDS: float = 3600.0
+    # Creates upcoming monthly partitions once comments is partitioned; a no-op otherwise.
+    COMMENT_PARTITION_INTERVAL_SECONDS: float = 86400.0
+    MAINTENANCE_LOCK_TTL: float = 900.0
+
+    PASSWORD_HASH_ROUNDS: int | None = None
+    PASSWORD_HASH_TARGET_MS: int = 250
+    PASSWORD_HASH_MIN_ROUNDS: int = 10
+    PASSWORD_HASH_MAX_ROUNDS: int = 15
+
+    REDIS_URL: str = "redis://redis:6379/0"
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+
+    RATE_LIMIT_DEFAULT: str | None = "300/minute"
+    RATE_LIMIT_SYNC_INTERVAL: float = 1.0
 
     CELERY_BROKER_URL: str = "redis://redis:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://redis:6379/0"
+    CELERY_RESULT_EXPIRES: int = 3600
+
+    # "inprocess" runs tasks on the API's own event loop; no broker or worker needed.
+    TASK_BACKEND: Literal["celery", "inprocess"] = "celery"
+    TASK_QUEUE_SIZE: int = 1000
+    TASK_CONCURRENCY: int = 4
+    TASK_DRAIN_TIMEOUT: float = 30.0
+    # With TASK_BACKEND=inprocess, whether this process runs the periodic jobs.
+    # Run several API replicas? Enable it on exactly one.
+    RUN_SCHEDULE: bool = True
 
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
@@ -23,6 +74,14 @@ class Settings(BaseSettings):
     MAIL_SERVER: str = "smtp.gmail.com"
     MAIL_PORT: int = 587
 
+    SMTP_POOL_SIZE: int = 4
+    SMTP_POOL_IDLE_TIMEOUT: float = 240.0
+    SMTP_POOL_KEEPALIVE_INTERVAL: float = 30.0
+    SMTP_POOL_MAX_MESSAGES: int = 100
+
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 1.0
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -0,0 +1,42 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from app.core.metrics import metrics
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that reports occupancy gauges and checkout wait time to the
+    metrics registry, labelled with the pool's name.
+    """
+
+    metrics_name = "primary"
+
+    def _report(self) -> None:
+        metrics.set("db_pool_size", self.size(), pool=self.metrics_name)
+        metrics.set("db_pool_checked_out", self.checkedout(), pool=self.metrics_name)
+        # QueuePool counts overflow from -pool_size; only connections beyond the pool matter here.
+        metrics.set("db_pool_overflow", max(self.overflow(), 0), pool=self.metrics_name)
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            metrics.inc("db_pool_timeouts_total", pool=self.metrics_name)
+            raise
+        finally:
+            metrics.observe("db_pool_wait_seconds", time.perf_counter() - started, pool=self.metrics_name)
+        self._report()
+        return record
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        super()._do_return_conn(record)
+        self._report()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
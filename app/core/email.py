@@ -1,7 +1,13 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
+from dataclasses import dataclass
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
 from pydantic import EmailStr
 from starlette.background import BackgroundTasks
 from app.core.config import settings
+from app.core.smtp_pool import CONNECTION_ERRORS, get_smtp_pool
 
 conf = ConnectionConfig(
     MAIL_USERNAME=settings.MAIL_USERNAME,
@@ -17,25 +23,74 @@ conf = ConnectionConfig(
 )
 
 
-async def send_verification_email(email: EmailStr, token: str, background_tasks: BackgroundTasks = None):
+def build_verification_message(email: EmailStr, token: str) -> EmailMessage:
     verification_url = f"http://localhost:8000/auth/verify-email?token={token}"
 
-    message = MessageSchema(
-        subject="Verify Your Email",
-        recipients=[email],
-        body=f"""
+    message = EmailMessage()
+    message["Subject"] = "Verify Your Email"
+    message["From"] = conf.MAIL_FROM
+    message["To"] = email
+    message["Date"] = formatdate(localtime=True)
+    message["Message-ID"] = make_msgid()
+    message.set_content(f"""
         <h1>Welcome to Mini Social Network!</h1>
         <p>Please verify your email by clicking the link below:</p>
         <p><a href="{verification_url}">Verify Email</a></p>
         <p>Or copy this link: {verification_url}</p>
         <p>This link will expire in 24 hours.</p>
-        """,
-        subtype=MessageType.html
-    )
+        """, subtype="html")
+    return message
+
 
-    fm = FastMail(conf)
+async def send_verification_email(email: EmailStr, token: str, background_tasks: BackgroundTasks = None):
+    mime_message = build_verification_message(email, token)
+    pool = get_smtp_pool(conf)
 
     if background_tasks:
-        background_tasks.add_task(fm.send_message, message)
+        background_tasks.add_task(pool.send_message, mime_message)
     else:
-        await fm.send_message(message)
\ No newline at end of file
+        await pool.send_message(mime_message)
+
+
+@dataclass
+class EmailJob:
+    email: str
+    token: str
+
+
+@dataclass
+class FailedEmailJob:
+    job: EmailJob
+    error: str
+    retryable: bool
+
+
+async def send_verification_emails(jobs: list[EmailJob]) -> list[FailedEmailJob]:
+    """
+    Sends a batch over a single pooled SMTP session. Failures are reported
+    per recipient instead of aborting the batch; 4xx replies and lost
+    connections are retryable, 5xx replies (e.g. unknown mailbox) are not.
+    """
+    failed = []
+    pending = list(jobs)
+    pool = get_smtp_pool(conf)
+
+    while pending:
+        try:
+            async with pool.connection() as conn:
+                while pending and conn.messages_sent < pool.max_messages:
+                    job = pending[0]
+                    try:
+                        await conn.send_message(build_verification_message(job.email, job.token))
+                    except aiosmtplib.SMTPResponseException as exc:
+                        failed.append(FailedEmailJob(job, f"{exc.code} {exc.message}", exc.code < 500))
+                    except aiosmtplib.SMTPRecipientsRefused as exc:
+                        failed.append(FailedEmailJob(job, str(exc), False))
+                    pending.pop(0)
+        except CONNECTION_ERRORS as exc:
+            # The job in flight may or may not have been accepted; hand it and
+            # the rest of the batch back for a retry on a fresh session.
+            failed.extend(FailedEmailJob(job, str(exc), True) for job in pending)
+            pending = []
+
+    return failed
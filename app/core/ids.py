@@ -0,0 +1,54 @@
+import os
+import threading
+import time
+import uuid
+
+# 42-bit counter split across rand_a (12 bits) and the top of rand_b (30 bits).
+_COUNTER_MAX = (1 << 42) - 1
+
+_last_timestamp_ms = -1
+_last_counter = 0
+# Ids are also generated from threads (sync flushes in the threadpool, the
+# Celery worker thread), so the read-modify-write below is serialized.
+_lock = threading.Lock()
+
+
+def _fresh_counter() -> int:
+    # Top bit clear so the counter has room to increment within a millisecond.
+    return int.from_bytes(os.urandom(6)) & (_COUNTER_MAX >> 1)
+
+
+def uuid7() -> uuid.UUID:
+    """
+    RFC 9562 version 7 UUID: a 48-bit Unix millisecond timestamp followed
+    by random bits. New keys sort after older ones, so inserts append to
+    the right edge of a primary key index instead of landing on random
+    pages. Ids from one process are strictly increasing; within a
+    millisecond a random-seeded counter (method 1 of the RFC) orders them.
+    """
+    global _last_timestamp_ms, _last_counter
+
+    with _lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_timestamp_ms:
+            counter = _fresh_counter()
+        else:
+            # Same millisecond, or the clock stepped back: keep counting from
+            # the last id so ordering holds.
+            timestamp_ms = _last_timestamp_ms
+            counter = _last_counter + 1
+            if counter > _COUNTER_MAX:
+                timestamp_ms += 1
+                counter = _fresh_counter()
+        _last_timestamp_ms, _last_counter = timestamp_ms, counter
+
+    tail = int.from_bytes(os.urandom(4))
+    value = (
+        (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | (counter >> 30) << 64
+        | 0b10 << 62
+        | (counter & 0x3FFF_FFFF) << 32
+        | tail
+    )
+    return uuid.UUID(int=value)
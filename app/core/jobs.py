@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from redis.exceptions import LockError, RedisError
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis import get_redis
+from app.core.task_backend import TaskBackend
+
+logger = logging.getLogger(__name__)
+
+
+# Jobs running in this process, for when the Redis lock is unreachable in
+# in-process mode (where only the process with the schedule runs them).
+_running_locally: set[str] = set()
+
+
+class _LocalLock:
+
+    def __init__(self, name: str):
+        self.name = name
+
+    async def acquire(self) -> bool:
+        if self.name in _running_locally:
+            return False
+        _running_locally.add(self.name)
+        return True
+
+    async def release(self) -> None:
+        _running_locally.discard(self.name)
+
+
+async def _acquire_lock(name: str, lock_ttl: float):
+    lock = get_redis().lock(f"lock:job:{name}", timeout=lock_ttl, blocking=False)
+    try:
+        return lock if await lock.acquire() else None
+    except RedisError:
+        if settings.TASK_BACKEND != "inprocess":
+            logger.warning("Skipping job %s: lock unavailable", name, exc_info=True)
+            return None
+    logger.warning("Redis unavailable, locking job %s in this process only", name)
+    lock = _LocalLock(name)
+    return lock if await lock.acquire() else None
+
+
+def _report(name: str, outcome: str, **fields) -> None:
+    # The registry is only scraped from the API's /metrics, never from Celery
+    # workers, so every run also logs one key=value line at INFO.
+    labels = {"job": name, "outcome": outcome, **fields}
+    logger.info("maintenance_job %s", " ".join(f"{key}={value}" for key, value in labels.items()), extra=labels)
+
+
+async def run_exclusive_job(name: str, job: Callable[[], Awaitable[int]], lock_ttl: float) -> int | None:
+    """
+    Runs a maintenance job unless another worker already holds its lock, so
+    overlapping beat schedules (or several beat instances) never run the same
+    job twice at once. Returns the number of rows the job deleted, or None
+    if it was skipped. The lock expires after lock_ttl in case a worker dies.
+    With TASK_BACKEND=inprocess and Redis unreachable, a process-local lock
+    is used instead, so single-node deployments keep running their jobs.
+    """
+    lock = await _acquire_lock(name, lock_ttl)
+    if lock is None:
+        metrics.inc("maintenance_job_skipped_total", job=name)
+        _report(name, "skipped")
+        return None
+
+    started = time.perf_counter()
+    try:
+        deleted = await job()
+    except Exception:
+        metrics.inc("maintenance_job_failures_total", job=name)
+        _report(name, "failed", duration_seconds=round(time.perf_counter() - started, 3))
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        metrics.observe("maintenance_job_duration_seconds", duration, job=name)
+        try:
+            await lock.release()
+        except (LockError, RedisError):
+            logger.warning("Job %s outlived its lock", name)
+
+    metrics.inc("maintenance_job_rows_deleted_total", deleted, job=name)
+    _report(name, "succeeded", rows_deleted=deleted, duration_seconds=round(duration, 3))
+    return deleted
+
+
+async def run_schedule(backend: TaskBackend, schedule: dict) -> None:
+    """
+    Enqueues Celery beat_schedule entries (fixed intervals only) on the given
+    backend, for deployments that run no beat process. Only one process
+    should run it (see RUN_SCHEDULE).
+    """
+    async def every(name: str, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await backend.enqueue(name)
+            except Exception:
+                logger.exception("Failed to enqueue scheduled task %s", name)
+
+    await asyncio.gather(*(
+        every(entry["task"], float(entry["schedule"])) for entry in schedule.values()
+    ))
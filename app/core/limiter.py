@@ -1,8 +1,240 @@
-from slowapi import Limiter
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
 from slowapi.util import get_remote_address
+
 from app.core.config import settings
+from app.core.redis import get_redis
+from app.core.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class Rate:
+    amount: int
+    period: int
+
+    def __str__(self) -> str:
+        return f"{self.amount} per {self.period} seconds"
+
+
+def parse_rate(value: str) -> Rate:
+    match = re.fullmatch(r"\s*(\d+)\s*(?:/|per)\s*(second|minute|hour|day)s?\s*", value)
+    if not match:
+        raise ValueError(f"Invalid rate limit: {value!r}")
+    return Rate(int(match.group(1)), _PERIODS[match.group(2)])
+
+
+@dataclass
+class TokenBucket:
+    rate: Rate
+    tokens: float
+    updated_at: float
+    # Hits not yet pushed to Redis, by the fixed window they fell in.
+    pending: dict[int, int] = field(default_factory=dict)
+    blocked_until: float = 0.0
+
+    def take(self, now: float, window: int) -> bool:
+        elapsed = now - self.updated_at
+        self.tokens = min(self.rate.amount, self.tokens + elapsed * self.rate.amount / self.rate.period)
+        self.updated_at = now
+        if now < self.blocked_until or self.tokens < 1:
+            return False
+        self.tokens -= 1
+        self.pending[window] = self.pending.get(window, 0) + 1
+        return True
+
+    def drop_expired(self, window: int) -> None:
+        # Counts for a window that has ended can no longer block anyone.
+        for expired in [w for w in self.pending if w < window]:
+            del self.pending[expired]
+
+
+def get_remote_address_key(request: Request) -> str:
+    """
+    Keys by client IP only. Use it for credential endpoints such as login,
+    where a bearer token the caller holds must not buy a fresh limit.
+    """
+    return f"ip:{get_remote_address(request)}"
+
+
+def get_user_or_remote_address(request: Request) -> str:
+    """
+    Keys authenticated requests by user id so users behind a shared NAT
+    don't throttle each other; anonymous requests fall back to the client IP.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        payload = decode_token(token)
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return get_remote_address_key(request)
+
+
+class Limiter:
+    """
+    Two-tier rate limiter. Token buckets in process memory make every
+    decision locally; a background task periodically pushes the hits to
+    Redis fixed-window counters and blocks keys that exceeded the limit
+    cluster-wide. Redis failures only disable the global tier.
+    """
+
+    def __init__(
+        self,
+        key_func: Callable[[Request], str],
+        default_limit: str | None = None,
+        sync_interval: float = 1.0
+    ):
+        self.key_func = key_func
+        self.default_rate = parse_rate(default_limit) if default_limit else None
+        self.sync_interval = sync_interval
+        self.enabled = True
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._sync_task: asyncio.Task | None = None
+
+    def hit(self, scope: str, key: str, rate: Rate, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get((scope, key))
+        if bucket is None or bucket.rate != rate:
+            bucket = self._buckets[(scope, key)] = TokenBucket(rate, rate.amount, now)
+        return bucket.take(now, int(time.time() // rate.period))
+
+    def check(
+        self,
+        request: Request,
+        scope: str,
+        rate: Rate,
+        key_func: Callable[[Request], str] | None = None
+    ) -> None:
+        if not self.enabled:
+            return
+        if not self.hit(scope, (key_func or self.key_func)(request), rate):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded: {rate}",
+                headers={"Retry-After": str(max(1, rate.period // rate.amount))}
+            )
+
+    def limit(self, limit_value: str, key_func: Callable[[Request], str] | None = None):
+        """
+        Limits one endpoint. key_func overrides the limiter's key function
+        for this limit only.
+        """
+        rate = parse_rate(limit_value)
+
+        def decorator(func):
+            scope = f"{func.__module__}.{func.__qualname__}"
+
+            @wraps(func)
+            async def wrapper(*args, request: Request, **kwargs):
+                self.check(request, scope, rate, key_func)
+                return await func(*args, request=request, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    async def sync(self) -> None:
+        """
+        Pushes locally counted hits to Redis and blocks keys whose
+        cluster-wide count for the current window reached the limit.
+        Hits left over from a window that has already ended, e.g. after a
+        Redis outage, are dropped rather than counted against a later one.
+        """
+        now = time.time()
+        monotonic_now = time.monotonic()
+        for bucket in self._buckets.values():
+            bucket.drop_expired(int(now // bucket.rate.period))
+        # Snapshot the counts: hits taken while the pipeline is in flight stay pending.
+        pending = [(k, b, window, count) for k, b in self._buckets.items() for window, count in b.pending.items()]
+
+        try:
+            if not pending:
+                return
+            try:
+                async with get_redis().pipeline(transaction=False) as pipe:
+                    for (scope, key), bucket, window, count in pending:
+                        redis_key = f"ratelimit:{scope}:{key}:{window}"
+                        pipe.incrby(redis_key, count)
+                        pipe.expire(redis_key, bucket.rate.period * 2)
+                    results = await pipe.execute()
+            except Exception:
+                # Fail open: keep serving on local buckets; the hits are retried next sync.
+                logger.warning("Rate limit sync to Redis failed", exc_info=True)
+                return
+
+            for (_, bucket, window, count), total in zip(pending, results[::2]):
+                bucket.pending[window] -= count
+                if not bucket.pending[window]:
+                    del bucket.pending[window]
+                if total >= bucket.rate.amount:
+                    window_end = (window + 1) * bucket.rate.period
+                    bucket.blocked_until = max(bucket.blocked_until, monotonic_now + (window_end - now))
+        finally:
+            # Runs even when the push fails, so an outage can't pile up buckets.
+            idle = [
+                k for k, b in self._buckets.items()
+                if not b.pending and monotonic_now - b.updated_at > b.rate.period
+            ]
+            for k in idle:
+                del self._buckets[k]
+
+    async def _sync_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self.sync()
+
+    def start(self) -> None:
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_forever())
+
+    async def stop(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        await self.sync()
+
+
+class RateLimitMiddleware:
+    """
+    Applies the limiter's default limit to every HTTP request.
+    """
+
+    def __init__(self, app, limiter: Limiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled or self.limiter.default_rate is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            self.limiter.check(Request(scope), "default", self.limiter.default_rate)
+        except HTTPException as exc:
+            response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
 
 limiter = Limiter(
-    key_func=get_remote_address,
-    storage_uri=settings.CELERY_BROKER_URL
-)
\ No newline at end of file
+    key_func=get_user_or_remote_address,
+    default_limit=settings.RATE_LIMIT_DEFAULT,
+    sync_interval=settings.RATE_LIMIT_SYNC_INTERVAL
+)
@@ -0,0 +1,80 @@
+import logging
+import threading
+from collections import defaultdict
+
+logger = logging.getLogger("app.metrics")
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted(labels.items())))
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics: counters, gauges and summaries (count/sum/max).
+    Observations are also logged at DEBUG under "app.metrics" as key=value
+    lines, for processes without an HTTP endpoint such as Celery workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[tuple, float] = defaultdict(float)
+        self._gauges: dict[tuple, float] = {}
+        self._summaries: dict[tuple, list[float]] = {}
+
+    def _log(self, kind: str, name: str, value: float, labels: dict) -> None:
+        if logger.isEnabledFor(logging.DEBUG):
+            rendered = " ".join(f"{k}={v}" for k, v in sorted(labels.items()))
+            logger.debug("%s %s=%s %s", kind, name, value, rendered)
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        with self._lock:
+            self._counters[_key(name, labels)] += value
+        self._log("counter", name, value, labels)
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+        self._log("gauge", name, value, labels)
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            summary = self._summaries.setdefault(_key(name, labels), [0, 0.0, 0.0])
+            summary[0] += 1
+            summary[1] += value
+            summary[2] = max(summary[2], value)
+        self._log("summary", name, value, labels)
+
+    def get(self, name: str, **labels) -> float | None:
+        key = _key(name, labels)
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            if key in self._gauges:
+                return self._gauges[key]
+            if key in self._summaries:
+                return self._summaries[key][1]
+        return None
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format.
+        """
+        def series(name: str, labels: tuple, value: float) -> str:
+            rendered = ",".join(f'{k}="{v}"' for k, v in labels)
+            return f"{name}{{{rendered}}} {value}" if rendered else f"{name} {value}"
+
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(series(name, labels, value))
+            for (name, labels), value in sorted(self._gauges.items()):
+                lines.append(series(name, labels, value))
+            for (name, labels), (count, total, peak) in sorted(self._summaries.items()):
+                lines.append(series(f"{name}_count", labels, count))
+                lines.append(series(f"{name}_sum", labels, total))
+                lines.append(series(f"{name}_max", labels, peak))
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable
+
+from app.core.config import settings
+from app.core.task_backend import TaskBackend, task_backend
+from app.repositories.outbox_repository import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    Moves committed outbox rows to the task backend. Rows for the same task
+    are published as a single task call whose argument is the list of
+    payloads, so a burst of registrations becomes one batch email task.
+
+    Delivery is at-least-once: rows are deleted in the transaction that
+    claimed them, after publishing, so a crash in between republishes them.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        backend: TaskBackend = task_backend,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        poll_interval: float = settings.OUTBOX_POLL_INTERVAL
+    ):
+        self.session_factory = session_factory
+        self.backend = backend
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+    async def relay_once(self) -> int:
+        async with self.session_factory() as session:
+            async with session.begin():
+                repo = OutboxRepository(session)
+                messages = await repo.claim_batch(self.batch_size)
+                if not messages:
+                    return 0
+
+                grouped: dict[str, list[dict]] = defaultdict(list)
+                for message in messages:
+                    grouped[message.task].append(message.payload)
+                for task, payloads in grouped.items():
+                    await self.backend.enqueue(task, payloads)
+
+                await repo.delete([message.id for message in messages])
+        return len(messages)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                relayed = await self.relay_once()
+            except Exception:
+                logger.exception("Outbox relay iteration failed")
+                relayed = 0
+            # A full batch means there is probably more waiting; don't sleep.
+            if relayed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+
+async def main() -> None:
+    import app.tasks  # noqa: F401 - registers tasks for the in-process backend
+    from app.database import AsyncSessionLocal, engine
+
+    logging.basicConfig(level=logging.INFO)
+    await task_backend.start()
+    try:
+        await OutboxRelay(AsyncSessionLocal).run()
+    finally:
+        await task_backend.drain()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
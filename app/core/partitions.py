@@ -0,0 +1,285 @@
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+LIKES_HASH_PARTITIONS = 16
+COMMENT_PARTITION_MONTHS_AHEAD = 3
+
+
+def _month(day: date, offset: int = 0) -> date:
+    months = day.year * 12 + day.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def comment_partition_ddl(month: date, parent: str = "comments") -> str:
+    month = _month(month)
+    return (
+        f"CREATE TABLE IF NOT EXISTS comments_y{month.year}m{month.month:02d} PARTITION OF {parent} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_month(month, 1).isoformat()}')"
+    )
+
+
+def _likes_partitions(conn: Connection, parent: str) -> list[str]:
+    return [
+        f"CREATE TABLE likes_p{i} PARTITION OF {parent} "
+        f"FOR VALUES WITH (MODULUS {LIKES_HASH_PARTITIONS}, REMAINDER {i})"
+        for i in range(LIKES_HASH_PARTITIONS)
+    ]
+
+
+def _comments_partitions(conn: Connection, parent: str) -> list[str]:
+    # One partition per month from the oldest comment through a few months
+    # ahead; the default partition only catches what the scheduled job
+    # didn't create a partition for in time.
+    today = datetime.now(timezone.utc).date()
+    oldest = conn.execute(text("SELECT min(created_at) FROM comments")).scalar()
+    month = _month(oldest.date() if oldest else today)
+    last = _month(today, COMMENT_PARTITION_MONTHS_AHEAD)
+    statements = []
+    while month <= last:
+        statements.append(comment_partition_ddl(month, parent))
+        month = _month(month, 1)
+    statements.append(f"CREATE TABLE comments_default PARTITION OF {parent} DEFAULT")
+    return statements
+
+
+@dataclass(frozen=True)
+class TableLayout:
+    """
+    The physical layout rebuild_table converts a table to. Postgres requires
+    the partition key in every unique constraint, so `key` (the columns
+    identifying a row) includes it. Constraint and index names are the
+    final ones.
+    """
+    table: str
+    key: tuple[str, ...]
+    constraints: dict[str, str]
+    indexes: dict[str, str]
+    partition_by: str | None = None
+    partitions: Callable[[Connection, str], list[str]] | None = None
+
+
+_LIKES_REFERENCES = {
+    "uq_user_post_like": "UNIQUE (user_id, post_id)",
+    "likes_user_id_fkey": "FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE",
+    "likes_post_id_fkey": "FOREIGN KEY (post_id) REFERENCES posts (id) ON DELETE CASCADE",
+}
+_COMMENTS_REFERENCES = {
+    "comments_post_id_fkey": "FOREIGN KEY (post_id) REFERENCES posts (id) ON DELETE CASCADE",
+    "comments_author_id_fkey": "FOREIGN KEY (author_id) REFERENCES users (id) ON DELETE CASCADE",
+}
+_LIKES_INDEXES = {"ix_likes_post_id": "(post_id)"}
+_COMMENTS_INDEXES = {
+    "ix_comments_post_id_created_at_id": "(post_id, created_at, id)",
+    "ix_comments_author_id": "(author_id)",
+}
+
+# Hash partitions spread likes evenly, and every like query filters on post_id.
+LIKES_PARTITIONED = TableLayout(
+    table="likes",
+    key=("id", "post_id"),
+    constraints={"likes_pkey": "PRIMARY KEY (id, post_id)", **_LIKES_REFERENCES},
+    indexes=_LIKES_INDEXES,
+    partition_by="HASH (post_id)",
+    partitions=_likes_partitions,
+)
+# Monthly partitions: recent months stay hot in cache and old ones are
+# vacuumed rarely, since comments are never updated.
+COMMENTS_PARTITIONED = TableLayout(
+    table="comments",
+    key=("id", "created_at"),
+    constraints={"comments_pkey": "PRIMARY KEY (id, created_at)", **_COMMENTS_REFERENCES},
+    indexes=_COMMENTS_INDEXES,
+    partition_by="RANGE (created_at)",
+    partitions=_comments_partitions,
+)
+LIKES_PLAIN = TableLayout(
+    table="likes",
+    key=("id",),
+    constraints={"likes_pkey": "PRIMARY KEY (id)", **_LIKES_REFERENCES},
+    indexes=_LIKES_INDEXES,
+)
+COMMENTS_PLAIN = TableLayout(
+    table="comments",
+    key=("id",),
+    constraints={"comments_pkey": "PRIMARY KEY (id)", **_COMMENTS_REFERENCES},
+    indexes=_COMMENTS_INDEXES,
+)
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    return conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table}
+    ).scalar()
+
+
+def _build_copy(conn: Connection, layout: TableLayout, new: str) -> None:
+    partition_by = f" PARTITION BY {layout.partition_by}" if layout.partition_by else ""
+    conn.exec_driver_sql(f"CREATE TABLE {new} (LIKE {layout.table} INCLUDING DEFAULTS){partition_by}")
+    for statement in layout.partitions(conn, new) if layout.partitions else []:
+        conn.exec_driver_sql(statement)
+    for name, definition in layout.constraints.items():
+        conn.exec_driver_sql(f"ALTER TABLE {new} ADD CONSTRAINT {name}_new {definition}")
+    for name, columns in layout.indexes.items():
+        conn.exec_driver_sql(f"CREATE INDEX {name}_new ON {new} {columns}")
+
+    # Mirror writes made during the backfill. Rows are matched on the full
+    # key so deletes prune to one partition.
+    match = " AND ".join(f"{column} = OLD.{column}" for column in layout.key)
+    conn.exec_driver_sql(f"""
+        CREATE FUNCTION {new}_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                DELETE FROM {new} WHERE {match};
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {new} SELECT NEW.* ON CONFLICT DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END $$
+    """)
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER {new}_sync AFTER INSERT OR UPDATE OR DELETE ON {layout.table} "
+        f"FOR EACH ROW EXECUTE FUNCTION {new}_sync()"
+    )
+
+
+def _backfill(conn: Connection, table: str, new: str, batch_size: int, on_progress) -> int:
+    # Keyset batches, each its own transaction. FOR SHARE makes a concurrent
+    # delete wait until its row is copied, so the trigger then removes the
+    # copy instead of racing ahead of it.
+    copy_batch = text(f"""
+        WITH batch AS (
+            SELECT * FROM {table} WHERE id > CAST(:last AS uuid) ORDER BY id LIMIT :batch_size FOR SHARE
+        ), copied AS (
+            INSERT INTO {new} SELECT * FROM batch ON CONFLICT DO NOTHING
+        )
+        SELECT (SELECT count(*) FROM batch), (SELECT CAST(id AS text) FROM batch ORDER BY id DESC LIMIT 1)
+    """)
+    last = "00000000-0000-0000-0000-000000000000"
+    total = 0
+    while True:
+        count, last_id = conn.execute(copy_batch, {"last": last, "batch_size": batch_size}).one()
+        total += count
+        if on_progress:
+            on_progress(total)
+        if count < batch_size:
+            return total
+        last = last_id
+
+
+def _check_in_sync(conn: Connection, table: str, new: str) -> None:
+    # One statement, so both counts come from the same snapshot. Runs before
+    # the swap takes its lock; from here on the trigger keeps the copy in step.
+    live, copy = conn.execute(text(f"SELECT (SELECT count(*) FROM {table}), (SELECT count(*) FROM {new})")).one()
+    if live != copy:
+        raise RuntimeError(f"{new} has {copy} rows but {table} has {live}; re-run to resume the backfill")
+
+
+def _swap(conn: Connection, layout: TableLayout, new: str, lock_timeout: str) -> None:
+    table = layout.table
+    renames = [
+        *(f"ALTER TABLE {table} RENAME CONSTRAINT {name}_new TO {name};" for name in layout.constraints),
+        *(f"ALTER INDEX {name}_new RENAME TO {name};" for name in layout.indexes),
+    ]
+    # One statement, so one transaction holding the lock only for catalog
+    # changes. lock_timeout stops it queueing behind a long transaction
+    # while every other query on the table queues behind it.
+    conn.exec_driver_sql(f"""
+        DO $$
+        BEGIN
+            PERFORM set_config('lock_timeout', '{lock_timeout}', true);
+            LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE;
+            DROP TRIGGER {new}_sync ON {table};
+            DROP FUNCTION {new}_sync();
+            DROP TABLE {table};
+            ALTER TABLE {new} RENAME TO {table};
+            {' '.join(renames)}
+        END $$
+    """)
+
+
+def rebuild_table(
+    conn: Connection,
+    layout: TableLayout,
+    batch_size: int = 10_000,
+    on_progress: Callable[[int], None] | None = None,
+    lock_timeout: str = "5s"
+) -> int:
+    """
+    Converts a live table to `layout` (partitioned or plain) online: builds
+    a copy, mirrors writes into it with a trigger while existing rows are
+    backfilled in batches, checks the row counts match, then swaps the two
+    under an exclusive lock held only for the drop and renames. Needs an
+    autocommit connection. An interrupted or failed run resumes from the
+    copy it left behind. Returns the number of rows backfilled.
+    """
+    new = f"{layout.table}_new"
+    if conn.execute(text("SELECT to_regclass(:new)"), {"new": new}).scalar() is None:
+        _build_copy(conn, layout, new)
+    else:
+        logger.info("Resuming backfill into existing %s", new)
+
+    copied = _backfill(conn, layout.table, new, batch_size, on_progress)
+    _check_in_sync(conn, layout.table, new)
+    _swap(conn, layout, new, lock_timeout)
+    logger.info("Rebuilt %s (%s rows backfilled)", layout.table, copied)
+    return copied
+
+
+def _move_out_of_default(conn: Connection, month: date) -> None:
+    # Postgres refuses to create a partition whose range already has rows in
+    # the default partition (e.g. after the job failed for months), so build
+    # it detached, move those rows over and attach it in one transaction.
+    name = f"comments_y{month.year}m{month.month:02d}"
+    bounds = {"start": month, "end": _month(month, 1)}
+    conn.exec_driver_sql(f"CREATE TABLE {name} (LIKE comments INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    moved = conn.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM comments_default WHERE created_at >= :start AND created_at < :end RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), bounds).rowcount
+    conn.exec_driver_sql(
+        f"ALTER TABLE comments ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    )
+    logger.warning("Moved %s comments out of comments_default into %s", moved, name)
+
+
+def _default_has_rows(conn: Connection, month: date) -> bool:
+    return conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM comments_default WHERE created_at >= :start AND created_at < :end)"),
+        {"start": month, "end": _month(month, 1)}
+    ).scalar()
+
+
+def ensure_comment_partitions(conn: Connection, months_ahead: int = COMMENT_PARTITION_MONTHS_AHEAD) -> int:
+    """
+    Creates the monthly comments partitions for the current month and the
+    next `months_ahead`, moving any rows the default partition caught for
+    them. Does nothing unless comments is partitioned. Returns the number
+    of partitions created.
+    """
+    if conn.dialect.name != "postgresql" or not is_partitioned(conn, "comments"):
+        return 0
+    today = datetime.now(timezone.utc).date()
+    created = 0
+    for offset in range(months_ahead + 1):
+        month = _month(today, offset)
+        name = f"comments_y{month.year}m{month.month:02d}"
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            continue
+        if _default_has_rows(conn, month):
+            _move_out_of_default(conn, month)
+        else:
+            conn.exec_driver_sql(comment_partition_ddl(month))
+        created += 1
+    return created
@@ -0,0 +1,140 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Two selectinloads of the same relationship shape are common and harmless;
+# a statement that keeps repeating usually runs once per row.
+REPEAT_WARNING_THRESHOLD = 3
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\$\d+|%\(\w+\)s|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    The statement with literals and placeholders replaced by "?", IN lists
+    collapsed and whitespace normalized, so calls differing only in their
+    parameters compare equal.
+    """
+    normalized = _LITERALS.sub("?", " ".join(statement.split()))
+    return _PLACEHOLDER_LISTS.sub("(?, ...)", normalized)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[fingerprint(statement)] += 1
+
+    def repeated(self) -> dict[str, int]:
+        """
+        Statements issued more than once, the usual sign of an N+1 pattern.
+        """
+        return {statement: times for statement, times in self.statements.items() if times > 1}
+
+
+@dataclass
+class RequestQueries:
+    method: str
+    route: str
+    stats: QueryStats
+
+
+_request_stats: ContextVar[QueryStats | None] = ContextVar("request_query_stats", default=None)
+_captures: ContextVar[tuple[list[RequestQueries], ...]] = ContextVar("query_captures", default=())
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(context):
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
+
+
+@contextmanager
+def capture_queries():
+    """
+    Collects the query stats of every request handled inside the block.
+    """
+    requests: list[RequestQueries] = []
+    token = _captures.set(_captures.get() + (requests,))
+    try:
+        yield requests
+    finally:
+        _captures.reset(token)
+
+
+def _route_name(scope) -> str:
+    # Endpoint names rather than raw paths keep metric labels bounded.
+    return getattr(scope.get("route"), "name", "unmatched")
+
+
+class QueryStatsMiddleware:
+    """
+    Counts and times the SQL each request runs. Reported as a Server-Timing
+    header and as per-route metrics; repeated statements are logged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timing = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+            await send(message)
+
+        token = _request_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            self._report(scope, stats)
+
+    @staticmethod
+    def _report(scope, stats: QueryStats) -> None:
+        route = _route_name(scope)
+        metrics.observe("http_db_queries", stats.count, route=route)
+        metrics.observe("http_db_seconds", stats.duration, route=route)
+        for statement, times in stats.repeated().items():
+            if times < REPEAT_WARNING_THRESHOLD:
+                continue
+            metrics.inc("http_db_repeated_statements_total", route=route)
+            logger.warning("%s %s ran the same statement %s times: %s", scope["method"], route, times, statement)
+        for capture in _captures.get():
+            capture.append(RequestQueries(scope["method"], route, stats))
@@ -0,0 +1,105 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from http.cookies import SimpleCookie
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.config import settings
+
+LAST_WRITE_COOKIE = "last_write"
+
+
+@dataclass
+class _RequestWrites:
+    pinned: bool
+    wrote: bool = False
+
+
+_current: ContextVar[_RequestWrites | None] = ContextVar("read_your_writes", default=None)
+
+
+def is_pinned() -> bool:
+    """
+    True when the current client wrote recently enough that a replica may
+    not have its changes yet.
+    """
+    state = _current.get()
+    return state is not None and state.pinned
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dml(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_write(session: Session) -> None:
+    state = _current.get()
+    if session.info.pop("wrote", False) and state is not None:
+        state.wrote = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_write(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+
+def _last_write(scope) -> float | None:
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            morsel = SimpleCookie(value.decode("latin-1")).get(LAST_WRITE_COOKIE)
+            if morsel is not None:
+                try:
+                    return float(morsel.value)
+                except ValueError:
+                    return None
+    return None
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pins a client to the primary for READ_YOUR_WRITES_SECONDS after a
+    request of theirs commits a write, using a cookie holding the commit
+    time. Reads routed to the replica (get_read_db) check is_pinned().
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        last_write = _last_write(scope)
+        state = _RequestWrites(
+            pinned=last_write is not None and time.time() - last_write < settings.READ_YOUR_WRITES_SECONDS
+        )
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and state.wrote:
+                cookie = SimpleCookie()
+                cookie[LAST_WRITE_COOKIE] = f"{time.time():.3f}"
+                cookie[LAST_WRITE_COOKIE].update({
+                    "max-age": str(int(settings.READ_YOUR_WRITES_SECONDS) + 1),
+                    "path": "/",
+                    "httponly": True,
+                    "samesite": "lax",
+                })
+                header = cookie.output(header="").strip().encode("latin-1")
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", header)]
+            await send(message)
+
+        token = _current.set(state)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _current.reset(token)
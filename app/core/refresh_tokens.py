@@ -0,0 +1,112 @@
+import hashlib
+import json
+import secrets
+from dataclasses import dataclass, asdict, fields
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+
+class InvalidRefreshToken(Exception):
+    pass
+
+
+class RefreshTokenReused(InvalidRefreshToken):
+    pass
+
+
+@dataclass
+class RefreshSession:
+    """
+    Only what identifies the session: claims such as username and
+    is_verified are reloaded from the database on every rotation.
+    """
+    user_id: str
+    family: str
+    token_version: int
+
+    @classmethod
+    def from_json(cls, raw: str) -> "RefreshSession":
+        # Sessions stored by older releases carry extra fields.
+        data = json.loads(raw)
+        return cls(**{field.name: data[field.name] for field in fields(cls)})
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _token_key(token_hash: str) -> str:
+    return f"refresh:{token_hash}"
+
+
+def _used_key(token_hash: str) -> str:
+    return f"refresh_used:{token_hash}"
+
+
+def _family_key(family: str) -> str:
+    return f"refresh_family:{family}"
+
+
+def _ttl() -> int:
+    return settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+
+
+async def _store(session: RefreshSession, rotated_hash: str | None = None) -> str:
+    token = secrets.token_urlsafe(32)
+    token_hash = _hash(token)
+
+    async with get_redis().pipeline(transaction=False) as pipe:
+        pipe.set(_token_key(token_hash), json.dumps(asdict(session)), ex=_ttl())
+        pipe.set(_family_key(session.family), token_hash, ex=_ttl())
+        if rotated_hash is not None:
+            pipe.set(_used_key(rotated_hash), session.family, ex=_ttl())
+        await pipe.execute()
+
+    return token
+
+
+async def issue_refresh_token(user_id: UUID, token_version: int) -> str:
+    return await _store(RefreshSession(
+        user_id=str(user_id),
+        family=secrets.token_urlsafe(16),
+        token_version=token_version
+    ))
+
+
+async def rotate_refresh_token(token: str) -> tuple[RefreshSession, str]:
+    """
+    Consumes a refresh token and issues its successor in the same family.
+    Presenting an already rotated token revokes the whole family, since only
+    a leaked copy can still hold it. The caller checks the session's token
+    version and revokes the family if it is stale.
+    """
+    token_hash = _hash(token)
+
+    async with get_redis().pipeline(transaction=False) as pipe:
+        pipe.getdel(_token_key(token_hash))
+        pipe.get(_used_key(token_hash))
+        raw_session, reused_family = await pipe.execute()
+
+    if raw_session is None:
+        if reused_family is not None:
+            await revoke_family(reused_family)
+            raise RefreshTokenReused()
+        raise InvalidRefreshToken()
+
+    session = RefreshSession.from_json(raw_session)
+    return session, await _store(session, rotated_hash=token_hash)
+
+
+async def revoke_family(family: str) -> None:
+    redis = get_redis()
+    current_hash = await redis.getdel(_family_key(family))
+    if current_hash is not None:
+        await redis.delete(_token_key(current_hash))
+
+
+async def revoke_refresh_token(token: str) -> None:
+    raw_session = await get_redis().getdel(_token_key(_hash(token)))
+    if raw_session is not None:
+        await revoke_family(json.loads(raw_session)["family"])
@@ -1,5 +1,8 @@
+import math
+import time
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
 import jwt
 import secrets
 from app.core.config import settings
@@ -8,6 +11,40 @@ from app.core.config import settings
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+def configure_password_hashing(rounds: int) -> None:
+    # min_rounds makes needs_update() flag weaker hashes so login can upgrade them;
+    # stronger hashes (e.g. from a bigger pod) are left alone.
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+
+def calibrate_password_hashing(
+    target_ms: int = settings.PASSWORD_HASH_TARGET_MS,
+    min_rounds: int = settings.PASSWORD_HASH_MIN_ROUNDS,
+    max_rounds: int = settings.PASSWORD_HASH_MAX_ROUNDS
+) -> int:
+    """
+    Picks the highest bcrypt cost whose hash time on this host stays within
+    target_ms and installs it as the default. Each extra round doubles the
+    cost, so one timing at a cheap baseline is enough to extrapolate.
+    """
+    baseline = 8
+    samples = []
+    for _ in range(3):
+        started = time.perf_counter()
+        bcrypt.using(rounds=baseline).hash("calibration")
+        samples.append(time.perf_counter() - started)
+    baseline_ms = max(sorted(samples)[1] * 1000, 1e-3)
+
+    rounds = baseline + math.floor(math.log2(target_ms / baseline_ms))
+    rounds = max(min_rounds, min(max_rounds, rounds))
+    configure_password_hashing(rounds)
+    return rounds
+
+
+if settings.PASSWORD_HASH_ROUNDS is not None:
+    configure_password_hashing(settings.PASSWORD_HASH_ROUNDS)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -16,8 +53,29 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Returns (is_valid, new_hash). new_hash is set when the stored hash uses a
+    weaker cost than the current configuration and should be replaced.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def create_access_token(
+    data: dict,
+    expires_delta: timedelta | None = None,
+    *,
+    username: str | None = None,
+    is_verified: bool | None = None,
+    token_version: int | None = None
+) -> str:
     to_encode = data.copy()
+    if username is not None:
+        to_encode["username"] = username
+    if is_verified is not None:
+        to_encode["is_verified"] = is_verified
+    if token_version is not None:
+        to_encode["ver"] = token_version
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from email.message import Message
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the session itself is gone; anything else (e.g. a refused
+# recipient) leaves the connection usable.
+CONNECTION_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+    OSError,
+)
+
+
+class PooledConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.messages_sent = 0
+
+    async def send_message(self, message: Message) -> None:
+        self.messages_sent += 1
+        await self.smtp.send_message(message)
+
+
+class SMTPConnectionPool:
+    """
+    Keeps authenticated SMTP sessions open between messages so each send
+    doesn't pay for a TCP connect, STARTTLS handshake and AUTH. Bound to the
+    event loop it is first used on.
+    """
+
+    def __init__(
+        self,
+        config: ConnectionConfig,
+        max_size: int = settings.SMTP_POOL_SIZE,
+        idle_timeout: float = settings.SMTP_POOL_IDLE_TIMEOUT,
+        keepalive_interval: float = settings.SMTP_POOL_KEEPALIVE_INTERVAL,
+        max_messages: int = settings.SMTP_POOL_MAX_MESSAGES
+    ):
+        self.config = config
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.max_messages = max_messages
+        self._idle: list[PooledConnection] = []
+        self._semaphore = asyncio.Semaphore(max_size)
+
+    async def _connect(self) -> PooledConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.config.MAIL_SERVER,
+            port=self.config.MAIL_PORT,
+            timeout=self.config.TIMEOUT,
+            use_tls=self.config.MAIL_SSL_TLS,
+            start_tls=self.config.MAIL_STARTTLS,
+            validate_certs=self.config.VALIDATE_CERTS,
+        )
+        await smtp.connect()
+        if self.config.USE_CREDENTIALS:
+            await smtp.login(self.config.MAIL_USERNAME, self.config.MAIL_PASSWORD.get_secret_value())
+        return PooledConnection(smtp)
+
+    async def _close(self, conn: PooledConnection) -> None:
+        try:
+            if conn.smtp.is_connected:
+                await conn.smtp.quit()
+        except Exception:
+            conn.smtp.close()
+
+    async def _is_usable(self, conn: PooledConnection) -> bool:
+        idle_for = time.monotonic() - conn.last_used
+        if not conn.smtp.is_connected or idle_for > self.idle_timeout:
+            return False
+        if idle_for > self.keepalive_interval:
+            # The server may have dropped a quiet session; probe before reusing it.
+            try:
+                await conn.smtp.noop()
+            except CONNECTION_ERRORS:
+                return False
+        return True
+
+    async def _acquire(self) -> PooledConnection:
+        while self._idle:
+            conn = self._idle.pop()
+            if await self._is_usable(conn):
+                return conn
+            await self._close(conn)
+        return await self._connect()
+
+    async def _release(self, conn: PooledConnection) -> None:
+        conn.last_used = time.monotonic()
+        if conn.messages_sent >= self.max_messages:
+            await self._close(conn)
+        else:
+            self._idle.append(conn)
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self._semaphore:
+            conn = await self._acquire()
+            try:
+                yield conn
+            except CONNECTION_ERRORS:
+                await self._close(conn)
+                raise
+            except BaseException:
+                await self._release(conn)
+                raise
+            else:
+                await self._release(conn)
+
+    async def send_message(self, message: Message, retries: int = 1) -> None:
+        """
+        Sends over a pooled session, reconnecting once if the server dropped it.
+        """
+        for attempt in range(retries + 1):
+            try:
+                async with self.connection() as conn:
+                    await conn.send_message(message)
+                return
+            except CONNECTION_ERRORS:
+                if attempt == retries:
+                    raise
+                logger.info("SMTP session lost, reconnecting", exc_info=True)
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._close(self._idle.pop())
+
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SMTPConnectionPool]" = weakref.WeakKeyDictionary()
+
+
+def get_smtp_pool(config: ConnectionConfig) -> SMTPConnectionPool:
+    """
+    Returns the pool for the running event loop; asyncio connections can't
+    be shared across loops.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = SMTPConnectionPool(config)
+    return pool
+
+
+async def close_smtp_pool() -> None:
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
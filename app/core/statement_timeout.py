@@ -0,0 +1,74 @@
+import logging
+from contextvars import ContextVar
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import event, exc
+from sqlalchemy.orm import Session
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE Postgres reports when statement_timeout cancels a query.
+QUERY_CANCELED = "57014"
+
+_statement_timeout: ContextVar[float | None] = ContextVar("statement_timeout", default=None)
+
+
+def current_statement_timeout() -> float | None:
+    return _statement_timeout.get()
+
+
+def statement_timeout(seconds: float | None):
+    """
+    Dependency capping how long each statement of the request may run.
+    Every UnitOfWorkRoute gets DB_STATEMENT_TIMEOUT; a router or route
+    listing its own statement_timeout dependency overrides it, since
+    later dependencies run after earlier ones.
+    """
+    async def apply_statement_timeout():
+        token = _statement_timeout.set(seconds)
+        try:
+            yield
+        finally:
+            _statement_timeout.reset(token)
+    return apply_statement_timeout
+
+
+@event.listens_for(Session, "after_begin")
+def _set_local_timeout(session: Session, transaction, connection) -> None:
+    seconds = _statement_timeout.get()
+    # SET LOCAL lasts until the transaction ends, so it never leaks into the
+    # next checkout and stays correct behind pgbouncer in transaction mode.
+    # SQLite has no equivalent; requests there run unbounded.
+    if seconds and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(seconds * 1000)}")
+
+
+async def database_timeout_handler(request: Request, error: exc.DBAPIError):
+    """
+    A statement cancelled by its timeout becomes a 504. Other database
+    errors are re-raised and end up as the usual 500.
+    """
+    if getattr(error.orig, "sqlstate", None) != QUERY_CANCELED:
+        raise error
+    route = getattr(request.scope.get("route"), "name", "unmatched")
+    metrics.inc("db_statement_timeouts_total", route=route)
+    logger.warning("%s %s cancelled by statement timeout", request.method, route)
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "Database query timed out"}
+    )
+
+
+async def pool_timeout_handler(request: Request, error: exc.TimeoutError):
+    """
+    No connection freed up within DB_POOL_TIMEOUT: the database is
+    saturated, so ask the client to retry rather than queue further.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database is busy, try again shortly"},
+        headers={"Retry-After": "1"}
+    )
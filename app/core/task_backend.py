@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Retry(Exception):
+    """
+    Raised by a task to be run again later, optionally with new arguments
+    (e.g. only the part of a batch that failed).
+    """
+
+    def __init__(self, args: list | None = None):
+        super().__init__("retry requested")
+        self.task_args = args
+
+
+@dataclass
+class TaskSpec:
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    max_retries: int
+    retry_backoff: float
+
+    def countdown(self, retries: int) -> float:
+        return self.retry_backoff * 2 ** retries
+
+
+_registry: dict[str, TaskSpec] = {}
+
+
+def task(name: str, max_retries: int = 3, retry_backoff: float = 30.0, **celery_options):
+    """
+    Registers a coroutine function as a background task runnable by either
+    backend. The function is returned unchanged apart from `.name` and
+    `.celery`, the equivalent Celery task for workers.
+    """
+    def decorator(func):
+        from app.core.worker_loop import async_task
+
+        spec = _registry[name] = TaskSpec(name, func, max_retries, retry_backoff)
+
+        def retry(self, exc: Exception, args: tuple):
+            # Runs on the Celery thread, where self.request is populated.
+            countdown = spec.countdown(self.request.retries)
+            if isinstance(exc, Retry):
+                raise self.retry(args=exc.task_args or list(args), countdown=countdown)
+            raise self.retry(exc=exc, countdown=countdown)
+
+        @async_task(name=name, max_retries=max_retries, on_error=retry, **celery_options)
+        async def celery_task(*args):
+            return await func(*args)
+
+        func.name = name
+        func.celery = celery_task
+        return func
+
+    return decorator
+
+
+class TaskBackend(ABC):
+    async def start(self) -> None:
+        pass
+
+    @abstractmethod
+    async def enqueue(self, name: str, *args) -> None:
+        ...
+
+    async def drain(self) -> None:
+        pass
+
+
+class CeleryTaskBackend(TaskBackend):
+
+    async def enqueue(self, name: str, *args) -> None:
+        from app.core.celery_app import celery
+
+        # Registered tasks publish with their own options (priority, ignore_result).
+        registered = celery.tasks.get(name)
+        publish = registered.apply_async if registered else partial(celery.send_task, name)
+        # Publishing is a blocking broker round trip.
+        await run_in_threadpool(publish, args=list(args))
+
+
+class InProcessTaskBackend(TaskBackend):
+    """
+    Runs tasks on the current event loop for single-node deployments with
+    no broker. Jobs queued here are lost if the process dies, so stop it
+    through drain().
+    """
+
+    def __init__(self, max_queue_size: int, concurrency: int, drain_timeout: float):
+        self.max_queue_size = max_queue_size
+        self.concurrency = concurrency
+        self.drain_timeout = drain_timeout
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._retries: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def enqueue(self, name: str, *args) -> None:
+        if name not in _registry:
+            raise KeyError(f"Unknown task {name!r}")
+        await self.start()
+        # Blocks when the queue is full, pushing back on the producer.
+        await self._queue.put((name, list(args), 0))
+
+    async def _work(self) -> None:
+        while True:
+            name, args, retries = await self._queue.get()
+            try:
+                await self._run(name, args, retries)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, name: str, args: list, retries: int) -> None:
+        spec = _registry[name]
+        try:
+            await spec.func(*args)
+            return
+        except Retry as exc:
+            args = exc.task_args or args
+            error = exc
+        except Exception as exc:
+            error = exc
+
+        if retries >= spec.max_retries:
+            logger.error("Task %s failed after %s retries: %s", name, retries, error)
+            return
+        logger.warning("Task %s failed, retrying: %s", name, error)
+        retry = asyncio.create_task(self._retry_later(name, args, retries + 1, spec.countdown(retries)))
+        self._retries.add(retry)
+        retry.add_done_callback(self._retries.discard)
+
+    async def _retry_later(self, name: str, args: list, retries: int, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._queue.put((name, args, retries))
+
+    async def drain(self) -> None:
+        """
+        Finishes queued jobs within drain_timeout, then stops the workers.
+        Retries still waiting on their backoff are dropped with a warning.
+        """
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Task queue drain timed out with %s jobs left", self._queue.qsize())
+        if self._retries:
+            logger.warning("Dropping %s tasks waiting to retry", len(self._retries))
+        for pending in [*self._retries, *self._workers]:
+            pending.cancel()
+        await asyncio.gather(*self._retries, *self._workers, return_exceptions=True)
+        self._workers = []
+
+
+def create_task_backend(name: str) -> TaskBackend:
+    if name == "celery":
+        return CeleryTaskBackend()
+    if name == "inprocess":
+        return InProcessTaskBackend(
+            max_queue_size=settings.TASK_QUEUE_SIZE,
+            concurrency=settings.TASK_CONCURRENCY,
+            drain_timeout=settings.TASK_DRAIN_TIMEOUT
+        )
+    raise ValueError(f"Unknown TASK_BACKEND {name!r}")
+
+
+task_backend = create_task_backend(settings.TASK_BACKEND)
@@ -0,0 +1,57 @@
+import logging
+from uuid import UUID
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+def token_version_key(user_id: UUID) -> str:
+    return f"user:{user_id}:token_version"
+
+
+def _cache_ttl() -> int:
+    # A cached entry outliving the tokens it was read for gains nothing.
+    return settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+async def get_token_version(user_repo: UserRepository, user_id: UUID) -> int | None:
+    """
+    Returns the user's current access token version, or None if the user
+    no longer exists. Redis caches it; the users table answers on a miss
+    and whenever Redis is unreachable, so revocation holds during outages.
+    """
+    key = token_version_key(user_id)
+    try:
+        value = await get_redis().get(key)
+    except RedisError:
+        logger.warning("Token version lookup failed for user %s, reading the database", user_id, exc_info=True)
+        return await user_repo.get_token_version(user_id)
+    if value is not None:
+        return int(value)
+
+    version = await user_repo.get_token_version(user_id)
+    if version is not None:
+        try:
+            # nx: never overwrite a version a concurrent bump just wrote.
+            await get_redis().set(key, version, ex=_cache_ttl(), nx=True)
+        except RedisError:
+            pass
+    return version
+
+
+async def bump_token_version(user_repo: UserRepository, user_id: UUID) -> int | None:
+    """
+    Invalidates every access token issued to the user so far. Raises
+    RedisError if the cache can't be updated, so the caller's transaction
+    rolls back rather than leave Redis serving the old version.
+    """
+    current = await get_token_version(user_repo, user_id)
+    if current is None:
+        return None
+    version = await user_repo.set_token_version(user_id, current + 1)
+    await get_redis().set(token_version_key(user_id), version, ex=_cache_ttl())
+    return version
@@ -0,0 +1,99 @@
+import hashlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.core.security import generate_verification_token, get_verification_token_expiry
+from app.repositories.verification_token_repository import VerificationTokenRepository
+
+
+class InvalidVerificationToken(Exception):
+    pass
+
+
+class ExpiredVerificationToken(InvalidVerificationToken):
+    pass
+
+
+class VerificationTokenStore(ABC):
+    @abstractmethod
+    async def issue(self, user_id: UUID, replace: bool = True) -> str:
+        """
+        Creates a token for the user; with replace, any earlier one stops working.
+        """
+
+    @abstractmethod
+    async def consume(self, token: str) -> UUID:
+        """
+        Returns the owner of a valid token and invalidates the user's tokens.
+        """
+
+
+class DatabaseVerificationTokenStore(VerificationTokenStore):
+    """
+    Tokens as email_verification_tokens rows, written in the caller's
+    transaction so they commit together with the user and outbox message.
+    """
+
+    def __init__(self, token_repo: VerificationTokenRepository):
+        self.token_repo = token_repo
+
+    async def issue(self, user_id: UUID, replace: bool = True) -> str:
+        if replace:
+            await self.token_repo.delete_for_user(user_id)
+        token = generate_verification_token()
+        self.token_repo.add(user_id, token, get_verification_token_expiry())
+        return token
+
+    async def consume(self, token: str) -> UUID:
+        verification_token = await self.token_repo.get_by_token(token)
+        if not verification_token:
+            raise InvalidVerificationToken()
+        if verification_token.expires_at < datetime.utcnow():
+            raise ExpiredVerificationToken()
+        await self.token_repo.delete_for_user(verification_token.user_id)
+        return verification_token.user_id
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _token_key(token_hash: str) -> str:
+    return f"verify:{token_hash}"
+
+
+def _user_key(user_id: UUID) -> str:
+    return f"verify_user:{user_id}"
+
+
+class RedisVerificationTokenStore(VerificationTokenStore):
+    """
+    Tokens as Redis keys that expire on their own after
+    VERIFICATION_TOKEN_EXPIRE_HOURS, so there is nothing to prune. Keys hold
+    the token's hash, not the token. An expired token is indistinguishable
+    from an unknown one.
+    """
+
+    async def issue(self, user_id: UUID, replace: bool = True) -> str:
+        token = generate_verification_token()
+        token_hash = _hash(token)
+        ttl = settings.VERIFICATION_TOKEN_EXPIRE_HOURS * 3600
+
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.set(_token_key(token_hash), str(user_id), ex=ttl)
+            # Remembers the user's current token so a resend can revoke it.
+            pipe.set(_user_key(user_id), token_hash, ex=ttl, get=True)
+            _, previous_hash = await pipe.execute()
+
+        if replace and previous_hash:
+            await get_redis().delete(_token_key(previous_hash))
+        return token
+
+    async def consume(self, token: str) -> UUID:
+        user_id = await get_redis().getdel(_token_key(_hash(token)))
+        if user_id is None:
+            raise InvalidVerificationToken()
+        return UUID(user_id)
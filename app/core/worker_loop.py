@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import os
+import threading
+from functools import wraps
+from typing import Awaitable, Callable
+
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+
+from app.core.celery_app import celery
+
+logger = logging.getLogger(__name__)
+
+_loop: asyncio.AbstractEventLoop | None = None
+_thread: threading.Thread | None = None
+_pid: int | None = None
+_lock = threading.Lock()
+_shutdown_hooks: list[Callable[[], Awaitable[None]]] = []
+
+
+def on_loop_shutdown(hook: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+    """
+    Registers a coroutine function that runs on the worker loop before it
+    stops, e.g. to close pooled connections cleanly.
+    """
+    _shutdown_hooks.append(hook)
+    return hook
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns this process's long-lived loop, starting it on first use. A loop
+    inherited through fork has no thread behind it, so it is replaced.
+    """
+    global _loop, _thread, _pid
+    with _lock:
+        if _loop is None or _pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="worker-event-loop", daemon=True)
+            _thread.start()
+            _pid = os.getpid()
+        return _loop
+
+
+def run_async(coro: Awaitable):
+    return asyncio.run_coroutine_threadsafe(coro, get_worker_loop()).result()
+
+
+def stop_worker_loop() -> None:
+    global _loop, _thread, _pid
+    with _lock:
+        if _loop is None or _pid != os.getpid():
+            return
+        loop, thread = _loop, _thread
+        _loop = _thread = _pid = None
+
+    async def shutdown():
+        for hook in _shutdown_hooks:
+            try:
+                await hook()
+            except Exception:
+                logger.exception("Worker loop shutdown hook %r failed", hook)
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def async_task(*task_args, on_error: Callable | None = None, **task_options):
+    """
+    Like @celery.task, but for coroutine functions. Every invocation runs on
+    the process's persistent loop, so async clients (SMTP pool, DB engine)
+    survive between tasks instead of being rebuilt per call.
+
+    Celery's task context is thread-local, so `self.request` and
+    `self.retry()` are unusable inside the coroutine. Exceptions it raises
+    go to `on_error(task, exc, args)` instead, called back on the worker
+    thread where retrying works.
+    """
+    def decorator(func):
+        @wraps(func)
+        def run(self, *args, **kwargs):
+            try:
+                return run_async(func(*args, **kwargs))
+            except Exception as exc:
+                if on_error is None:
+                    raise
+                return on_error(self, exc, args)
+
+        return celery.task(*task_args, bind=True, **task_options)(run)
+
+    return decorator
+
+
+@worker_process_init.connect
+def _start_loop_in_child(**kwargs):
+    get_worker_loop()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _stop_loop(**kwargs):
+    stop_worker_loop()
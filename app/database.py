@@ -1,17 +1,99 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from uuid import uuid4
 from app.core.config import settings
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from app.core.db_pool import InstrumentedQueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 
-database_url = settings.DATABASE_URL
-if database_url.startswith("postgresql://"):
-    database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+def _async_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
 
-engine = create_async_engine(database_url, echo=False)
+
+def build_engine(url: str, pool_name: str = "primary") -> AsyncEngine:
+    url = _async_url(url)
+    if url.startswith("sqlite"):
+        # SQLite picks its own pool (StaticPool for in-memory databases) and
+        # has no server to lose connections to.
+        return create_async_engine(url, echo=False)
+
+    connect_args = {}
+    if settings.DB_PGBOUNCER:
+        # pgbouncer in transaction mode may hand each transaction a different
+        # server connection, where a cached or named prepared statement from
+        # an earlier one doesn't exist. Disable both caches and give every
+        # statement a unique name.
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    engine.pool.metrics_name = pool_name
+    return engine
+
+
+engine = build_engine(settings.DATABASE_URL)
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
     expire_on_commit=False,
     autoflush=False,
-)
\ No newline at end of file
+)
+
+replica_engine = build_engine(settings.DATABASE_REPLICA_URL, "replica") if settings.DATABASE_REPLICA_URL else None
+
+ReplicaSessionLocal = sessionmaker(
+    bind=replica_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+) if replica_engine else None
+
+
+_active_sessions: ContextVar[tuple[AsyncSession, ...]] = ContextVar("active_sessions", default=())
+
+
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession):
+    """
+    Commits once when the block completes and rolls back if it raises.
+    Repositories only flush, so everything a request writes lands in one
+    transaction.
+    """
+    token = _active_sessions.set(_active_sessions.get() + (session,))
+    try:
+        yield session
+    except BaseException:
+        await session.rollback()
+        raise
+    else:
+        if session.in_transaction():
+            await session.commit()
+    finally:
+        _active_sessions.reset(token)
+
+
+async def finish_units_of_work() -> None:
+    """
+    Commits the enclosing units of work now, returning their connections to
+    the pool. The commit on exit then has nothing left to do.
+    """
+    for session in _active_sessions.get():
+        if session.in_transaction():
+            await session.commit()
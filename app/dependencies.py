@@ -1,63 +1,150 @@
+import functools
+import inspect
 from uuid import UUID
 from fastapi import Depends, HTTPException, status
+from fastapi.routing import APIRoute
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 
 from app.core.security import decode_token
-from app import models
-from app.database import AsyncSessionLocal
+from app.core.token_version import get_token_version
+from app.core.config import settings
+from app.core.read_your_writes import is_pinned
+from app.core.statement_timeout import statement_timeout
+from app.core.verification_tokens import (
+    DatabaseVerificationTokenStore,
+    RedisVerificationTokenStore,
+    VerificationTokenStore
+)
+from app import models, schemas
+from app.database import AsyncSessionLocal, ReplicaSessionLocal, finish_units_of_work, unit_of_work
 from app.repositories.user_repository import UserRepository
 from app.repositories.post_repository import PostRepository
 from app.repositories.comment_repository import CommentRepository
 from app.repositories.like_repository import LikeRepository
+from app.repositories.outbox_repository import OutboxRepository
+from app.repositories.verification_token_repository import VerificationTokenRepository
 from app.services.user_service import UserService
 from app.services.auth_service import AuthService
 from app.services.post_service import PostService
 from app.services.comment_service import CommentService
 from app.services.like_service import LikeService
+from app.services.cleanup_service import CleanupService
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
 async def get_db():
-    async with AsyncSessionLocal() as session:
+    """
+    The request's unit of work. The session checks out a connection on its
+    first query. Declared with scope="function" everywhere so the commit
+    happens before the response is sent, not after it.
+    """
+    async with AsyncSessionLocal() as session, unit_of_work(session):
         yield session
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> models.User:
-    credentials_exception = HTTPException(
+class UnitOfWorkRoute(APIRoute):
+    """
+    Commits the request's sessions as soon as the endpoint returns, so
+    connections go back to the pool before the response is serialized and
+    sent rather than when dependency teardown runs. Also applies the
+    default statement timeout, ahead of any the router or route sets.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+            endpoint = self._finish_after(endpoint)
+        kwargs["dependencies"] = [
+            Depends(statement_timeout(settings.DB_STATEMENT_TIMEOUT), scope="function"),
+            *(kwargs.get("dependencies") or []),
+        ]
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _finish_after(endpoint):
+        @functools.wraps(endpoint)
+        async def run(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            await finish_units_of_work()
+            return result
+        return run
+
+
+async def get_read_db(db: AsyncSession = Depends(get_db, scope="function")):
+    """
+    Session for reads that tolerate replica lag. Falls back to the primary
+    session when no replica is configured or the client wrote recently.
+    The primary session only checks out a connection once it's used.
+    """
+    if ReplicaSessionLocal is None or is_pinned():
+        yield db
+        return
+    async with ReplicaSessionLocal() as session, unit_of_work(session):
+        yield session
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+async def get_token_payload(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db, scope="function")
+) -> dict:
     payload = decode_token(token)
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     user_id_str = payload.get("sub")
     if user_id_str is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     try:
-        user_id = UUID(user_id_str)
+        payload["sub"] = UUID(user_id_str)
     except ValueError:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    # Tokens issued before versioning carry no "ver" claim and count as version 0.
+    # Usually a Redis hit; the session only connects on a miss or an outage.
+    current_version = await get_token_version(UserRepository(db), payload["sub"])
+    if current_version is None or payload.get("ver", 0) != current_version:
+        raise _credentials_exception()
 
-    result = await db.execute(select(models.User).filter(models.User.id == user_id))
+    return payload
+
+
+_USER_BY_ID = select(models.User).where(models.User.id == bindparam("user_id"))
+
+
+async def _load_user(db: AsyncSession, user_id: UUID) -> models.User:
+    # Runs on every authenticated request, so the statement is built once.
+    result = await db.execute(_USER_BY_ID, {"user_id": user_id})
     user = result.scalars().first()
 
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     return user
 
 
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db, scope="function")
+) -> models.User:
+    """
+    Always read from the primary: authorization checks such as is_verified
+    must not see a lagging replica, and callers may modify the user.
+    """
+    return await _load_user(db, payload["sub"])
+
+
 async def get_current_verified_user(
     current_user: models.User = Depends(get_current_user)
 ) -> models.User:
@@ -69,31 +156,87 @@ async def get_current_verified_user(
     return current_user
 
 
-def get_user_repository(db: AsyncSession = Depends(get_db)) -> UserRepository:
+async def get_token_claims(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db, scope="function")
+) -> schemas.TokenClaims:
+    if "username" in payload and "is_verified" in payload:
+        return schemas.TokenClaims(
+            id=payload["sub"],
+            username=payload["username"],
+            is_verified=payload["is_verified"]
+        )
+
+    user = await _load_user(db, payload["sub"])
+    return schemas.TokenClaims.model_validate(user)
+
+
+async def get_verified_claims(
+    claims: schemas.TokenClaims = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_db, scope="function")
+) -> schemas.TokenClaims:
+    """
+    Authorizes verified-only endpoints from token claims alone. A positive
+    is_verified claim is trusted because verification is never undone; a
+    negative one may be stale (the user verified after login), so it is
+    re-checked against the database.
+    """
+    if claims.is_verified:
+        return claims
+
+    user = await _load_user(db, claims.id)
+    if not user.is_verified:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Email verification required"
+        )
+    return schemas.TokenClaims.model_validate(user)
+
+
+def get_user_repository(db: AsyncSession = Depends(get_db, scope="function")) -> UserRepository:
     return UserRepository(db)
 
 
-def get_post_repository(db: AsyncSession = Depends(get_db)) -> PostRepository:
+def get_post_repository(db: AsyncSession = Depends(get_db, scope="function")) -> PostRepository:
     return PostRepository(db)
 
 
-def get_comment_repository(db: AsyncSession = Depends(get_db)) -> CommentRepository:
+def get_comment_repository(db: AsyncSession = Depends(get_db, scope="function")) -> CommentRepository:
     return CommentRepository(db)
 
 
-def get_like_repository(db: AsyncSession = Depends(get_db)) -> LikeRepository:
+def get_like_repository(db: AsyncSession = Depends(get_db, scope="function")) -> LikeRepository:
     return LikeRepository(db)
 
 
+def get_outbox_repository(db: AsyncSession = Depends(get_db, scope="function")) -> OutboxRepository:
+    return OutboxRepository(db)
+
+
+def get_verification_token_store(db: AsyncSession = Depends(get_db, scope="function")) -> VerificationTokenStore:
+    if settings.VERIFICATION_TOKEN_STORE == "redis":
+        return RedisVerificationTokenStore()
+    return DatabaseVerificationTokenStore(VerificationTokenRepository(db))
+
+
 def get_user_service(repo: UserRepository = Depends(get_user_repository)) -> UserService:
     return UserService(repo)
 
 
 def get_auth_service(
     user_repo: UserRepository = Depends(get_user_repository),
-    db: AsyncSession = Depends(get_db)
+    outbox_repo: OutboxRepository = Depends(get_outbox_repository),
+    token_store: VerificationTokenStore = Depends(get_verification_token_store),
+    db: AsyncSession = Depends(get_db, scope="function")
 ) -> AuthService:
-    return AuthService(user_repo, db)
+    return AuthService(user_repo, outbox_repo, token_store, db)
+
+
+def get_cleanup_service(
+    user_repo: UserRepository = Depends(get_user_repository),
+    db: AsyncSession = Depends(get_db, scope="function")
+) -> CleanupService:
+    return CleanupService(user_repo, VerificationTokenRepository(db), db)
 
 
 def get_post_service(
@@ -109,6 +252,14 @@ def get_comment_service(
     return CommentService(comment_repo)
 
 
+def get_read_post_service(db: AsyncSession = Depends(get_read_db, scope="function")) -> PostService:
+    return PostService(PostRepository(db), LikeRepository(db))
+
+
+def get_read_comment_service(db: AsyncSession = Depends(get_read_db, scope="function")) -> CommentService:
+    return CommentService(CommentRepository(db))
+
+
 def get_like_service(
     like_repo: LikeRepository = Depends(get_like_repository),
     post_repo: PostRepository = Depends(get_post_repository)
@@ -119,7 +270,7 @@ def get_like_service(
 from app.repositories.feed_repository import FeedRepository
 from app.services.feed_service import FeedService
 
-def get_feed_repository(db: AsyncSession = Depends(get_db)) -> FeedRepository:
+def get_feed_repository(db: AsyncSession = Depends(get_read_db, scope="function")) -> FeedRepository:
     return FeedRepository(db)
 
 def get_feed_service(
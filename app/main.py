@@ -1,20 +1,71 @@
-from fastapi import FastAPI
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
+import asyncio
+import logging
+import secrets
+from contextlib import asynccontextmanager, suppress
+from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import exc
 
-from app.core.limiter import limiter
+from app.core.celery_app import celery
+from app.core.config import settings
+from app.core.jobs import run_schedule
+from app.core.metrics import metrics
+from app.core.limiter import limiter, RateLimitMiddleware
+from app.core.outbox_relay import OutboxRelay
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.read_your_writes import ReadYourWritesMiddleware
+from app.core.security import calibrate_password_hashing
+from app.core.smtp_pool import close_smtp_pool
+from app.core.statement_timeout import database_timeout_handler, pool_timeout_handler
+from app.core.task_backend import InProcessTaskBackend, task_backend
+from app.database import AsyncSessionLocal
 from app.routers import auth, users, posts, feed, admin
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.PASSWORD_HASH_ROUNDS is None:
+        rounds = await run_in_threadpool(calibrate_password_hashing)
+        logger.info("Calibrated bcrypt cost to %s rounds", rounds)
+    limiter.start()
+    await task_backend.start()
+
+    # Without a broker there is no worker or beat, so the API drains the
+    # outbox and runs the periodic jobs itself.
+    background = []
+    if isinstance(task_backend, InProcessTaskBackend):
+        background.append(asyncio.create_task(OutboxRelay(AsyncSessionLocal, task_backend).run()))
+        if settings.RUN_SCHEDULE:
+            background.append(asyncio.create_task(run_schedule(task_backend, celery.conf.beat_schedule)))
+
+    yield
+
+    for job in background:
+        job.cancel()
+        with suppress(asyncio.CancelledError):
+            await job
+    await task_backend.drain()
+    await close_smtp_pool()
+    await limiter.stop()
+
+
 app = FastAPI(
     title="Mini Social Network API",
     description="Backend API for a mini social network with users, posts, comments, and likes",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(RateLimitMiddleware, limiter=limiter)
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_exception_handler(exc.DBAPIError, database_timeout_handler)
+app.add_exception_handler(exc.TimeoutError, pool_timeout_handler)
 
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/users", tags=["Users"])
@@ -25,4 +76,28 @@ app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 
 @app.get("/", tags=["Health"])
 def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+def require_metrics_token(credentials: HTTPAuthorizationCredentials | None = Depends(HTTPBearer(auto_error=False))):
+    # Pool and SQL metrics describe the internals; unset METRICS_TOKEN hides them.
+    if settings.METRICS_TOKEN is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@app.get(
+    "/metrics",
+    tags=["Health"],
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_metrics_token)]
+)
+def render_metrics():
+    return metrics.render()
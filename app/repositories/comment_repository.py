@@ -1,37 +1,56 @@
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, delete, select
 from sqlalchemy.orm import selectinload
 from app import models
 
 
+def _not_before_post(post_id):
+    # Comments can't predate their post. The bound lets a comments table
+    # partitioned by created_at skip older partitions.
+    post_created_at = select(models.Post.created_at).where(models.Post.id == post_id).scalar_subquery()
+    return models.Comment.created_at >= post_created_at
+
+
+_BY_ID = (
+    select(models.Comment)
+    .options(selectinload(models.Comment.author))
+    .where(
+        models.Comment.id == bindparam("comment_id"),
+        models.Comment.post_id == bindparam("post_id"),
+        _not_before_post(bindparam("post_id"))
+    )
+)
+_BY_POST = (
+    select(models.Comment)
+    .options(selectinload(models.Comment.author))
+    .where(models.Comment.post_id == bindparam("post_id"), _not_before_post(bindparam("post_id")))
+    .order_by(models.Comment.created_at.asc(), models.Comment.id.asc())
+)
+
+
 class CommentRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_by_id(self, comment_id: UUID) -> models.Comment | None:
-        result = await self.db.execute(
-            select(models.Comment)
-            .options(selectinload(models.Comment.author))
-            .filter(models.Comment.id == comment_id)
-        )
+    async def get_by_id(self, comment_id: UUID, post_id: UUID) -> models.Comment | None:
+        result = await self.db.execute(_BY_ID, {"comment_id": comment_id, "post_id": post_id})
         return result.scalars().first()
 
     async def get_by_post_id(self, post_id: UUID) -> list[models.Comment]:
-        result = await self.db.execute(
-            select(models.Comment)
-            .options(selectinload(models.Comment.author))
-            .filter(models.Comment.post_id == post_id)
-            .order_by(models.Comment.created_at.asc())
-        )
+        result = await self.db.execute(_BY_POST, {"post_id": post_id})
         return list(result.scalars().all())
 
     async def create(self, comment: models.Comment) -> models.Comment:
         self.db.add(comment)
-        await self.db.commit()
-        await self.db.refresh(comment)
+        await self.db.flush()
         return comment
 
     async def delete(self, comment: models.Comment) -> None:
-        await self.db.delete(comment)
-        await self.db.commit()
+        await self.db.execute(
+            delete(models.Comment).where(
+                models.Comment.id == comment.id,
+                models.Comment.post_id == comment.post_id,
+                _not_before_post(comment.post_id)
+            )
+        )
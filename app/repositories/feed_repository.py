@@ -43,7 +43,7 @@ class FeedRepository:
             .options(
                 selectinload(models.User.posts).selectinload(models.Post.likes) # Optimizes the likes fetching mostly
             )
-            .order_by(models.User.created_at.desc())
+            .order_by(models.User.created_at.desc(), models.User.id.desc())
             .offset((page - 1) * page_size)
             .limit(page_size)
         )
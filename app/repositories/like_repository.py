@@ -1,46 +1,45 @@
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, delete, select, func
 from app import models
 
+_BY_USER_AND_POST = select(models.Like).where(
+    models.Like.user_id == bindparam("user_id"),
+    models.Like.post_id == bindparam("post_id")
+)
+_BY_POST = select(models.Like).where(models.Like.post_id == bindparam("post_id"))
+_COUNT_BY_POST = select(func.count()).select_from(models.Like).where(models.Like.post_id == bindparam("post_id"))
+_USER_IDS_BY_POST = select(models.Like.user_id).where(models.Like.post_id == bindparam("post_id"))
+
 
 class LikeRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
     async def get_by_user_and_post(self, user_id: UUID, post_id: UUID) -> models.Like | None:
-        result = await self.db.execute(
-            select(models.Like).filter(
-                models.Like.user_id == user_id,
-                models.Like.post_id == post_id
-            )
-        )
+        result = await self.db.execute(_BY_USER_AND_POST, {"user_id": user_id, "post_id": post_id})
         return result.scalars().first()
 
     async def get_by_post_id(self, post_id: UUID) -> list[models.Like]:
-        result = await self.db.execute(
-            select(models.Like).filter(models.Like.post_id == post_id)
-        )
+        result = await self.db.execute(_BY_POST, {"post_id": post_id})
         return list(result.scalars().all())
 
     async def count_by_post_id(self, post_id: UUID) -> int:
-        result = await self.db.execute(
-            select(models.Like).filter(models.Like.post_id == post_id)
-        )
-        return len(result.scalars().all())
+        result = await self.db.execute(_COUNT_BY_POST, {"post_id": post_id})
+        return result.scalar_one()
 
     async def create(self, like: models.Like) -> models.Like:
         self.db.add(like)
-        await self.db.commit()
-        await self.db.refresh(like)
+        await self.db.flush()
         return like
 
     async def delete(self, like: models.Like) -> None:
-        await self.db.delete(like)
-        await self.db.commit()
+        # post_id (the partition key) lets a partitioned likes table prune
+        # to one partition.
+        await self.db.execute(
+            delete(models.Like).where(models.Like.id == like.id, models.Like.post_id == like.post_id)
+        )
 
     async def get_user_ids_by_post(self, post_id: UUID) -> list[UUID]:
-        result = await self.db.execute(
-            select(models.Like.user_id).filter(models.Like.post_id == post_id)
-        )
+        result = await self.db.execute(_USER_IDS_BY_POST, {"post_id": post_id})
         return list(result.scalars().all())
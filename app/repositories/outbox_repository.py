@@ -0,0 +1,33 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from app import models
+
+
+class OutboxRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def add(self, task: str, payload: dict) -> None:
+        """
+        Stages a message in the caller's transaction; it becomes visible to
+        the relay only if that transaction commits.
+        """
+        self.db.add(models.OutboxMessage(task=task, payload=payload))
+
+    async def claim_batch(self, limit: int) -> list[models.OutboxMessage]:
+        """
+        Locks the oldest pending messages. SKIP LOCKED lets several relays
+        run side by side without handing out the same rows twice.
+        """
+        result = await self.db.execute(
+            select(models.OutboxMessage)
+            .order_by(models.OutboxMessage.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result.scalars().all())
+
+    async def delete(self, ids: list[int]) -> None:
+        await self.db.execute(
+            delete(models.OutboxMessage).where(models.OutboxMessage.id.in_(ids))
+        )
@@ -1,11 +1,40 @@
 from uuid import UUID
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, distinct, desc
+from sqlalchemy import bindparam, select, func
 from sqlalchemy.orm import selectinload
 from app import models
 
 
+def _with_counts():
+    # Correlated counts use the per-post indexes and, unlike joining likes
+    # and comments together, don't multiply rows before aggregating.
+    likes_count = (
+        select(func.count())
+        .where(models.Like.post_id == models.Post.id)
+        .correlate(models.Post)
+        .scalar_subquery()
+    )
+    comments_count = (
+        select(func.count())
+        .where(
+            models.Comment.post_id == models.Post.id,
+            # Lets partitioned comments prune months before the post.
+            models.Comment.created_at >= models.Post.created_at
+        )
+        .correlate(models.Post)
+        .scalar_subquery()
+    )
+    return select(
+        models.Post,
+        likes_count.label("likes_count"),
+        comments_count.label("comments_count"),
+    ).options(selectinload(models.Post.author))
+
+
+_BY_ID = _with_counts().where(models.Post.id == bindparam("post_id"))
+
+
 class PostRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -15,26 +44,7 @@ class PostRepository:
         Fetches a single post with its like and comment counts.
         Returns a dictionary with 'post', 'likes_count', and 'comments_count'.
         """
-        stmt = (
-            select(
-                models.Post,
-                func.count(distinct(models.Like.id)).label("likes_count"),
-                func.count(distinct(models.Comment.id)).label("comments_count"),
-            )
-            .outerjoin(models.Like, models.Post.id == models.Like.post_id)
-            .outerjoin(models.Comment, models.Post.id == models.Comment.post_id)
-            .options(
-                selectinload(models.Post.author),
-                # We don't selectinload likes/comments mostly because we have counts,
-                # but if the frontend needs the actual list, we might need a separate query or strictly limited load.
-                # For details view, we might want the actual comments, but let's stick to the base requirement of counts first.
-                # The service can fetch comments separately if needed (it does).
-            )
-            .filter(models.Post.id == post_id)
-            .group_by(models.Post.id)
-        )
-
-        result = await self.db.execute(stmt)
+        result = await self.db.execute(_BY_ID, {"post_id": post_id})
         row = result.first()
         if not row:
             return None
@@ -58,89 +68,57 @@ class PostRepository:
         Fetches a paginated list of posts with counts.
         Returns (list_of_dicts_with_counts, total_count).
         """
-        # Base query for filtering
-        base_query = select(models.Post)
-
+        filters = []
         if search:
             search_filter = f"%{search}%"
-            base_query = base_query.filter(
+            filters.append(
                 (models.Post.title.ilike(search_filter)) |
                 (models.Post.content.ilike(search_filter))
             )
-
         if date_from:
-            base_query = base_query.filter(models.Post.created_at >= date_from)
-
+            filters.append(models.Post.created_at >= date_from)
         if date_to:
-            base_query = base_query.filter(models.Post.created_at <= date_to)
+            filters.append(models.Post.created_at <= date_to)
 
-        # Count total matches (efficiently)
-        count_stmt = select(func.count()).select_from(base_query.subquery())
-        total_result = await self.db.execute(count_stmt)
+        total_result = await self.db.execute(
+            select(func.count()).select_from(models.Post).where(*filters)
+        )
         total = total_result.scalar() or 0
 
-        # Main Data Query with Aggregation
-        # We need to apply the same filters to the main query
-        stmt = (
-            select(
-                models.Post,
-                func.count(distinct(models.Like.id)).label("likes_count"),
-                func.count(distinct(models.Comment.id)).label("comments_count"),
-            )
-            .outerjoin(models.Like, models.Post.id == models.Like.post_id)
-            .outerjoin(models.Comment, models.Post.id == models.Comment.post_id)
-            .options(selectinload(models.Post.author))
-            .group_by(models.Post.id)
+        # Matches ix_posts_created_at_id_desc, so the page is read straight off
+        # the index; counts are then computed for that page only. Ids are
+        # time-ordered, so same-timestamp posts still come newest first.
+        order = (models.Post.created_at.desc(), models.Post.id.desc())
+        page_ids = (
+            select(models.Post.id)
+            .where(*filters)
+            .order_by(*order)
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+            .subquery()
         )
-
-        # Apply filters again (or construct efficiently)
-        # Note: In SQLAlchemy 1.4/2.0+ reuse of the where clauses is easy.
-        # But since I constructed base_query separately, I'll re-apply filters to stmt.
-        # A cleaner way is to build the conditions first.
-        
-        if search:
-            search_filter = f"%{search}%"
-            stmt = stmt.filter(
-                (models.Post.title.ilike(search_filter)) |
-                (models.Post.content.ilike(search_filter))
-            )
-        if date_from:
-            stmt = stmt.filter(models.Post.created_at >= date_from)
-        if date_to:
-            stmt = stmt.filter(models.Post.created_at <= date_to)
-
-        stmt = stmt.order_by(models.Post.created_at.desc())
-        stmt = stmt.offset((page - 1) * page_size).limit(page_size)
+        stmt = _with_counts().join(page_ids, page_ids.c.id == models.Post.id).order_by(*order)
 
         result = await self.db.execute(stmt)
-        rows = result.all()
-
-        # Convert rows to list of dicts/structure service expects
-        results = []
-        for row in rows:
-            post, likes_count, comments_count = row
-            results.append({
-                "post": post,
-                "likes_count": likes_count,
-                "comments_count": comments_count
-            })
+        results = [
+            {"post": post, "likes_count": likes_count, "comments_count": comments_count}
+            for post, likes_count, comments_count in result.all()
+        ]
 
         return results, total
 
     async def create(self, post: models.Post) -> models.Post:
         self.db.add(post)
-        await self.db.commit()
-        await self.db.refresh(post)
+        await self.db.flush()
         return post
 
     async def update(self, post: models.Post) -> models.Post:
-        await self.db.commit()
-        await self.db.refresh(post)
+        await self.db.flush()
         return post
 
     async def delete(self, post: models.Post) -> None:
         await self.db.delete(post)
-        await self.db.commit()
+        await self.db.flush()
 
     async def get_posts_by_author(self, author_id: UUID) -> list[models.Post]:
         # Keeping this simple for now as it's likely internal or less used. 
@@ -1,46 +1,104 @@
 from uuid import UUID
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import bindparam, select, func, insert, delete, update
 from sqlalchemy.orm import selectinload
 from app import models
 
+# Hot lookups are built once with bound parameters: executing a prebuilt
+# statement skips constructing it and recomputing its cache key per call.
+_BY_EMAIL = select(models.User).where(models.User.email == bindparam("email"))
+_BY_USERNAME = select(models.User).where(models.User.username == bindparam("username"))
+
 
 class UserRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
     async def get_by_email(self, email: str) -> models.User | None:
-        result = await self.db.execute(
-            select(models.User).filter(models.User.email == email)
-        )
+        result = await self.db.execute(_BY_EMAIL, {"email": email})
         return result.scalars().first()
 
     async def get_by_username(self, username: str) -> models.User | None:
-        result = await self.db.execute(
-            select(models.User).filter(models.User.username == username)
-        )
+        result = await self.db.execute(_BY_USERNAME, {"username": username})
         return result.scalars().first()
 
     async def get_by_id(self, user_id: UUID) -> models.User | None:
-        result = await self.db.execute(
-            select(models.User).filter(models.User.id == user_id)
-        )
-        return result.scalars().first()
+        # Session.get answers from the identity map when the user is already
+        # loaded (e.g. by get_current_user) instead of querying again.
+        return await self.db.get(models.User, user_id)
 
     async def create(self, user: models.User) -> models.User:
         self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
+        await self.db.flush()
         return user
 
+    async def insert(self, **values) -> models.User:
+        """
+        Inserts a user without committing and returns the row via RETURNING,
+        so callers can add dependent rows to the same transaction.
+        Unique violations surface as IntegrityError.
+        """
+        result = await self.db.scalars(
+            insert(models.User).returning(models.User),
+            [values]
+        )
+        return result.one()
+
+    async def mark_verified(self, user_id: UUID) -> models.User | None:
+        result = await self.db.scalars(
+            update(models.User)
+            .where(models.User.id == user_id)
+            .values(is_verified=True)
+            .returning(models.User)
+        )
+        return result.first()
+
+    async def get_token_version(self, user_id: UUID) -> int | None:
+        user = await self.get_by_id(user_id)
+        return user.token_version if user else None
+
+    async def set_token_version(self, user_id: UUID, version: int) -> int | None:
+        result = await self.db.scalars(
+            update(models.User)
+            .where(models.User.id == user_id)
+            .values(token_version=version)
+            .returning(models.User.token_version)
+        )
+        return result.first()
+
     async def update(self, user: models.User) -> models.User:
-        await self.db.commit()
-        await self.db.refresh(user)
+        await self.db.flush()
         return user
 
     async def delete(self, user: models.User) -> None:
         await self.db.delete(user)
-        await self.db.commit()
+        await self.db.flush()
+
+    def _unverified_before(self, cutoff: datetime):
+        return select(models.User.id).where(
+            models.User.is_verified == False,
+            models.User.created_at < cutoff
+        )
+
+    async def count_unverified_before(self, cutoff: datetime) -> int:
+        result = await self.db.execute(
+            select(func.count()).select_from(self._unverified_before(cutoff).subquery())
+        )
+        return result.scalar() or 0
+
+    async def delete_unverified_batch(self, cutoff: datetime, limit: int) -> int:
+        """
+        Deletes up to `limit` stale unverified users in one statement without
+        loading them; posts, comments, likes and tokens go with them through
+        the ON DELETE CASCADE foreign keys.
+        """
+        result = await self.db.execute(
+            delete(models.User)
+            .where(models.User.id.in_(self._unverified_before(cutoff).limit(limit)))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
 
     async def get_all_with_posts(
         self,
@@ -54,7 +112,7 @@ class UserRepository:
         result = await self.db.execute(
             select(models.User)
             .options(selectinload(models.User.posts))
-            .order_by(models.User.created_at.desc())
+            .order_by(models.User.created_at.desc(), models.User.id.desc())
             .offset((page - 1) * page_size)
             .limit(page_size)
         )
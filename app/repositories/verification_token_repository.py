@@ -0,0 +1,35 @@
+from uuid import UUID
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from app import models
+
+
+class VerificationTokenRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def add(self, user_id: UUID, token: str, expires_at: datetime) -> None:
+        self.db.add(models.EmailVerificationToken(user_id=user_id, token=token, expires_at=expires_at))
+
+    async def get_by_token(self, token: str) -> models.EmailVerificationToken | None:
+        result = await self.db.execute(
+            select(models.EmailVerificationToken)
+            .filter(models.EmailVerificationToken.token == token)
+        )
+        return result.scalars().first()
+
+    async def delete_for_user(self, user_id: UUID) -> None:
+        await self.db.execute(
+            delete(models.EmailVerificationToken)
+            .where(models.EmailVerificationToken.user_id == user_id)
+        )
+
+    async def delete_expired_batch(self, now: datetime, limit: int) -> int:
+        Token = models.EmailVerificationToken
+        result = await self.db.execute(
+            delete(Token)
+            .where(Token.id.in_(select(Token.id).where(Token.expires_at < now).limit(limit)))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -1,37 +1,27 @@
-from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, Query
 
-from app import schemas, models
-from app.dependencies import get_db
+from app import schemas
+from app.dependencies import get_cleanup_service, UnitOfWorkRoute
 from app.core.config import settings
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from app.core.statement_timeout import statement_timeout
+from app.services.cleanup_service import CleanupService
 
-router = APIRouter()
+router = APIRouter(
+    route_class=UnitOfWorkRoute,
+    dependencies=[Depends(statement_timeout(settings.DB_ADMIN_STATEMENT_TIMEOUT), scope="function")]
+)
 
 
 @router.post("/cleanup-unverified", response_model=schemas.MessageResponse)
 async def cleanup_unverified_users(
     hours: int = Query(default=None),
-    db: AsyncSession = Depends(get_db)
+    dry_run: bool = Query(default=False),
+    cleanup_service: CleanupService = Depends(get_cleanup_service)
 ):
     cleanup_hours = hours if hours is not None else settings.UNVERIFIED_USER_CLEANUP_HOURS
-    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=cleanup_hours)
-
-    result = await db.execute(
-        select(models.User).filter(
-            models.User.is_verified == False,
-            models.User.created_at < cutoff_time
-        )
-    )
-    users_to_delete = result.scalars().all()
-    count = len(users_to_delete)
-
-    for user in users_to_delete:
-        await db.delete(user)
-
-    await db.commit()
+    count = await cleanup_service.delete_unverified_users(cleanup_hours, dry_run=dry_run)
 
+    verb = "Would delete" if dry_run else "Deleted"
     return schemas.MessageResponse(
-        message=f"Deleted {count} unverified users older than {cleanup_hours} hours"
+        message=f"{verb} {count} unverified users older than {cleanup_hours} hours"
     )
@@ -3,11 +3,11 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import schemas, models
-from app.dependencies import get_db, get_auth_service, get_current_user
+from app.dependencies import get_db, get_auth_service, get_current_user, get_token_claims, UnitOfWorkRoute
 from app.services.auth_service import AuthService
-from app.core.limiter import limiter
+from app.core.limiter import get_remote_address_key, limiter
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 @router.post("/register", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
@@ -20,7 +20,7 @@ async def register(
 
 
 @router.post("/login", response_model=schemas.Token)
-@limiter.limit("5/minute")
+@limiter.limit("5/minute", key_func=get_remote_address_key)
 async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
@@ -34,6 +34,23 @@ async def login(
     return await service.login(login_data)
 
 
+@router.post("/refresh", response_model=schemas.Token)
+async def refresh(
+    refresh_data: schemas.RefreshRequest,
+    service: AuthService = Depends(get_auth_service)
+):
+    return await service.refresh(refresh_data.refresh_token)
+
+
+@router.post("/logout", response_model=schemas.MessageResponse)
+async def logout(
+    refresh_data: schemas.RefreshRequest,
+    service: AuthService = Depends(get_auth_service)
+):
+    await service.logout(refresh_data.refresh_token)
+    return schemas.MessageResponse(message="Logged out")
+
+
 @router.get("/me", response_model=schemas.UserResponse)
 async def get_me(current_user: models.User = Depends(get_current_user)):
     return current_user
@@ -54,4 +71,13 @@ async def resend_verification(
     service: AuthService = Depends(get_auth_service)
 ):
     await service.resend_verification(current_user)
-    return schemas.MessageResponse(message="Verification email sent")
\ No newline at end of file
+    return schemas.MessageResponse(message="Verification email sent")
+
+
+@router.post("/logout-all", response_model=schemas.MessageResponse)
+async def logout_all(
+    claims: schemas.TokenClaims = Depends(get_token_claims),
+    service: AuthService = Depends(get_auth_service)
+):
+    await service.revoke_tokens(claims.id)
+    return schemas.MessageResponse(message="All sessions have been logged out")
\ No newline at end of file
@@ -2,10 +2,15 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Query
 
 from app import schemas
-from app.dependencies import get_feed_service
+from app.core.config import settings
+from app.core.statement_timeout import statement_timeout
+from app.dependencies import get_feed_service, UnitOfWorkRoute
 from app.services.feed_service import FeedService
 
-router = APIRouter()
+router = APIRouter(
+    route_class=UnitOfWorkRoute,
+    dependencies=[Depends(statement_timeout(settings.DB_LIST_STATEMENT_TIMEOUT), scope="function")]
+)
 
 
 @router.get("", response_model=schemas.PaginatedResponse)
@@ -4,28 +4,38 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 
 from app import schemas, models
+from app.core.config import settings
+from app.core.statement_timeout import statement_timeout
 from app.dependencies import (
     get_current_user,
     get_current_verified_user,
+    get_verified_claims,
     get_post_service,
     get_comment_service,
-    get_like_service
+    get_like_service,
+    get_read_post_service,
+    get_read_comment_service,
+    UnitOfWorkRoute
 )
 from app.services.post_service import PostService
 from app.services.comment_service import CommentService
 from app.services.like_service import LikeService
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
-@router.get("", response_model=schemas.PaginatedResponse)
+@router.get(
+    "",
+    response_model=schemas.PaginatedResponse,
+    dependencies=[Depends(statement_timeout(settings.DB_LIST_STATEMENT_TIMEOUT), scope="function")]
+)
 async def list_posts(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     search: Optional[str] = Query(None),
     date_from: Optional[datetime] = Query(None),
     date_to: Optional[datetime] = Query(None),
-    service: PostService = Depends(get_post_service)
+    service: PostService = Depends(get_read_post_service)
 ):
     results, total = await service.get_posts(
         page=page,
@@ -93,8 +103,8 @@ async def create_post(
 @router.get("/{post_id}", response_model=schemas.PostDetailResponse)
 async def get_post(
     post_id: UUID,
-    service: PostService = Depends(get_post_service),
-    comment_service: CommentService = Depends(get_comment_service)
+    service: PostService = Depends(get_read_post_service),
+    comment_service: CommentService = Depends(get_read_comment_service)
 ):
     details = await service.get_post_with_details(post_id)
     post = details["post"]
@@ -138,7 +148,7 @@ async def get_post(
 async def update_post(
     post_id: UUID,
     post_data: schemas.PostUpdate,
-    current_user: models.User = Depends(get_current_verified_user),
+    current_user: schemas.TokenClaims = Depends(get_verified_claims),
     service: PostService = Depends(get_post_service)
 ):
     post = await service.update_post(post_id, post_data, current_user)
@@ -164,7 +174,7 @@ async def update_post(
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_post(
     post_id: UUID,
-    current_user: models.User = Depends(get_current_verified_user),
+    current_user: schemas.TokenClaims = Depends(get_verified_claims),
     service: PostService = Depends(get_post_service)
 ):
     await service.delete_post(post_id, current_user)
@@ -173,8 +183,8 @@ async def delete_post(
 @router.get("/{post_id}/comments", response_model=list[schemas.CommentResponse])
 async def list_comments(
     post_id: UUID,
-    service: PostService = Depends(get_post_service),
-    comment_service: CommentService = Depends(get_comment_service)
+    service: PostService = Depends(get_read_post_service),
+    comment_service: CommentService = Depends(get_read_comment_service)
 ):
     await service.get_post(post_id)
     comments = await comment_service.get_comments(post_id)
@@ -224,10 +234,10 @@ async def create_comment(
 async def delete_comment(
     post_id: UUID,
     comment_id: UUID,
-    current_user: models.User = Depends(get_current_verified_user),
+    current_user: schemas.TokenClaims = Depends(get_verified_claims),
     comment_service: CommentService = Depends(get_comment_service)
 ):
-    await comment_service.delete_comment(comment_id, current_user)
+    await comment_service.delete_comment(post_id, comment_id, current_user)
 
 
 @router.post("/{post_id}/like", response_model=schemas.LikeResponse, status_code=status.HTTP_201_CREATED)
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app import schemas, models
-from app.dependencies import get_current_user, get_user_repository
+from app.dependencies import get_current_user, get_user_repository, UnitOfWorkRoute
 from app.repositories.user_repository import UserRepository
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 @router.patch("/me", response_model=schemas.UserResponse)
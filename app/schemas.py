@@ -87,6 +87,19 @@ class UserProfile(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class TokenClaims(BaseModel):
+    id: UUID
+    username: str
+    is_verified: bool
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class LoginRequest(BaseModel):
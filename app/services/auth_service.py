@@ -1,66 +1,119 @@
 from uuid import UUID
-from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from redis.exceptions import RedisError
 
 from app import models, schemas
 from app.core.security import (
     get_password_hash,
-    verify_password,
-    create_access_token,
-    generate_verification_token,
-    get_verification_token_expiry
+    verify_and_update_password,
+    create_access_token
+)
+from app.core.token_version import get_token_version, bump_token_version
+from app.core.refresh_tokens import (
+    InvalidRefreshToken,
+    issue_refresh_token,
+    rotate_refresh_token,
+    revoke_family,
+    revoke_refresh_token
+)
+from app.core.verification_tokens import (
+    ExpiredVerificationToken,
+    InvalidVerificationToken,
+    VerificationTokenStore
 )
 from app.repositories.user_repository import UserRepository
-from app.tasks import send_email_task
+from app.repositories.outbox_repository import OutboxRepository
+from app.tasks import send_email_batch_task
+
+
+def _conflicting_field(exc: IntegrityError) -> str | None:
+    # Postgres reports the index name, SQLite the column.
+    message = str(exc.orig)
+    if "ix_users_email" in message or "users.email" in message:
+        return "email"
+    if "ix_users_username" in message or "users.username" in message:
+        return "username"
+    return None
+
+
+def _token_store_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Verification token store unavailable"
+    )
+
+
+def _session_store_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Session store unavailable"
+    )
+
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
 
 class AuthService:
-    def __init__(self, user_repo: UserRepository, db: AsyncSession):
+    def __init__(
+        self,
+        user_repo: UserRepository,
+        outbox_repo: OutboxRepository,
+        token_store: VerificationTokenStore,
+        db: AsyncSession
+    ):
         self.user_repo = user_repo
+        self.outbox_repo = outbox_repo
+        self.token_store = token_store
         self.db = db
 
+    def _queue_verification_email(self, email: str, token: str) -> None:
+        # Committed together with the token, so an email is sent iff the token exists.
+        self.outbox_repo.add(send_email_batch_task.name, {"email": email, "token": token})
+
     async def register(self, user_data: schemas.UserCreate) -> models.User:
-        existing_email = await self.user_repo.get_by_email(user_data.email)
-        if existing_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
+        hashed_pwd = await run_in_threadpool(get_password_hash, user_data.password)
+
+        # One transaction: the unique indexes on email/username detect conflicts,
+        # which also closes the race a check-then-insert would leave open.
+        try:
+            saved_user = await self.user_repo.insert(
+                email=user_data.email,
+                username=user_data.username,
+                full_name=user_data.full_name,
+                password_hash=hashed_pwd,
+                is_verified=False
             )
-
-        existing_username = await self.user_repo.get_by_username(user_data.username)
-        if existing_username:
+            # A new user has no earlier token to revoke.
+            token = await self.token_store.issue(saved_user.id, replace=False)
+            self._queue_verification_email(saved_user.email, token)
+        except RedisError:
+            await self.db.rollback()
+            raise _token_store_unavailable()
+        except IntegrityError as exc:
+            await self.db.rollback()
+            field = _conflicting_field(exc)
+            if field is None:
+                raise
+            # The database reports whichever index it checked first; keep the
+            # email message taking precedence when both collide.
+            if field == "email" or await self.user_repo.get_by_email(user_data.email):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Email already registered"
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already taken"
             )
 
-        hashed_pwd = get_password_hash(user_data.password)
-
-        new_user = models.User(
-            email=user_data.email,
-            username=user_data.username,
-            full_name=user_data.full_name,
-            password_hash=hashed_pwd,
-            is_verified=False
-        )
-
-        saved_user = await self.user_repo.create(new_user)
-
-        token = generate_verification_token()
-        expires_at = get_verification_token_expiry()
-
-        verification_token = models.EmailVerificationToken(
-            user_id=saved_user.id,
-            token=token,
-            expires_at=expires_at
-        )
-        self.db.add(verification_token)
-        await self.db.commit()
-
-        send_email_task.delay(saved_user.email, token)
-
         return saved_user
 
     async def login(self, login_data: schemas.LoginRequest) -> schemas.Token:
@@ -76,51 +129,107 @@ class AuthService:
         elif login_data.username:
             user = await self.user_repo.get_by_username(login_data.username)
 
-        if not user or not verify_password(login_data.password, user.password_hash):
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        access_token = create_access_token(data={"sub": str(user.id)})
-        return schemas.Token(access_token=access_token)
+        # Nothing is written yet; ending the read transaction returns the
+        # connection to the pool instead of holding it while bcrypt runs.
+        await self.db.commit()
 
-    async def verify_email(self, token: str) -> models.User:
-        result = await self.db.execute(
-            select(models.EmailVerificationToken)
-            .filter(models.EmailVerificationToken.token == token)
+        # bcrypt releases the GIL, so verifying off the event loop keeps other requests moving.
+        is_valid, new_hash = await run_in_threadpool(
+            verify_and_update_password, login_data.password, user.password_hash
         )
-        verification_token = result.scalars().first()
-
-        if not verification_token:
+        if not is_valid:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid verification token"
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Incorrect credentials",
+                headers={"WWW-Authenticate": "Bearer"},
             )
 
-        if verification_token.expires_at < datetime.utcnow():
+        if new_hash:
+            user.password_hash = new_hash
+            await self.user_repo.update(user)
+
+        # The user row is already loaded, so a cache miss costs no query.
+        token_version = await get_token_version(self.user_repo, user.id)
+        access_token = create_access_token(
+            data={"sub": str(user.id)},
+            username=user.username,
+            is_verified=user.is_verified,
+            token_version=token_version
+        )
+        try:
+            refresh_token = await issue_refresh_token(user.id, token_version)
+        except RedisError:
+            # Login still works without the session store; the client just can't refresh.
+            refresh_token = None
+        return schemas.Token(access_token=access_token, refresh_token=refresh_token)
+
+    async def refresh(self, refresh_token: str) -> schemas.Token:
+        try:
+            session, new_refresh_token = await rotate_refresh_token(refresh_token)
+        except InvalidRefreshToken:
+            raise _invalid_refresh_token()
+        except RedisError:
+            raise _session_store_unavailable()
+
+        # Claims come from the database, not the login the session started with.
+        user = await self.user_repo.get_by_id(UUID(session.user_id))
+        if user is None or session.token_version != await get_token_version(self.user_repo, user.id):
+            try:
+                await revoke_family(session.family)
+            except RedisError:
+                raise _session_store_unavailable()
+            raise _invalid_refresh_token()
+
+        access_token = create_access_token(
+            data={"sub": session.user_id},
+            username=user.username,
+            is_verified=user.is_verified,
+            token_version=session.token_version
+        )
+        return schemas.Token(access_token=access_token, refresh_token=new_refresh_token)
+
+    async def logout(self, refresh_token: str) -> None:
+        try:
+            await revoke_refresh_token(refresh_token)
+        except RedisError:
+            raise _session_store_unavailable()
+
+    async def revoke_tokens(self, user_id: UUID) -> None:
+        try:
+            await bump_token_version(self.user_repo, user_id)
+        except RedisError:
+            raise _session_store_unavailable()
+
+    async def verify_email(self, token: str) -> models.User:
+        try:
+            user_id = await self.token_store.consume(token)
+        except ExpiredVerificationToken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Verification token has expired"
             )
+        except InvalidVerificationToken:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid verification token"
+            )
+        except RedisError:
+            raise _token_store_unavailable()
 
-        user = await self.user_repo.get_by_id(verification_token.user_id)
+        user = await self.user_repo.mark_verified(user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
 
-        user.is_verified = True
-        await self.db.commit()
-
-        await self.db.execute(
-            delete(models.EmailVerificationToken)
-            .where(models.EmailVerificationToken.user_id == user.id)
-        )
-        await self.db.commit()
-
         return user
 
     async def resend_verification(self, user: models.User) -> None:
@@ -130,20 +239,8 @@ class AuthService:
                 detail="User is already verified"
             )
 
-        await self.db.execute(
-            delete(models.EmailVerificationToken)
-            .where(models.EmailVerificationToken.user_id == user.id)
-        )
-
-        token = generate_verification_token()
-        expires_at = get_verification_token_expiry()
-
-        verification_token = models.EmailVerificationToken(
-            user_id=user.id,
-            token=token,
-            expires_at=expires_at
-        )
-        self.db.add(verification_token)
-        await self.db.commit()
-
-        send_email_task.delay(user.email, token)
+        try:
+            token = await self.token_store.issue(user.id)
+        except RedisError:
+            raise _token_store_unavailable()
+        self._queue_verification_email(user.email, token)
@@ -0,0 +1,80 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.repositories.user_repository import UserRepository
+from app.repositories.verification_token_repository import VerificationTokenRepository
+
+logger = logging.getLogger(__name__)
+
+
+class CleanupService:
+    def __init__(self, user_repo: UserRepository, token_repo: VerificationTokenRepository, db: AsyncSession):
+        self.user_repo = user_repo
+        self.token_repo = token_repo
+        self.db = db
+
+    async def _delete_in_batches(
+        self,
+        what: str,
+        delete_batch: Callable[[int], Awaitable[int]],
+        batch_size: int,
+        max_batches: int | None,
+        on_progress: Callable[[int], None] | None
+    ) -> int:
+        # One commit per chunk keeps locks and WAL small, and an interrupted
+        # run keeps the work already done.
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            deleted = await delete_batch(batch_size)
+            await self.db.commit()
+            total += deleted
+            batches += 1
+            if deleted:
+                logger.info("Deleted %s %s so far", total, what)
+                if on_progress:
+                    on_progress(total)
+            if deleted < batch_size:
+                break
+        return total
+
+    async def delete_unverified_users(
+        self,
+        hours: int | None = None,
+        batch_size: int = settings.CLEANUP_BATCH_SIZE,
+        dry_run: bool = False,
+        max_batches: int | None = None,
+        on_progress: Callable[[int], None] | None = None
+    ) -> int:
+        """
+        Deletes unverified users older than `hours` in chunks of `batch_size`,
+        stopping after `max_batches` if given. With dry_run, only counts them.
+        """
+        cleanup_hours = hours if hours is not None else settings.UNVERIFIED_USER_CLEANUP_HOURS
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=cleanup_hours)
+
+        if dry_run:
+            return await self.user_repo.count_unverified_before(cutoff_time)
+
+        return await self._delete_in_batches(
+            "unverified users",
+            lambda limit: self.user_repo.delete_unverified_batch(cutoff_time, limit),
+            batch_size, max_batches, on_progress
+        )
+
+    async def prune_expired_tokens(
+        self,
+        batch_size: int = settings.CLEANUP_BATCH_SIZE,
+        max_batches: int | None = None,
+        on_progress: Callable[[int], None] | None = None
+    ) -> int:
+        # Token expiries are stored as naive UTC.
+        now = datetime.utcnow()
+        return await self._delete_in_batches(
+            "expired verification tokens",
+            lambda limit: self.token_repo.delete_expired_batch(now, limit),
+            batch_size, max_batches, on_progress
+        )
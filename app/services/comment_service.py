@@ -27,10 +27,11 @@ class CommentService:
 
     async def delete_comment(
         self,
+        post_id: UUID,
         comment_id: UUID,
-        current_user: models.User
+        current_user: schemas.TokenClaims
     ) -> None:
-        comment = await self.comment_repo.get_by_id(comment_id)
+        comment = await self.comment_repo.get_by_id(comment_id, post_id)
 
         if not comment:
             raise HTTPException(
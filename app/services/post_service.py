@@ -61,7 +61,7 @@ class PostService:
         self,
         post_id: UUID,
         post_data: schemas.PostUpdate,
-        current_user: models.User
+        current_user: schemas.TokenClaims
     ) -> models.Post:
         post = await self.get_post(post_id)
 
@@ -78,7 +78,7 @@ class PostService:
 
         return await self.post_repo.update(post)
 
-    async def delete_post(self, post_id: UUID, current_user: models.User) -> None:
+    async def delete_post(self, post_id: UUID, current_user: schemas.TokenClaims) -> None:
         post = await self.get_post(post_id)
 
         if post.author_id != current_user.id:
@@ -1,9 +1,77 @@
-from asgiref.sync import async_to_sync
-from app.core.email import send_verification_email
-from app.core.celery_app import celery
+import logging
+from app.core.config import settings
+from app.core.email import EmailJob, send_verification_email, send_verification_emails
+from app.core.jobs import run_exclusive_job
+from app.core.partitions import ensure_comment_partitions
+from app.core.smtp_pool import close_smtp_pool
+from app.core.task_backend import Retry, task
+from app.core.worker_loop import on_loop_shutdown
+from app.database import AsyncSessionLocal, engine
+from app.repositories.user_repository import UserRepository
+from app.repositories.verification_token_repository import VerificationTokenRepository
+from app.services.cleanup_service import CleanupService
 
+logger = logging.getLogger(__name__)
 
-@celery.task(name="app.tasks.send_email_task")
-def send_email_task(email: str, token: str):
-    async_to_sync(send_verification_email)(email, token, None)
-    return f"Email sent to {email}"
\ No newline at end of file
+# Pooled SMTP sessions and DB connections live as long as the worker loop;
+# close them on shutdown.
+on_loop_shutdown(close_smtp_pool)
+on_loop_shutdown(engine.dispose)
+
+
+@task("app.tasks.send_email_task", priority=0)
+async def send_email_task(email: str, token: str):
+    await send_verification_email(email, token, None)
+    return f"Email sent to {email}"
+
+
+@task("app.tasks.send_email_batch_task", max_retries=5, priority=0)
+async def send_email_batch_task(jobs: list[dict]):
+    failed = await send_verification_emails([EmailJob(**job) for job in jobs])
+
+    for failure in failed:
+        if not failure.retryable:
+            logger.error("Dropping verification email to %s: %s", failure.job.email, failure.error)
+
+    retryable = [{"email": f.job.email, "token": f.job.token} for f in failed if f.retryable]
+    if retryable:
+        # Only the failed recipients go back on the queue.
+        raise Retry(args=[retryable])
+
+    return f"Sent {len(jobs) - len(failed)} of {len(jobs)} emails"
+
+
+async def _run_cleanup(name: str, work) -> int | None:
+    async def job() -> int:
+        async with AsyncSessionLocal() as session:
+            service = CleanupService(UserRepository(session), VerificationTokenRepository(session), session)
+            return await work(service)
+
+    return await run_exclusive_job(name, job, lock_ttl=settings.MAINTENANCE_LOCK_TTL)
+
+
+# Scheduled jobs: a missed run is simply picked up by the next one.
+@task("app.tasks.cleanup_unverified_users", max_retries=0)
+async def cleanup_unverified_users_task():
+    return await _run_cleanup(
+        "cleanup_unverified_users",
+        lambda service: service.delete_unverified_users(max_batches=settings.CLEANUP_MAX_BATCHES_PER_RUN)
+    )
+
+
+@task("app.tasks.prune_expired_verification_tokens", max_retries=0)
+async def prune_expired_verification_tokens_task():
+    return await _run_cleanup(
+        "prune_expired_verification_tokens",
+        lambda service: service.prune_expired_tokens(max_batches=settings.CLEANUP_MAX_BATCHES_PER_RUN)
+    )
+
+
+@task("app.tasks.create_comment_partitions", max_retries=0)
+async def create_comment_partitions_task():
+    # Idempotent, and months ahead of need: a failed run is retried by the next.
+    async with engine.begin() as conn:
+        created = await conn.run_sync(ensure_comment_partitions)
+    if created:
+        logger.info("Created %s comment partitions", created)
+    return created
@@ -0,0 +1,114 @@
+"""
+Measures what storing task results costs the Redis result backend: keys and
+bytes left behind, and publish/complete time for tasks that store a result
+versus ones that ignore it. The broker is in-memory so only result handling
+touches Redis.
+
+Pass --redis-url to measure a real server; by default an in-process fake
+is started (requires: pip install fakeredis).
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for name, value in {
+    "DATABASE_URL": "sqlite+aiosqlite://",
+    "SECRET_KEY": "benchmark",
+    "MAIL_USERNAME": "benchmark",
+    "MAIL_PASSWORD": "benchmark",
+    "MAIL_FROM": "benchmark@example.com",
+}.items():
+    os.environ.setdefault(name, value)
+
+import redis
+from celery.contrib.testing.worker import start_worker
+
+from app.core.celery_app import celery
+
+completed = 0
+completed_lock = threading.Lock()
+
+
+def _finish(email: str) -> str:
+    global completed
+    with completed_lock:
+        completed += 1
+    return f"Email sent to {email}"
+
+
+@celery.task(name="benchmark.store_result", ignore_result=False)
+def store_result(email: str) -> str:
+    return _finish(email)
+
+
+@celery.task(name="benchmark.ignore_result", ignore_result=True)
+def ignore_result(email: str) -> str:
+    return _finish(email)
+
+
+def result_footprint(client: redis.Redis) -> tuple[int, int]:
+    keys = list(client.scan_iter("celery-task-meta-*"))
+    return len(keys), sum(client.strlen(key) for key in keys)
+
+
+def measure(task, count: int, client: redis.Redis) -> None:
+    global completed
+    client.flushdb()
+    completed = 0
+
+    started = time.perf_counter()
+    for i in range(count):
+        task.delay(f"user{i}@example.com")
+    published = time.perf_counter() - started
+    while completed < count:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - started
+    # The worker stores the result after the task body returns.
+    time.sleep(0.2)
+
+    keys, size = result_footprint(client)
+    print(
+        f"{task.name:>24}: publish {published / count * 1000:.3f} ms/task, "
+        f"total {count / elapsed:.0f} tasks/s, {keys} result keys, {size} bytes"
+    )
+
+
+def run(redis_url: str | None, count: int) -> None:
+    server = None
+    if redis_url is None:
+        from fakeredis import TcpFakeServer
+
+        server = TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+        redis_url = f"redis://{host}:{port}/0"
+
+    celery.conf.update(
+        broker_url="memory://",
+        result_backend=redis_url,
+        task_default_queue="benchmark",
+        task_queues=None,
+        task_routes=None,
+    )
+    client = redis.Redis.from_url(redis_url)
+
+    try:
+        with start_worker(celery, perform_ping_check=False, loglevel="WARNING", queues=["benchmark"]):
+            for task in (store_result, ignore_result):
+                measure(task, count, client)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Result backend cost of stored vs ignored task results")
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+
+    run(args.redis_url, args.count)
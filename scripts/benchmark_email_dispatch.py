@@ -0,0 +1,97 @@
+"""
+Compares one Celery task per email with batched send_email_batch_task
+dispatch. Runs a real worker on an in-memory broker against a local SMTP
+sink, so the numbers include task overhead and SMTP session setup.
+
+Requires: pip install aiosmtpd
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for name, value in {
+    "DATABASE_URL": "sqlite+aiosqlite://",
+    "SECRET_KEY": "benchmark",
+    "MAIL_USERNAME": "benchmark",
+    "MAIL_PASSWORD": "benchmark",
+    "MAIL_FROM": "benchmark@example.com",
+}.items():
+    os.environ.setdefault(name, value)
+
+from aiosmtpd.controller import Controller
+from celery.contrib.testing.worker import start_worker
+from fastapi_mail import ConnectionConfig
+
+from app.core import email
+from app.core.celery_app import celery
+from app.tasks import send_email_task, send_email_batch_task
+
+
+class Sink:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def wait_for(sink: Sink, expected: int, timeout: float = 300) -> None:
+    deadline = time.monotonic() + timeout
+    while sink.received < expected:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"only {sink.received} of {expected} messages arrived")
+        time.sleep(0.01)
+
+
+def run(count: int, batch_size: int, port: int) -> None:
+    sink = Sink()
+    controller = Controller(sink, hostname="127.0.0.1", port=port)
+    controller.start()
+    email.conf = ConnectionConfig(
+        MAIL_USERNAME="benchmark",
+        MAIL_PASSWORD="benchmark",
+        MAIL_FROM="benchmark@example.com",
+        MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False,
+        VALIDATE_CERTS=False,
+    )
+    celery.conf.update(broker_url="memory://", result_backend="cache+memory://")
+
+    try:
+        with start_worker(celery, perform_ping_check=False, loglevel="WARNING"):
+            started = time.perf_counter()
+            for i in range(count):
+                send_email_task.celery.delay(f"user{i}@example.com", f"token{i}")
+            wait_for(sink, count)
+            elapsed = time.perf_counter() - started
+            print(f"{'per-message':>12}: {count} emails in {elapsed:.2f}s ({count / elapsed:.1f} msg/s)")
+
+            before = sink.received
+            started = time.perf_counter()
+            for offset in range(0, count, batch_size):
+                send_email_batch_task.celery.delay([
+                    {"email": f"user{i}@example.com", "token": f"token{i}"}
+                    for i in range(offset, min(offset + batch_size, count))
+                ])
+            wait_for(sink, before + count)
+            elapsed = time.perf_counter() - started
+            print(f"{'batched':>12}: {count} emails in {elapsed:.2f}s ({count / elapsed:.1f} msg/s)")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-message vs batched email task throughput")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8026)
+    args = parser.parse_args()
+
+    run(args.count, args.batch_size, args.port)
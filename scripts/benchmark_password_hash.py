@@ -0,0 +1,48 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.hash import bcrypt
+
+
+def _run(rounds: int, seconds: float) -> tuple[int, int]:
+    hasher = bcrypt.using(rounds=rounds)
+    stored_hash = hasher.hash("benchmark-password")
+
+    hashes = 0
+    deadline = time.perf_counter() + seconds / 2
+    while time.perf_counter() < deadline:
+        hasher.hash("benchmark-password")
+        hashes += 1
+
+    verifies = 0
+    deadline = time.perf_counter() + seconds / 2
+    while time.perf_counter() < deadline:
+        bcrypt.verify("benchmark-password", stored_hash)
+        verifies += 1
+
+    return hashes, verifies
+
+
+def benchmark(rounds_list: list[int], seconds: float, processes: int) -> None:
+    print(f"{'rounds':>6} {'hash ms':>9} {'hash/s/core':>12} {'verify/s/core':>14} {'verify/s total':>15}")
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for rounds in rounds_list:
+            results = list(pool.map(_run, [rounds] * processes, [seconds] * processes))
+            hashes = sum(r[0] for r in results) / processes / (seconds / 2)
+            verifies = sum(r[1] for r in results) / processes / (seconds / 2)
+            print(
+                f"{rounds:>6} {1000 / hashes:>9.1f} {hashes:>12.1f} "
+                f"{verifies:>14.1f} {verifies * processes:>15.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure bcrypt hash/verify throughput per core")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--seconds", type=float, default=4.0, help="Measurement time per cost per process")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="Worker processes, one per core")
+    args = parser.parse_args()
+
+    benchmark(args.rounds, args.seconds, args.processes)
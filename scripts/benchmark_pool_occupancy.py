@@ -0,0 +1,182 @@
+"""
+Measures how long requests hold pooled connections under concurrent load:
+sessions committed when the endpoint returns (UnitOfWorkRoute) versus
+sessions held until dependency teardown, after the response body has been
+serialized.
+
+Drives the real app in-process over ASGI against a seeded database with a
+deliberately small pool, so connection hold time turns into pool waits.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for name, value in {
+    "DATABASE_URL": "sqlite+aiosqlite://",
+    "SECRET_KEY": "benchmark",
+    "MAIL_USERNAME": "benchmark",
+    "MAIL_PASSWORD": "benchmark",
+    "MAIL_FROM": "benchmark@example.com",
+    "PASSWORD_HASH_ROUNDS": "4",
+    "TASK_BACKEND": "inprocess",
+}.items():
+    os.environ.setdefault(name, value)
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.core.db_pool import InstrumentedQueuePool
+from app.core.limiter import limiter
+from app.core.metrics import metrics
+from app.database import unit_of_work
+from app.dependencies import get_db
+from app.main import app
+
+
+class HoldTimes:
+    """
+    Per checkout: total hold time, and the idle tail between the last query
+    finishing and the connection going back to the pool.
+    """
+
+    def __init__(self):
+        self.holds = []
+        self.tails = []
+
+    def checkout(self, dbapi_connection, record, proxy):
+        record.info["checked_out_at"] = time.perf_counter()
+
+    def after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.connection._connection_record.info["last_query_at"] = time.perf_counter()
+
+    def checkin(self, dbapi_connection, record):
+        now = time.perf_counter()
+        started = record.info.pop("checked_out_at", None)
+        last_query = record.info.pop("last_query_at", None)
+        if started is not None:
+            self.holds.append(now - started)
+            self.tails.append(now - (last_query or started))
+
+
+async def seed(session_factory, posts: int) -> list[str]:
+    async with session_factory() as db:
+        users = [
+            models.User(email=f"bench{i}@example.com", username=f"bench{i}", full_name=f"Bench {i}", password_hash="x")
+            for i in range(20)
+        ]
+        db.add_all(users)
+        await db.flush()
+        start = datetime(2026, 1, 1)
+        rows = [
+            models.Post(author_id=users[i % 20].id, title=f"Post {i}", content="x" * 500, created_at=start + timedelta(minutes=i))
+            for i in range(posts)
+        ]
+        db.add_all(rows)
+        await db.flush()
+        for i, post in enumerate(rows):
+            db.add_all([
+                models.Comment(post_id=post.id, author_id=users[(i + j) % 20].id, content="comment " * 20)
+                for j in range(1, 6)
+            ])
+            db.add_all([models.Like(post_id=post.id, user_id=users[(i + j) % 20].id) for j in range(1, 6)])
+        await db.commit()
+        return [str(post.id) for post in rows]
+
+
+def override(session_factory, early_release: bool):
+    if early_release:
+        async def get_test_db():
+            async with session_factory() as session, unit_of_work(session):
+                yield session
+    else:
+        # Not registered as a unit of work, so the route can't end it early.
+        async def get_test_db():
+            async with session_factory() as session:
+                yield session
+                if session.in_transaction():
+                    await session.commit()
+    return get_test_db
+
+
+async def load(client: AsyncClient, post_ids: list[str], seconds: float, concurrency: int) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    paths = ["/posts?page_size=100"] + [f"/posts/{post_id}" for post_id in post_ids[:3]]
+
+    async def worker(offset: int):
+        i = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+            i += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return sorted(latencies)
+
+
+async def run(database_url: str, posts: int, pool_size: int, concurrency: int, seconds: float) -> None:
+    engine = create_async_engine(
+        database_url, poolclass=InstrumentedQueuePool, pool_size=pool_size, max_overflow=0, pool_timeout=60
+    )
+    engine.pool.metrics_name = "benchmark"
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.drop_all)
+        await conn.run_sync(models.Base.metadata.create_all)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    post_ids = await seed(session_factory, posts)
+
+    limiter.enabled = False
+    holds = HoldTimes()
+    event.listen(engine.sync_engine.pool, "checkout", holds.checkout)
+    event.listen(engine.sync_engine.pool, "checkin", holds.checkin)
+    event.listen(engine.sync_engine, "after_cursor_execute", holds.after_execute)
+
+    print(f"{posts} posts, pool of {pool_size}, {concurrency} concurrent clients, {seconds:.0f}s per mode")
+    for label, early_release in [("held until teardown", False), ("released on return", True)]:
+        app.dependency_overrides[get_db] = override(session_factory, early_release)
+        holds.holds.clear()
+        holds.tails.clear()
+        waits_before = metrics.get("db_pool_wait_seconds", pool="benchmark") or 0.0
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            started = time.perf_counter()
+            latencies = await load(client, post_ids, seconds, concurrency)
+            elapsed = time.perf_counter() - started
+
+        waited = (metrics.get("db_pool_wait_seconds", pool="benchmark") or 0.0) - waits_before
+        print(
+            f"{label:>20}: {len(latencies) / elapsed:.0f} req/s, "
+            f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms, "
+            f"hold mean {statistics.mean(holds.holds) * 1000:.2f} ms "
+            f"(idle after last query {statistics.mean(holds.tails) * 1000:.2f} ms), "
+            f"mean occupancy {sum(holds.holds) / elapsed:.2f}/{pool_size}, "
+            f"pool wait {waited / len(latencies) * 1000:.2f} ms/req"
+        )
+
+    app.dependency_overrides.pop(get_db, None)
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.drop_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pooled connection hold time with and without early session release")
+    parser.add_argument("--database-url", default=os.getenv("BENCHMARK_DATABASE_URL", "sqlite+aiosqlite:///./benchmark_pool.db"))
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.database_url, args.posts, args.pool_size, args.concurrency, args.seconds))
@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app import models, schemas
+from app.core.security import get_password_hash, generate_verification_token, get_verification_token_expiry
+from app.core.verification_tokens import DatabaseVerificationTokenStore
+from app.repositories.outbox_repository import OutboxRepository
+from app.repositories.user_repository import UserRepository
+from app.repositories.verification_token_repository import VerificationTokenRepository
+from app.services import auth_service
+
+
+async def register_legacy(db: AsyncSession, user_data: schemas.UserCreate) -> None:
+    """The pre-change flow: two lookups, then two separate commits plus a refresh."""
+    repo = UserRepository(db)
+    if await repo.get_by_email(user_data.email) or await repo.get_by_username(user_data.username):
+        raise ValueError("duplicate")
+
+    user = models.User(
+        email=user_data.email,
+        username=user_data.username,
+        full_name=user_data.full_name,
+        password_hash=get_password_hash(user_data.password),
+        is_verified=False
+    )
+    saved_user = await repo.create(user)
+    db.add(models.EmailVerificationToken(
+        user_id=saved_user.id,
+        token=generate_verification_token(),
+        expires_at=get_verification_token_expiry()
+    ))
+    await db.commit()
+
+
+async def register_single_transaction(db: AsyncSession, user_data: schemas.UserCreate) -> None:
+    token_store = DatabaseVerificationTokenStore(VerificationTokenRepository(db))
+    await auth_service.AuthService(UserRepository(db), OutboxRepository(db), token_store, db).register(user_data)
+    await db.commit()
+
+
+async def run(database_url: str, count: int) -> None:
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.drop_all)
+        await conn.run_sync(models.Base.metadata.create_all)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+    for name, flow in [("legacy", register_legacy), ("single-transaction", register_single_transaction)]:
+        timings = []
+        for i in range(count):
+            user_data = schemas.UserCreate(
+                email=f"{name}-{i}@example.com",
+                username=f"{name.replace('-', '_')}_{i}",
+                full_name="Benchmark User",
+                password="benchmark-password"
+            )
+            async with session_factory() as db:
+                started = time.perf_counter()
+                await flow(db, user_data)
+                timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        print(
+            f"{name:>20}: mean {statistics.mean(timings):.2f} ms, "
+            f"p50 {timings[len(timings) // 2]:.2f} ms, p95 {timings[int(len(timings) * 0.95)]:.2f} ms"
+        )
+
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.drop_all)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare registration latency before/after the single-transaction flow")
+    parser.add_argument("--database-url", default=os.getenv("BENCHMARK_DATABASE_URL", "sqlite+aiosqlite:///./benchmark.db"))
+    parser.add_argument("--count", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.database_url, args.count))
@@ -0,0 +1,99 @@
+"""
+Compares per-message FastMail connections with the pooled SMTP sessions.
+
+Requires a local sink: pip install aiosmtpd
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for name, value in {
+    "DATABASE_URL": "sqlite+aiosqlite://",
+    "SECRET_KEY": "benchmark",
+    "MAIL_USERNAME": "benchmark",
+    "MAIL_PASSWORD": "benchmark",
+    "MAIL_FROM": "benchmark@example.com",
+}.items():
+    os.environ.setdefault(name, value)
+
+from aiosmtpd.controller import Controller
+from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
+
+from app.core.email import build_verification_message
+from app.core.smtp_pool import SMTPConnectionPool
+
+
+class Sink:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def make_schema(i: int) -> MessageSchema:
+    return MessageSchema(
+        subject="Verify Your Email",
+        recipients=[f"user{i}@example.com"],
+        body=f"<p>token {i}</p>",
+        subtype=MessageType.html
+    )
+
+
+async def per_message(config: ConnectionConfig, count: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(i):
+        async with semaphore:
+            await FastMail(config).send_message(make_schema(i))
+
+    await asyncio.gather(*(send(i) for i in range(count)))
+
+
+async def pooled(config: ConnectionConfig, count: int, concurrency: int) -> None:
+    pool = SMTPConnectionPool(config, max_size=concurrency)
+    messages = [build_verification_message(f"user{i}@example.com", f"token{i}") for i in range(count)]
+    await asyncio.gather(*(pool.send_message(m) for m in messages))
+    await pool.close()
+
+
+async def run(count: int, concurrency: int, port: int) -> None:
+    sink = Sink()
+    controller = Controller(sink, hostname="127.0.0.1", port=port)
+    controller.start()
+    config = ConnectionConfig(
+        MAIL_USERNAME="benchmark",
+        MAIL_PASSWORD="benchmark",
+        MAIL_FROM="benchmark@example.com",
+        MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False,
+        VALIDATE_CERTS=False,
+    )
+
+    try:
+        for name, flow in [("per-message", per_message), ("pooled", pooled)]:
+            before = sink.received
+            started = time.perf_counter()
+            await flow(config, count, concurrency)
+            elapsed = time.perf_counter() - started
+            print(f"{name:>12}: {sink.received - before} messages in {elapsed:.2f}s ({count / elapsed:.1f} msg/s)")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SMTP throughput against a local aiosmtpd sink")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.count, args.concurrency, args.port))
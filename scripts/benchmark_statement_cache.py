@@ -0,0 +1,132 @@
+"""
+Per-call Python overhead of the hot repository queries: building the
+select() on every call (as the repositories used to) versus executing the
+prebuilt statements with bound parameters.
+
+Reports two numbers per query: the cost of constructing the statement and
+computing its cache key (what prebuilding removes; a prebuilt statement
+memoizes its key), and the full execute-and-fetch time against an
+in-memory SQLite database, where the query itself is nearly free.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for name, value in {
+    "DATABASE_URL": "sqlite+aiosqlite://",
+    "SECRET_KEY": "benchmark",
+    "MAIL_USERNAME": "benchmark",
+    "MAIL_PASSWORD": "benchmark",
+    "MAIL_FROM": "benchmark@example.com",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app import models
+from app.dependencies import _USER_BY_ID
+from app.repositories import comment_repository, like_repository, post_repository, user_repository
+
+
+def queries(user: models.User, post: models.Post):
+    """
+    (label, per-call construction as before, prebuilt statement, parameters)
+    """
+    def post_by_id():
+        return post_repository._with_counts().filter(models.Post.id == post.id)
+
+    def comments_by_post():
+        return (
+            select(models.Comment)
+            .options(selectinload(models.Comment.author))
+            .filter(models.Comment.post_id == post.id, comment_repository._not_before_post(post.id))
+            .order_by(models.Comment.created_at.asc(), models.Comment.id.asc())
+        )
+
+    return [
+        ("current user", lambda: select(models.User).filter(models.User.id == user.id),
+         _USER_BY_ID, {"user_id": user.id}),
+        ("user by email", lambda: select(models.User).filter(models.User.email == user.email),
+         user_repository._BY_EMAIL, {"email": user.email}),
+        ("like by user and post",
+         lambda: select(models.Like).filter(models.Like.user_id == user.id, models.Like.post_id == post.id),
+         like_repository._BY_USER_AND_POST, {"user_id": user.id, "post_id": post.id}),
+        ("like count",
+         lambda: select(func.count()).select_from(models.Like).filter(models.Like.post_id == post.id),
+         like_repository._COUNT_BY_POST, {"post_id": post.id}),
+        ("post with counts", post_by_id, post_repository._BY_ID, {"post_id": post.id}),
+        ("comments of post", comments_by_post, comment_repository._BY_POST, {"post_id": post.id}),
+    ]
+
+
+def per_call_us(fn, calls: int, rounds: int = 5) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        timings.append((time.perf_counter() - started) / calls * 1e6)
+    return statistics.median(timings)
+
+
+async def per_call_async_us(fn, calls: int, rounds: int = 5) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(calls):
+            await fn()
+        timings.append((time.perf_counter() - started) / calls * 1e6)
+    return statistics.median(timings)
+
+
+async def run(calls: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        user = models.User(email="bench@example.com", username="bench", full_name="Bench", password_hash="x")
+        fan = models.User(email="fan@example.com", username="fan", full_name="Fan", password_hash="x")
+        db.add_all([user, fan])
+        await db.flush()
+        post = models.Post(author_id=user.id, title="Post", content="content")
+        db.add(post)
+        await db.flush()
+        db.add_all([models.Comment(post_id=post.id, author_id=fan.id, content="hi"), models.Like(post_id=post.id, user_id=fan.id)])
+        await db.commit()
+
+        print(f"{'':>22}  {'build + cache key (us)':>24}  {'execute + fetch (us)':>24}")
+        print(f"{'query':>22}  {'per call':>11} {'prebuilt':>12}  {'per call':>11} {'prebuilt':>12}")
+        for label, rebuild, prebuilt, params in queries(user, post):
+            build = per_call_us(lambda: rebuild()._generate_cache_key(), calls)
+            build_prebuilt = per_call_us(lambda: prebuilt._generate_cache_key(), calls)
+
+            async def execute_rebuilt():
+                (await db.execute(rebuild())).all()
+
+            async def execute_prebuilt():
+                (await db.execute(prebuilt, params)).all()
+
+            # Warm the compiled cache for both forms first.
+            await execute_rebuilt()
+            await execute_prebuilt()
+            executed = await per_call_async_us(execute_rebuilt, calls)
+            executed_prebuilt = await per_call_async_us(execute_prebuilt, calls)
+            print(f"{label:>22}  {build:>11.1f} {build_prebuilt:>12.1f}  {executed:>11.1f} {executed_prebuilt:>12.1f}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Statement construction overhead of hot repository queries")
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.calls))
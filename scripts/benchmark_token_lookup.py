@@ -0,0 +1,142 @@
+"""
+Measures verification token lookups and prune queries on a table bloated
+with expired tokens, before and after pruning, with and without the
+expires_at index.
+
+Point --database-url at a scratch Postgres database for production-like
+numbers (tables are dropped and recreated); the default is a local SQLite
+file.
+"""
+import argparse
+import os
+import secrets
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for name, value in {
+    "DATABASE_URL": "sqlite+aiosqlite://",
+    "SECRET_KEY": "benchmark",
+    "MAIL_USERNAME": "benchmark",
+    "MAIL_PASSWORD": "benchmark",
+    "MAIL_FROM": "benchmark@example.com",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import create_engine, delete, insert, select, text
+
+from app import models
+
+Token = models.EmailVerificationToken
+EXPIRES_INDEX = "ix_email_verification_tokens_expires_at"
+
+
+def timed(conn, statement, params=None, repeat: int = 200) -> list[float]:
+    timings = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        conn.execute(statement, params[i % len(params)] if params else {}).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)
+
+
+def report(label: str, timings: list[float]) -> None:
+    print(
+        f"{label:>44}: mean {statistics.mean(timings):.3f} ms, "
+        f"p50 {timings[len(timings) // 2]:.3f} ms, p95 {timings[int(len(timings) * 0.95)]:.3f} ms"
+    )
+
+
+def populate(engine, expired: int, live: int, chunk: int = 50_000) -> list[str]:
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{
+            "id": uuid.UUID(int=1), "email": "bench@example.com", "username": "bench",
+            "full_name": "Bench", "password_hash": "x", "is_verified": False,
+        }])
+
+    # Expired rows first, in expiry order, the way they accumulate in production.
+    start = datetime.utcnow() - timedelta(days=365)
+    step = timedelta(days=364) / max(expired, 1)
+    live_tokens = []
+    written = 0
+    for offset in range(0, expired + live, chunk):
+        rows = []
+        for i in range(offset, min(offset + chunk, expired + live)):
+            token = secrets.token_urlsafe(32)
+            if i < expired:
+                expires_at = start + step * i
+            else:
+                expires_at = datetime.utcnow() + timedelta(hours=24)
+                live_tokens.append(token)
+            # A leading hex letter keeps SQLite's numeric affinity from
+            # converting (and colliding) ids made only of digits and "e".
+            token_id = uuid.UUID(int=(0xA << 124) | i)
+            rows.append({"id": token_id, "user_id": uuid.UUID(int=1), "token": token, "expires_at": expires_at})
+        with engine.begin() as conn:
+            conn.execute(insert(Token), rows)
+        written += len(rows)
+        print(f"  ... {written} rows", end="\r")
+    print()
+    return live_tokens
+
+
+def run(database_url: str, expired: int, live: int, batch_size: int) -> None:
+    engine = create_engine(database_url)
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+
+    started = time.perf_counter()
+    live_tokens = populate(engine, expired, live)
+    print(f"Populated {expired} expired + {live} live tokens in {time.perf_counter() - started:.1f}s")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    lookup = select(Token.token, Token.expires_at).where(Token.token == text(":token"))
+    lookup_params = [{"token": token} for token in live_tokens]
+    now = datetime.utcnow()
+    prune_batch = select(Token.id).where(Token.expires_at < now).limit(batch_size)
+    # Same scan, reading a column SQLite's type affinity leaves intact.
+    prune_probe = select(Token.expires_at).where(Token.expires_at < now).limit(batch_size)
+
+    with engine.connect() as conn:
+        report("lookup by token, bloated table", timed(conn, lookup, lookup_params))
+        report(f"find prune batch ({batch_size}), indexed", timed(conn, prune_probe, repeat=20))
+
+    started = time.perf_counter()
+    deleted = 0
+    with engine.connect() as conn:
+        while True:
+            result = conn.execute(delete(Token).where(Token.id.in_(prune_batch)))
+            conn.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                break
+    elapsed = time.perf_counter() - started
+    print(f"{'prune':>44}: {deleted} rows in {elapsed:.1f}s ({deleted / elapsed:.0f} rows/s)")
+
+    with engine.begin() as conn:
+        conn.execute(text("VACUUM" if engine.dialect.name == "sqlite" else "ANALYZE"))
+    with engine.connect() as conn:
+        report("lookup by token, after prune", timed(conn, lookup, lookup_params))
+        report("empty prune probe, indexed", timed(conn, prune_probe, repeat=50))
+        conn.execute(text(f"DROP INDEX {EXPIRES_INDEX}"))
+        conn.commit()
+        report("empty prune probe, no expires_at index", timed(conn, prune_probe, repeat=50))
+
+    models.Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Token lookup and pruning cost on a table full of expired tokens")
+    parser.add_argument("--database-url", default=os.getenv("BENCHMARK_DATABASE_URL", "sqlite:///./benchmark_tokens.db"))
+    parser.add_argument("--expired", type=int, default=10_000_000)
+    parser.add_argument("--live", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    run(args.database_url, args.expired, args.live, args.batch_size)
@@ -0,0 +1,119 @@
+"""
+Compares random (uuid4) and time-ordered (uuid7) primary keys: insert
+throughput as the table grows, and the size of the primary key index
+afterwards.
+
+Each run fills two identical like-shaped tables, one per key type, in
+interleaved batches so both see the same cache and disk conditions. Point
+--database-url at a scratch Postgres database with --rows in the tens of
+millions for production-like numbers: the uuid4 slowdown only shows once
+the key index no longer fits in shared_buffers. The default is a local
+SQLite file.
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for name, value in {
+    "DATABASE_URL": "sqlite+aiosqlite://",
+    "SECRET_KEY": "benchmark",
+    "MAIL_USERNAME": "benchmark",
+    "MAIL_PASSWORD": "benchmark",
+    "MAIL_FROM": "benchmark@example.com",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import Column, DateTime, MetaData, Table, create_engine, insert, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.ids import uuid7
+
+metadata = MetaData()
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+TABLES = {
+    kind: Table(
+        f"benchmark_keys_{kind}", metadata,
+        Column("id", UUID(as_uuid=True), primary_key=True),
+        Column("user_id", UUID(as_uuid=True), nullable=False),
+        Column("post_id", UUID(as_uuid=True), nullable=False),
+        Column("created_at", DateTime, nullable=False),
+    )
+    for kind in GENERATORS
+}
+
+
+def index_size(conn, table: Table) -> int:
+    if conn.dialect.name == "postgresql":
+        return conn.execute(text(f"SELECT pg_relation_size('{table.name}_pkey')")).scalar()
+    return conn.execute(
+        text("SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name = :name"),
+        {"name": f"sqlite_autoindex_{table.name}_1"}
+    ).scalar()
+
+
+def generation_cost(count: int = 200_000) -> None:
+    for kind, generate in GENERATORS.items():
+        started = time.perf_counter()
+        for _ in range(count):
+            generate()
+        print(f"{kind} generation: {(time.perf_counter() - started) / count * 1e6:.2f} us/id")
+
+
+def run(database_url: str, rows: int, batch_size: int, report_every: int) -> None:
+    engine = create_engine(database_url)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    generation_cost()
+
+    user_ids = [uuid.uuid4() for _ in range(1000)]
+    elapsed = {kind: 0.0 for kind in GENERATORS}
+    window = {kind: 0.0 for kind in GENERATORS}
+    window_rows = 0
+    print(f"{'rows':>12}  " + "  ".join(f"{kind + ' rows/s':>14}" for kind in GENERATORS))
+    for offset in range(0, rows, batch_size):
+        count = min(batch_size, rows - offset)
+        now = datetime.utcnow()
+        for kind, generate in GENERATORS.items():
+            batch = [
+                {"id": generate(), "user_id": user_ids[i % 1000], "post_id": user_ids[(i * 7) % 1000], "created_at": now}
+                for i in range(offset, offset + count)
+            ]
+            started = time.perf_counter()
+            with engine.begin() as conn:
+                conn.execute(insert(TABLES[kind]), batch)
+            spent = time.perf_counter() - started
+            elapsed[kind] += spent
+            window[kind] += spent
+
+        written = offset + count
+        window_rows += count
+        if window_rows >= report_every or written == rows:
+            print(f"{written:>12}  " + "  ".join(f"{window_rows / window[kind]:>14.0f}" for kind in GENERATORS))
+            window = {kind: 0.0 for kind in GENERATORS}
+            window_rows = 0
+
+    with engine.connect() as conn:
+        for kind, table in TABLES.items():
+            print(
+                f"{kind}: {rows / elapsed[kind]:.0f} rows/s overall, "
+                f"primary key index {index_size(conn, table) / 2**20:.1f} MiB"
+            )
+
+    metadata.drop_all(engine)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Insert throughput and key index size with uuid4 vs uuid7 primary keys")
+    parser.add_argument("--database-url", default=os.getenv("BENCHMARK_DATABASE_URL", "sqlite:///./benchmark_uuid_keys.db"))
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--report-every", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    run(args.database_url, args.rows, args.batch_size, args.report_every)
@@ -1,46 +1,31 @@
 import asyncio
-from datetime import datetime, timedelta, timezone
-from sqlalchemy import select, delete
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-
 import sys
-sys.path.insert(0, '/Users/norbek/projects/interview/msnb')
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from app.core.config import settings
-from app import models
+from app.database import AsyncSessionLocal, engine
+from app.repositories.user_repository import UserRepository
+from app.repositories.verification_token_repository import VerificationTokenRepository
+from app.services.cleanup_service import CleanupService
 
 
-async def cleanup_unverified_users(hours: int = None):
+async def cleanup_unverified_users(hours: int = None, batch_size: int = None, dry_run: bool = False):
     cleanup_hours = hours if hours is not None else settings.UNVERIFIED_USER_CLEANUP_HOURS
-    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=cleanup_hours)
-
-    database_url = settings.DATABASE_URL
-    if database_url.startswith("postgresql://"):
-        database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
-
-    engine = create_async_engine(database_url, echo=False)
-    async_session = sessionmaker(
-        bind=engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
-
-    async with async_session() as session:
-        result = await session.execute(
-            select(models.User).filter(
-                models.User.is_verified == False,
-                models.User.created_at < cutoff_time
-            )
-        )
-        users_to_delete = result.scalars().all()
-        count = len(users_to_delete)
 
-        for user in users_to_delete:
-            await session.delete(user)
-
-        await session.commit()
+    async with AsyncSessionLocal() as session:
+        service = CleanupService(UserRepository(session), VerificationTokenRepository(session), session)
+        count = await service.delete_unverified_users(
+            cleanup_hours,
+            batch_size=batch_size or settings.CLEANUP_BATCH_SIZE,
+            dry_run=dry_run,
+            on_progress=lambda total: print(f"  ... {total} deleted")
+        )
 
+    if dry_run:
+        print(f"Would delete {count} unverified users older than {cleanup_hours} hours")
+    else:
         print(f"Deleted {count} unverified users older than {cleanup_hours} hours")
 
     await engine.dispose()
@@ -50,6 +35,8 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Cleanup unverified users")
     parser.add_argument("--hours", type=int, default=None, help="Hours threshold for cleanup")
+    parser.add_argument("--batch-size", type=int, default=None, help="Users deleted per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Only count matching users")
     args = parser.parse_args()
 
-    asyncio.run(cleanup_unverified_users(args.hours))
+    asyncio.run(cleanup_unverified_users(args.hours, args.batch_size, args.dry_run))
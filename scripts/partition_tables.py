@@ -0,0 +1,56 @@
+"""
+Converts likes (hash by post_id) and comments (monthly ranges on
+created_at) to partitioned tables online, or back with --undo. Use it
+when the partitioning migration was applied without `-x partition=true`.
+
+Each table is copied batch by batch while a trigger mirrors ongoing
+writes, then swapped in under a brief lock. Safe to re-run: an interrupted
+backfill resumes.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine
+
+from app.core.partitions import (
+    COMMENTS_PARTITIONED,
+    COMMENTS_PLAIN,
+    LIKES_PARTITIONED,
+    LIKES_PLAIN,
+    is_partitioned,
+    rebuild_table,
+)
+
+
+def run(database_url: str, undo: bool, batch_size: int) -> None:
+    engine = create_engine(database_url, isolation_level="AUTOCOMMIT")
+    if engine.dialect.name != "postgresql":
+        sys.exit("Partitioning needs Postgres")
+
+    layouts = (COMMENTS_PLAIN, LIKES_PLAIN) if undo else (LIKES_PARTITIONED, COMMENTS_PARTITIONED)
+    with engine.connect() as conn:
+        for layout in layouts:
+            if is_partitioned(conn, layout.table) == (layout.partition_by is not None):
+                print(f"{layout.table}: already {'partitioned' if layout.partition_by else 'plain'}")
+                continue
+            print(f"{layout.table}: rebuilding")
+            copied = rebuild_table(
+                conn, layout, batch_size,
+                on_progress=lambda total: print(f"  ... {total} rows", end="\r")
+            )
+            print(f"\n{layout.table}: done, {copied} rows backfilled")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partition likes and comments online")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--undo", action="store_true", help="Convert back to plain tables")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    run(args.database_url.replace("postgresql+asyncpg://", "postgresql+psycopg2://", 1), args.undo, args.batch_size)
@@ -1,15 +1,27 @@
+import asyncio
+import os
+import time
+from contextlib import contextmanager
 import pytest
 import pytest_asyncio
+import aiosmtplib
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from datetime import datetime, timedelta, timezone
-from unittest.mock import patch
+
+# Cheapest bcrypt cost keeps the suite fast; calibration is exercised explicitly.
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+os.environ.setdefault("TASK_BACKEND", "inprocess")
 
 from app.main import app
 from app.models import Base, User, Post, Comment, Like, EmailVerificationToken
 from app.dependencies import get_db
+from app.database import unit_of_work
+from app.core import smtp_pool
+from app.core.query_stats import capture_queries
 from app.core.security import get_password_hash, generate_verification_token
 
 
@@ -21,6 +33,12 @@ engine = create_async_engine(
     poolclass=StaticPool,
 )
 
+
+# SQLite ignores ON DELETE CASCADE unless foreign keys are switched on.
+@event.listens_for(engine.sync_engine, "connect")
+def enable_foreign_keys(dbapi_connection, connection_record):
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
 TestingSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -34,9 +52,10 @@ _test_session = None
 async def override_get_db():
     global _test_session
     if _test_session:
-        yield _test_session
+        async with unit_of_work(_test_session):
+            yield _test_session
     else:
-        async with TestingSessionLocal() as session:
+        async with TestingSessionLocal() as session, unit_of_work(session):
             yield session
 
 
@@ -46,6 +65,190 @@ from app.core.limiter import limiter
 limiter.enabled = False
 
 
+class FakeRedis:
+    """
+    In-memory stand-in for the handful of redis.asyncio commands the app uses.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def _alive(self, key):
+        deadline = self.expiry.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.data
+
+    async def get(self, key):
+        return self.data.get(key) if self._alive(key) else None
+
+    async def set(self, key, value, ex=None, px=None, nx=False, get=False):
+        previous = await self.get(key)
+        if nx and previous is not None:
+            return None
+        self.data[key] = str(value)
+        self.expiry.pop(key, None)
+        if ex is not None:
+            self.expiry[key] = time.monotonic() + ex
+        if px is not None:
+            self.expiry[key] = time.monotonic() + px / 1000
+        return previous if get else True
+
+    async def getdel(self, key):
+        value = await self.get(key)
+        self.data.pop(key, None)
+        self.expiry.pop(key, None)
+        return value
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return removed
+
+    async def exists(self, *keys):
+        return sum(1 for key in keys if self._alive(key))
+
+    async def incrby(self, key, amount=1):
+        value = int(await self.get(key) or 0) + amount
+        self.data[key] = str(value)
+        return value
+
+    async def incr(self, key):
+        return await self.incrby(key, 1)
+
+    async def expire(self, key, seconds):
+        if not self._alive(key):
+            return False
+        self.expiry[key] = time.monotonic() + seconds
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def lock(self, name, timeout=None, blocking=True):
+        return FakeLock(self, name, timeout)
+
+
+class FakeLock:
+
+    def __init__(self, client, name, timeout):
+        self.client = client
+        self.name = name
+        self.timeout = timeout
+        self.token = os.urandom(8).hex()
+
+    async def acquire(self):
+        return bool(await self.client.set(self.name, self.token, ex=self.timeout, nx=True))
+
+    async def release(self):
+        from redis.exceptions import LockNotOwnedError
+
+        if await self.client.get(self.name) != self.token:
+            raise LockNotOwnedError("Cannot release a lock that's no longer owned")
+        await self.client.delete(self.name)
+
+
+class FakePipeline:
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.client, name), args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        results = [await command(*args, **kwargs) for command, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    from app.core import redis as redis_module
+
+    client = FakeRedis()
+    monkeypatch.setattr(redis_module, "redis_client", client)
+    return client
+
+
+class FakeSMTP:
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.is_connected = False
+        self.sent = []
+        self.fail_next_send = False
+        FakeSMTP.instances.append(self)
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def login(self, username, password):
+        pass
+
+    async def noop(self):
+        pass
+
+    async def send_message(self, message):
+        if self.fail_next_send:
+            self.is_connected = False
+            raise aiosmtplib.SMTPServerDisconnected("connection lost")
+        await asyncio.sleep(0.01)
+        self.sent.append(message)
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr(smtp_pool.aiosmtplib, "SMTP", FakeSMTP)
+    return FakeSMTP
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Context manager asserting that every request made inside it runs at most
+    `max_queries` statements and none of them more than once (N+1).
+    """
+    @contextmanager
+    def budget(max_queries: int, allow_repeats: bool = False):
+        with capture_queries() as requests:
+            yield requests
+        assert requests, "no requests were made inside the budget"
+        for request in requests:
+            where = f"{request.method} {request.route}"
+            assert request.stats.count <= max_queries, (
+                f"{where} ran {request.stats.count} queries, budget {max_queries}:\n"
+                + "\n".join(f"{times}x {statement}" for statement, times in request.stats.statements.items())
+            )
+            if not allow_repeats:
+                assert not request.stats.repeated(), f"{where} repeated statements: {request.stats.repeated()}"
+
+    return budget
+
+
 @pytest_asyncio.fixture
 async def db_session():
     global _test_session
@@ -107,8 +310,7 @@ def test_comment_data():
 
 
 async def register_user(client: AsyncClient, user_data: dict) -> dict:
-    with patch("app.services.auth_service.send_email_task"):
-        response = await client.post("/auth/register", json=user_data)
+    response = await client.post("/auth/register", json=user_data)
     return response.json()
 
 
@@ -1,5 +1,5 @@
+import logging
 import pytest
-from unittest.mock import patch
 from datetime import datetime, timedelta, timezone
 
 
@@ -62,8 +62,7 @@ class TestCleanupUnverifiedUsers:
             "full_name": "Custom Hours User",
             "password": "password123"
         }
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=user_data)
+        await async_client.post("/auth/register", json=user_data)
 
         from sqlalchemy import update
         from app.models import User
@@ -87,8 +86,7 @@ class TestCleanupUnverifiedUsers:
             "full_name": "Large Threshold User",
             "password": "password123"
         }
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=user_data)
+        await async_client.post("/auth/register", json=user_data)
 
         from sqlalchemy import update
         from app.models import User
@@ -116,8 +114,7 @@ class TestCleanupUnverifiedUsers:
                 "full_name": f"Old User {i}",
                 "password": "password123"
             }
-            with patch("app.services.auth_service.send_email_task"):
-                await async_client.post("/auth/register", json=user_data)
+            await async_client.post("/auth/register", json=user_data)
 
             old_time = datetime.now(timezone.utc) - timedelta(hours=100)
             await db_session.execute(
@@ -130,3 +127,168 @@ class TestCleanupUnverifiedUsers:
 
         assert response.status_code == 200
         assert "Deleted 3 unverified users" in response.json()["message"]
+
+    @pytest.mark.asyncio
+    async def test_cleanup_dry_run_only_counts(self, old_unverified_user, async_client, db_session):
+        from sqlalchemy import select, func
+        from app.models import User
+
+        response = await async_client.post("/admin/cleanup-unverified?dry_run=true")
+
+        assert response.status_code == 200
+        assert "Would delete 1 unverified users" in response.json()["message"]
+        assert await db_session.scalar(select(func.count()).select_from(User)) == 1
+
+    @pytest.mark.asyncio
+    async def test_cleanup_in_chunks_cascades_to_related_rows(self, async_client, db_session):
+        from sqlalchemy import select, func, update
+        from app.models import User, Post, EmailVerificationToken
+        from app.repositories.user_repository import UserRepository
+        from app.repositories.verification_token_repository import VerificationTokenRepository
+        from app.services.cleanup_service import CleanupService
+
+        for i in range(5):
+            await async_client.post("/auth/register", json={
+                "email": f"stale_{i}@example.com",
+                "username": f"stale{i}",
+                "full_name": f"Stale User {i}",
+                "password": "password123"
+            })
+        users = (await db_session.execute(select(User))).scalars().all()
+        db_session.add(Post(author_id=users[0].id, title="Orphan", content="Should be removed with its author"))
+        await db_session.execute(
+            update(User).values(created_at=datetime.now(timezone.utc) - timedelta(hours=100))
+        )
+        await db_session.commit()
+
+        progress = []
+        service = CleanupService(UserRepository(db_session), VerificationTokenRepository(db_session), db_session)
+        deleted = await service.delete_unverified_users(batch_size=2, on_progress=progress.append)
+
+        assert deleted == 5
+        assert progress == [2, 4, 5]
+        assert await db_session.scalar(select(func.count()).select_from(User)) == 0
+        assert await db_session.scalar(select(func.count()).select_from(Post)) == 0
+        assert await db_session.scalar(select(func.count()).select_from(EmailVerificationToken)) == 0
+
+
+class TestScheduledCleanup:
+
+    @pytest.fixture(autouse=True)
+    def test_sessions(self, monkeypatch):
+        from app import tasks
+        from tests.conftest import TestingSessionLocal
+
+        monkeypatch.setattr(tasks, "AsyncSessionLocal", TestingSessionLocal)
+
+    @pytest.mark.asyncio
+    async def test_cleanup_task_deletes_and_records_metrics(self, old_unverified_user):
+        from app import tasks
+        from app.core.metrics import metrics
+
+        before = metrics.get("maintenance_job_rows_deleted_total", job="cleanup_unverified_users") or 0
+
+        assert await tasks.cleanup_unverified_users_task() == 1
+        assert metrics.get("maintenance_job_rows_deleted_total", job="cleanup_unverified_users") == before + 1
+        assert metrics.get("maintenance_job_duration_seconds", job="cleanup_unverified_users") > 0
+
+    @pytest.mark.asyncio
+    async def test_cleanup_task_logs_run_for_workers(self, old_unverified_user, caplog):
+        from app import tasks
+
+        with caplog.at_level(logging.INFO, logger="app.core.jobs"):
+            await tasks.cleanup_unverified_users_task()
+
+        [record] = [r for r in caplog.records if r.getMessage().startswith("maintenance_job ")]
+        assert "job=cleanup_unverified_users outcome=succeeded rows_deleted=1" in record.getMessage()
+        assert (record.job, record.outcome, record.rows_deleted) == ("cleanup_unverified_users", "succeeded", 1)
+
+    @pytest.mark.asyncio
+    async def test_cleanup_task_skips_while_locked(self, old_unverified_user, fake_redis, db_session):
+        from sqlalchemy import select, func
+        from app import tasks
+        from app.models import User
+
+        await fake_redis.set("lock:job:cleanup_unverified_users", "other-worker", ex=60)
+
+        assert await tasks.cleanup_unverified_users_task() is None
+        assert await db_session.scalar(select(func.count()).select_from(User)) == 1
+
+    @pytest.mark.asyncio
+    async def test_lock_released_after_run(self, db_session, fake_redis):
+        from app import tasks
+
+        await tasks.cleanup_unverified_users_task()
+
+        assert await fake_redis.get("lock:job:cleanup_unverified_users") is None
+
+    @pytest.fixture
+    def redis_down(self, fake_redis):
+        from redis.exceptions import ConnectionError
+
+        class UnreachableLock:
+            async def acquire(self):
+                raise ConnectionError("redis is down")
+
+        fake_redis.lock = lambda *args, **kwargs: UnreachableLock()
+
+    @pytest.mark.asyncio
+    async def test_skips_without_redis_under_celery(self, old_unverified_user, redis_down, monkeypatch):
+        from app import tasks
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "TASK_BACKEND", "celery")
+
+        assert await tasks.cleanup_unverified_users_task() is None
+
+    @pytest.mark.asyncio
+    async def test_inprocess_falls_back_to_local_lock(self, old_unverified_user, redis_down, monkeypatch):
+        from app import tasks
+        from app.core import jobs
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "TASK_BACKEND", "inprocess")
+
+        assert await tasks.cleanup_unverified_users_task() == 1
+        assert jobs._running_locally == set()
+
+        jobs._running_locally.add("cleanup_unverified_users")
+        try:
+            assert await tasks.cleanup_unverified_users_task() is None
+        finally:
+            jobs._running_locally.clear()
+
+    @pytest.mark.asyncio
+    async def test_prune_task_deletes_only_expired_tokens(self, unverified_user, db_session):
+        from sqlalchemy import select, update
+        from app import tasks
+        from app.models import EmailVerificationToken, User
+
+        user = (await db_session.execute(select(User))).scalars().one()
+        db_session.add(EmailVerificationToken(
+            user_id=user.id,
+            token="expired-token",
+            expires_at=datetime.utcnow() - timedelta(hours=1)
+        ))
+        await db_session.commit()
+
+        assert await tasks.prune_expired_verification_tokens_task() == 1
+        remaining = (await db_session.execute(select(EmailVerificationToken.token))).scalars().all()
+        assert "expired-token" not in remaining
+        assert len(remaining) == 1
+
+    def test_beat_schedule_covers_all_jobs(self):
+        from app.core.celery_app import celery
+
+        scheduled = {entry["task"] for entry in celery.conf.beat_schedule.values()}
+        assert scheduled == {
+            "app.tasks.cleanup_unverified_users",
+            "app.tasks.prune_expired_verification_tokens",
+            "app.tasks.create_comment_partitions",
+        }
+
+    @pytest.mark.asyncio
+    async def test_comment_partitions_task_is_noop_without_partitioning(self):
+        from app import tasks
+
+        assert await tasks.create_comment_partitions_task() == 0
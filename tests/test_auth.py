@@ -1,5 +1,4 @@
 import pytest
-from unittest.mock import patch
 from datetime import datetime, timedelta
 
 
@@ -7,8 +6,7 @@ class TestRegistration:
 
     @pytest.mark.asyncio
     async def test_register_success(self, async_client, test_user_data):
-        with patch("app.services.auth_service.send_email_task"):
-            response = await async_client.post("/auth/register", json=test_user_data)
+        response = await async_client.post("/auth/register", json=test_user_data)
 
         assert response.status_code == 201
         data = response.json()
@@ -22,23 +20,35 @@ class TestRegistration:
 
     @pytest.mark.asyncio
     async def test_register_duplicate_email(self, async_client, test_user_data):
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=test_user_data)
-            response = await async_client.post("/auth/register", json=test_user_data)
+        await async_client.post("/auth/register", json=test_user_data)
+        response = await async_client.post("/auth/register", json=test_user_data)
 
         assert response.status_code == 400
         assert "Email already registered" in response.json()["detail"]
 
     @pytest.mark.asyncio
     async def test_register_duplicate_username(self, async_client, test_user_data, test_user_data_2):
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=test_user_data)
-            test_user_data_2["username"] = test_user_data["username"]
-            response = await async_client.post("/auth/register", json=test_user_data_2)
+        await async_client.post("/auth/register", json=test_user_data)
+        test_user_data_2["username"] = test_user_data["username"]
+        response = await async_client.post("/auth/register", json=test_user_data_2)
 
         assert response.status_code == 400
         assert "Username already taken" in response.json()["detail"]
 
+    @pytest.mark.asyncio
+    async def test_register_conflict_rolls_back(self, async_client, test_user_data, test_user_data_2, db_session):
+        from sqlalchemy import select, func
+        from app.models import User, EmailVerificationToken, OutboxMessage
+
+        await async_client.post("/auth/register", json=test_user_data)
+        test_user_data_2["username"] = test_user_data["username"]
+        response = await async_client.post("/auth/register", json=test_user_data_2)
+
+        assert response.status_code == 400
+        assert await db_session.scalar(select(func.count()).select_from(OutboxMessage)) == 1
+        assert await db_session.scalar(select(func.count()).select_from(User)) == 1
+        assert await db_session.scalar(select(func.count()).select_from(EmailVerificationToken)) == 1
+
     @pytest.mark.asyncio
     async def test_register_username_too_short(self, async_client, test_user_data):
         test_user_data["username"] = "ab"
@@ -98,8 +108,7 @@ class TestLogin:
 
     @pytest.mark.asyncio
     async def test_login_with_email_success(self, async_client, test_user_data):
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=test_user_data)
+        await async_client.post("/auth/register", json=test_user_data)
 
         response = await async_client.post(
             "/auth/login",
@@ -113,8 +122,7 @@ class TestLogin:
 
     @pytest.mark.asyncio
     async def test_login_with_username_success(self, async_client, test_user_data):
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=test_user_data)
+        await async_client.post("/auth/register", json=test_user_data)
 
         response = await async_client.post(
             "/auth/login",
@@ -126,8 +134,7 @@ class TestLogin:
 
     @pytest.mark.asyncio
     async def test_login_wrong_password(self, async_client, test_user_data):
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=test_user_data)
+        await async_client.post("/auth/register", json=test_user_data)
 
         response = await async_client.post(
             "/auth/login",
@@ -157,8 +164,7 @@ class TestGetMe:
 
     @pytest.mark.asyncio
     async def test_get_me_with_valid_token(self, async_client, test_user_data):
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=test_user_data)
+        await async_client.post("/auth/register", json=test_user_data)
 
         login_response = await async_client.post(
             "/auth/login",
@@ -202,8 +208,7 @@ class TestEmailVerification:
 
     @pytest.mark.asyncio
     async def test_verify_email_success(self, async_client, test_user_data, db_session):
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=test_user_data)
+        await async_client.post("/auth/register", json=test_user_data)
 
         from sqlalchemy import select
         from app.models import EmailVerificationToken, User
@@ -233,8 +238,7 @@ class TestEmailVerification:
 
     @pytest.mark.asyncio
     async def test_verify_email_expired_token(self, async_client, test_user_data, db_session):
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=test_user_data)
+        await async_client.post("/auth/register", json=test_user_data)
 
         from sqlalchemy import select, update
         from app.models import EmailVerificationToken, User
@@ -260,22 +264,20 @@ class TestResendVerification:
 
     @pytest.mark.asyncio
     async def test_resend_verification_success(self, unverified_user, async_client):
-        with patch("app.services.auth_service.send_email_task"):
-            response = await async_client.post(
-                "/auth/resend-verification",
-                headers=unverified_user["headers"]
-            )
+        response = await async_client.post(
+            "/auth/resend-verification",
+            headers=unverified_user["headers"]
+        )
 
         assert response.status_code == 200
         assert "Verification email sent" in response.json()["message"]
 
     @pytest.mark.asyncio
     async def test_resend_verification_already_verified(self, verified_user, async_client):
-        with patch("app.services.auth_service.send_email_task"):
-            response = await async_client.post(
-                "/auth/resend-verification",
-                headers=verified_user["headers"]
-            )
+        response = await async_client.post(
+            "/auth/resend-verification",
+            headers=verified_user["headers"]
+        )
 
         assert response.status_code == 400
         assert "already verified" in response.json()["detail"].lower()
@@ -284,3 +286,347 @@ class TestResendVerification:
     async def test_resend_verification_unauthenticated(self, async_client):
         response = await async_client.post("/auth/resend-verification")
         assert response.status_code == 401
+
+
+class TestRedisVerificationTokens:
+
+    @pytest.fixture(autouse=True)
+    def redis_token_store(self, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "VERIFICATION_TOKEN_STORE", "redis")
+
+    def test_store_must_implement_issue_and_consume(self):
+        from app.core.verification_tokens import VerificationTokenStore
+
+        class IssueOnly(VerificationTokenStore):
+            async def issue(self, user_id, replace=True):
+                return "token"
+
+        with pytest.raises(TypeError):
+            IssueOnly()
+
+    async def _sent_tokens(self, db_session) -> list[str]:
+        from sqlalchemy import select
+        from app.models import OutboxMessage
+
+        result = await db_session.execute(select(OutboxMessage).order_by(OutboxMessage.id))
+        return [message.payload["token"] for message in result.scalars()]
+
+    @pytest.mark.asyncio
+    async def test_register_stores_token_in_redis_only(self, async_client, test_user_data, db_session, fake_redis):
+        from sqlalchemy import func, select
+        from app.models import EmailVerificationToken
+
+        await async_client.post("/auth/register", json=test_user_data)
+
+        assert await db_session.scalar(select(func.count()).select_from(EmailVerificationToken)) == 0
+        [token] = await self._sent_tokens(db_session)
+        assert token not in "".join(fake_redis.data)
+        assert any(key.startswith("verify:") for key in fake_redis.expiry)
+
+    @pytest.mark.asyncio
+    async def test_verify_email_consumes_token(self, async_client, test_user_data, db_session):
+        from sqlalchemy import select
+        from app.models import User
+
+        await async_client.post("/auth/register", json=test_user_data)
+        [token] = await self._sent_tokens(db_session)
+
+        response = await async_client.get(f"/auth/verify-email?token={token}")
+        assert response.status_code == 200
+
+        user = await db_session.scalar(select(User).where(User.email == test_user_data["email"]))
+        await db_session.refresh(user)
+        assert user.is_verified == True
+
+        response = await async_client.get(f"/auth/verify-email?token={token}")
+        assert response.status_code == 400
+        assert "Invalid verification token" in response.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_resend_revokes_previous_token(self, unverified_user, async_client, db_session):
+        response = await async_client.post(
+            "/auth/resend-verification",
+            headers=unverified_user["headers"]
+        )
+        assert response.status_code == 200
+
+        first, second = await self._sent_tokens(db_session)
+        assert (await async_client.get(f"/auth/verify-email?token={first}")).status_code == 400
+        assert (await async_client.get(f"/auth/verify-email?token={second}")).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_expired_token_is_rejected(self, async_client, test_user_data, db_session, fake_redis):
+        await async_client.post("/auth/register", json=test_user_data)
+        [token] = await self._sent_tokens(db_session)
+        for key in fake_redis.expiry:
+            fake_redis.expiry[key] = 0
+
+        response = await async_client.get(f"/auth/verify-email?token={token}")
+        assert response.status_code == 400
+
+
+class TestTokenClaims:
+
+    @pytest.mark.asyncio
+    async def test_login_token_carries_claims(self, unverified_user):
+        from app.core.security import decode_token
+
+        payload = decode_token(unverified_user["token"])
+
+        assert payload["username"] == unverified_user["data"]["username"]
+        assert payload["is_verified"] == False
+        assert payload["ver"] == 0
+
+    @pytest.mark.asyncio
+    async def test_logout_all_revokes_existing_tokens(self, verified_user, async_client):
+        response = await async_client.post("/auth/logout-all", headers=verified_user["headers"])
+        assert response.status_code == 200
+
+        me_response = await async_client.get("/auth/me", headers=verified_user["headers"])
+        assert me_response.status_code == 401
+
+        login_response = await async_client.post(
+            "/auth/login",
+            data={"username": verified_user["data"]["email"], "password": verified_user["data"]["password"]}
+        )
+        new_headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+        me_response = await async_client.get("/auth/me", headers=new_headers)
+        assert me_response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_stale_unverified_claim_rechecked_against_database(self, unverified_user, async_client, db_session):
+        from uuid import uuid4
+        from sqlalchemy import update
+        from app.models import User
+
+        await db_session.execute(
+            update(User).where(User.email == unverified_user["data"]["email"]).values(is_verified=True)
+        )
+        await db_session.commit()
+
+        response = await async_client.delete(f"/posts/{uuid4()}", headers=unverified_user["headers"])
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_unverified_claim_still_forbidden(self, unverified_user, async_client):
+        from uuid import uuid4
+
+        response = await async_client.delete(f"/posts/{uuid4()}", headers=unverified_user["headers"])
+
+        assert response.status_code == 403
+
+    @pytest.fixture
+    def redis_down(self, fake_redis):
+        """
+        Call to make Redis unreachable; call the result to bring it back.
+        """
+        from redis.exceptions import ConnectionError
+
+        async def unavailable(*args, **kwargs):
+            raise ConnectionError("redis is down")
+
+        commands = ("get", "set", "getdel")
+
+        def take_down():
+            for command in commands:
+                setattr(fake_redis, command, unavailable)
+            return lambda: [delattr(fake_redis, command) for command in commands]
+
+        return take_down
+
+    @pytest.mark.asyncio
+    async def test_token_version_read_from_database_without_redis(self, verified_user, async_client, redis_down):
+        redis_down()
+
+        response = await async_client.get("/auth/me", headers=verified_user["headers"])
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_revocation_holds_without_redis(self, verified_user, async_client, redis_down):
+        response = await async_client.post("/auth/logout-all", headers=verified_user["headers"])
+        assert response.status_code == 200
+
+        redis_down()
+
+        response = await async_client.get("/auth/me", headers=verified_user["headers"])
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_login_during_outage_issues_current_version(self, verified_user, async_client, redis_down):
+        from tests.conftest import login_user
+
+        await async_client.post("/auth/logout-all", headers=verified_user["headers"])
+        bring_back = redis_down()
+
+        token = await login_user(async_client, verified_user["data"]["email"], verified_user["data"]["password"])
+
+        bring_back()
+        response = await async_client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_logout_all_unavailable_without_redis(self, verified_user, async_client, redis_down):
+        redis_down()
+
+        response = await async_client.post("/auth/logout-all", headers=verified_user["headers"])
+        assert response.status_code == 503
+
+        response = await async_client.get("/auth/me", headers=verified_user["headers"])
+        assert response.status_code == 200
+
+
+class TestRefreshToken:
+
+    async def _login(self, async_client, test_user_data):
+        await async_client.post("/auth/register", json=test_user_data)
+        response = await async_client.post(
+            "/auth/login",
+            data={"username": test_user_data["email"], "password": test_user_data["password"]}
+        )
+        return response.json()
+
+    @pytest.mark.asyncio
+    async def test_login_returns_refresh_token(self, async_client, test_user_data):
+        tokens = await self._login(async_client, test_user_data)
+        me = await async_client.get("/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+
+        assert tokens["refresh_token"]
+        assert me.json()["id"] not in tokens["refresh_token"]
+
+    @pytest.mark.asyncio
+    async def test_refresh_rotates_tokens(self, async_client, test_user_data):
+        tokens = await self._login(async_client, test_user_data)
+
+        response = await async_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["refresh_token"] != tokens["refresh_token"]
+
+        me_response = await async_client.get(
+            "/auth/me",
+            headers={"Authorization": f"Bearer {data['access_token']}"}
+        )
+        assert me_response.status_code == 200
+        assert me_response.json()["email"] == test_user_data["email"]
+
+    @pytest.mark.asyncio
+    async def test_refresh_invalid_token(self, async_client):
+        response = await async_client.post("/auth/refresh", json={"refresh_token": "not-a-token"})
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_refresh_reuse_revokes_family(self, async_client, test_user_data):
+        tokens = await self._login(async_client, test_user_data)
+        first = tokens["refresh_token"]
+
+        rotated = await async_client.post("/auth/refresh", json={"refresh_token": first})
+        second = rotated.json()["refresh_token"]
+
+        reuse = await async_client.post("/auth/refresh", json={"refresh_token": first})
+        assert reuse.status_code == 401
+
+        response = await async_client.post("/auth/refresh", json={"refresh_token": second})
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_refresh_rejected_after_logout_all(self, async_client, test_user_data):
+        tokens = await self._login(async_client, test_user_data)
+
+        await async_client.post(
+            "/auth/logout-all",
+            headers={"Authorization": f"Bearer {tokens['access_token']}"}
+        )
+
+        response = await async_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_logout_revokes_refresh_token(self, async_client, test_user_data):
+        tokens = await self._login(async_client, test_user_data)
+
+        response = await async_client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 200
+
+        response = await async_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_logout_without_redis(self, async_client, test_user_data, fake_redis):
+        from redis.exceptions import ConnectionError
+
+        tokens = await self._login(async_client, test_user_data)
+
+        async def unavailable(*args, **kwargs):
+            raise ConnectionError("redis is down")
+
+        fake_redis.getdel = unavailable
+
+        response = await async_client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_refresh_reloads_claims(self, async_client, test_user_data, db_session):
+        from sqlalchemy import update
+        from app.core.security import decode_token
+        from app.models import User
+
+        tokens = await self._login(async_client, test_user_data)
+        await db_session.execute(update(User).where(User.email == test_user_data["email"]).values(is_verified=True))
+        await db_session.commit()
+
+        response = await async_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+        assert response.status_code == 200
+        assert decode_token(response.json()["access_token"])["is_verified"] is True
+
+    @pytest.mark.asyncio
+    async def test_refresh_rejected_for_deleted_user(self, async_client, test_user_data, db_session):
+        from sqlalchemy import delete
+        from app.models import User
+
+        tokens = await self._login(async_client, test_user_data)
+        await db_session.execute(delete(User).where(User.email == test_user_data["email"]))
+        await db_session.commit()
+
+        response = await async_client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 401
+
+
+class TestPasswordHashCost:
+
+    def test_calibration_respects_bounds(self):
+        from app.core.security import calibrate_password_hashing, configure_password_hashing, pwd_context
+
+        try:
+            assert calibrate_password_hashing(target_ms=100000, min_rounds=4, max_rounds=6) == 6
+            assert calibrate_password_hashing(target_ms=0.001, min_rounds=5, max_rounds=6) == 5
+            assert pwd_context.hash("password").startswith("$2b$05$")
+        finally:
+            configure_password_hashing(4)
+
+    @pytest.mark.asyncio
+    async def test_login_upgrades_weaker_hash(self, async_client, test_user_data, db_session):
+        from sqlalchemy import select
+        from app.models import User
+        from app.core.security import configure_password_hashing
+
+        await async_client.post("/auth/register", json=test_user_data)
+
+        configure_password_hashing(5)
+        try:
+            response = await async_client.post(
+                "/auth/login",
+                data={"username": test_user_data["email"], "password": test_user_data["password"]}
+            )
+        finally:
+            configure_password_hashing(4)
+
+        assert response.status_code == 200
+        result = await db_session.execute(select(User).where(User.email == test_user_data["email"]))
+        user = result.scalars().first()
+        await db_session.refresh(user)
+        assert user.password_hash.startswith("$2b$05$")
@@ -72,15 +72,13 @@ class TestCreateComment:
     async def test_create_comment_unverified_user(self, user_with_post, async_client, test_comment_data):
         post_id = user_with_post["post"]["id"]
         
-        from unittest.mock import patch
         new_user_data = {
             "email": "unverified_commenter@example.com",
             "username": "unverified_commenter",
             "full_name": "Unverified Commenter",
             "password": "password123"
         }
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=new_user_data)
+        await async_client.post("/auth/register", json=new_user_data)
         
         login_resp = await async_client.post(
             "/auth/login",
@@ -146,6 +144,24 @@ class TestDeleteComment:
         )
         assert response.status_code == 204
 
+        comments = await async_client.get(f"/posts/{post_id}/comments")
+        assert comments.json() == []
+
+    @pytest.mark.asyncio
+    async def test_delete_comment_under_other_post(self, post_with_comment, second_verified_user, async_client):
+        other_post = await async_client.post(
+            "/posts",
+            json={"title": "Another post", "content": "Elsewhere"},
+            headers=second_verified_user["headers"]
+        )
+        comment_id = post_with_comment["comment"]["id"]
+
+        response = await async_client.delete(
+            f"/posts/{other_post.json()['id']}/comments/{comment_id}",
+            headers=post_with_comment["commenter"]["headers"]
+        )
+        assert response.status_code == 404
+
     @pytest.mark.asyncio
     async def test_delete_comment_non_author(self, post_with_comment, async_client):
         post_id = post_with_comment["post"]["id"]
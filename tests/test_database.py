@@ -0,0 +1,354 @@
+import time
+from uuid import UUID
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, exc, insert, text, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.db_pool import InstrumentedQueuePool
+from app.core.metrics import metrics
+
+
+@pytest_asyncio.fixture
+async def pooled_engine(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.1,
+    )
+    engine.pool.metrics_name = "test"
+    yield engine
+    await engine.dispose()
+
+
+class TestInstrumentedPool:
+
+    @pytest.mark.asyncio
+    async def test_reports_checked_out_and_overflow(self, pooled_engine):
+        async with pooled_engine.connect() as first:
+            await first.execute(text("SELECT 1"))
+            assert metrics.get("db_pool_checked_out", pool="test") == 1
+            assert metrics.get("db_pool_overflow", pool="test") == 0
+
+            async with pooled_engine.connect() as second:
+                await second.execute(text("SELECT 1"))
+                assert metrics.get("db_pool_checked_out", pool="test") == 2
+                assert metrics.get("db_pool_overflow", pool="test") == 1
+
+        assert metrics.get("db_pool_checked_out", pool="test") == 0
+
+    @pytest.mark.asyncio
+    async def test_records_wait_time_and_timeouts(self, pooled_engine):
+        timeouts = metrics.get("db_pool_timeouts_total", pool="test") or 0
+
+        async with pooled_engine.connect() as first, pooled_engine.connect() as second:
+            with pytest.raises(exc.TimeoutError):
+                async with pooled_engine.connect():
+                    pass
+
+        assert metrics.get("db_pool_timeouts_total", pool="test") == timeouts + 1
+        assert metrics.get("db_pool_wait_seconds", pool="test") >= 0.1
+
+    @pytest.mark.asyncio
+    async def test_metrics_endpoint_renders_pool_gauges(self, pooled_engine, async_client, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "scraper-token")
+        async with pooled_engine.connect():
+            pass
+
+        response = await async_client.get("/metrics", headers={"Authorization": "Bearer scraper-token"})
+
+        assert response.status_code == 200
+        assert 'db_pool_checked_out{pool="test"} 0' in response.text
+
+    @pytest.mark.asyncio
+    async def test_metrics_endpoint_requires_token(self, async_client, monkeypatch):
+        from app.core.config import settings
+
+        assert (await async_client.get("/metrics")).status_code == 404
+
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "scraper-token")
+        assert (await async_client.get("/metrics")).status_code == 401
+        response = await async_client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == 401
+
+
+@pytest_asyncio.fixture
+async def replica(tmp_path, monkeypatch, db_session):
+    """
+    A second, empty SQLite database standing in for a replica that hasn't
+    caught up with anything yet.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    from app import dependencies
+    from app.models import Base
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(
+        dependencies, "ReplicaSessionLocal",
+        sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    yield engine
+    await engine.dispose()
+
+
+async def copy_user_to_replica(replica, db_session, user_id: str):
+    from app.models import User
+
+    user = await db_session.get(User, UUID(user_id))
+    async with replica.begin() as conn:
+        await conn.execute(insert(User).values(
+            id=user.id, email=user.email, username=user.username, full_name=user.full_name,
+            password_hash=user.password_hash, is_verified=user.is_verified
+        ))
+    return user
+
+
+class TestReadReplica:
+
+    @pytest.mark.asyncio
+    async def test_reads_go_to_replica(self, replica, user_with_post, async_client):
+        async_client.cookies.clear()
+
+        response = await async_client.get("/posts")
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 0
+
+    @pytest.mark.asyncio
+    async def test_write_pins_client_to_primary(self, replica, verified_user, async_client, db_session, test_post_data):
+        await copy_user_to_replica(replica, db_session, verified_user["user"]["id"])
+        async_client.cookies.clear()
+
+        response = await async_client.post("/posts", json=test_post_data, headers=verified_user["headers"])
+        assert response.status_code == 201
+        assert "last_write" in response.cookies
+
+        response = await async_client.get(f"/posts/{response.json()['id']}")
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_pin_expires(self, replica, user_with_post, async_client):
+        from app.core.config import settings
+
+        async_client.cookies.clear()
+        async_client.cookies.set("last_write", str(time.time() - settings.READ_YOUR_WRITES_SECONDS - 1))
+
+        response = await async_client.get("/all")
+
+        assert response.json()["total"] == 0
+
+    @pytest.mark.asyncio
+    async def test_reads_do_not_set_cookie(self, replica, async_client):
+        response = await async_client.get("/posts")
+
+        assert "last_write" not in response.cookies
+
+    @pytest.mark.asyncio
+    async def test_verification_checks_use_primary(self, replica, unverified_user, async_client, db_session, test_post_data):
+        from app.models import User
+
+        # Verified on the primary only; the API client carries no last_write
+        # cookie from opening the verification link.
+        user = await copy_user_to_replica(replica, db_session, unverified_user["user"]["id"])
+        await db_session.execute(update(User).where(User.id == user.id).values(is_verified=True))
+        await db_session.commit()
+        async_client.cookies.clear()
+
+        response = await async_client.post("/posts", json=test_post_data, headers=unverified_user["headers"])
+
+        assert response.status_code == 201
+
+    @pytest.mark.asyncio
+    async def test_update_profile_writes_through_primary(self, replica, verified_user, async_client, db_session):
+        user = await copy_user_to_replica(replica, db_session, verified_user["user"]["id"])
+        async_client.cookies.clear()
+
+        response = await async_client.patch(
+            "/users/me", json={"full_name": "Renamed"}, headers=verified_user["headers"]
+        )
+
+        assert response.status_code == 200
+        assert response.json()["full_name"] == "Renamed"
+        await db_session.refresh(user)
+        assert user.full_name == "Renamed"
+
+
+class TestUnitOfWork:
+
+    @pytest.mark.asyncio
+    async def test_request_commits_once(self, verified_user, async_client, test_post_data):
+        from sqlalchemy.orm import Session
+
+        commits = []
+        listener = lambda session: commits.append(session)
+        event.listen(Session, "after_commit", listener)
+        try:
+            response = await async_client.post("/posts", json=test_post_data, headers=verified_user["headers"])
+        finally:
+            event.remove(Session, "after_commit", listener)
+
+        assert response.status_code == 201
+        assert response.json()["created_at"] is not None
+        assert len(commits) == 1
+
+    @pytest.mark.asyncio
+    async def test_failure_rolls_back_earlier_writes(self, async_client, test_user_data, db_session, monkeypatch):
+        from sqlalchemy import select
+        from app.models import User
+        from app.services.auth_service import AuthService
+
+        def fail(self, email, token):
+            raise RuntimeError("outbox unavailable")
+
+        monkeypatch.setattr(AuthService, "_queue_verification_email", fail)
+
+        # The user row is already inserted when the failure happens.
+        with pytest.raises(RuntimeError):
+            await async_client.post("/auth/register", json=test_user_data)
+
+        assert await db_session.scalar(select(User).where(User.email == test_user_data["email"])) is None
+
+    @pytest.mark.asyncio
+    async def test_http_error_rolls_back(self, db_session):
+        from fastapi import HTTPException
+        from sqlalchemy import func, select
+        from app.database import unit_of_work
+        from app.models import User
+
+        with pytest.raises(HTTPException):
+            async with unit_of_work(db_session):
+                db_session.add(User(email="a@example.com", username="a", full_name="A", password_hash="x"))
+                await db_session.flush()
+                raise HTTPException(status_code=400)
+
+        assert await db_session.scalar(select(func.count()).select_from(User)) == 0
+
+    @pytest.mark.asyncio
+    async def test_connection_released_before_serialization(self, db_session):
+        from fastapi import APIRouter, Depends, FastAPI
+        from httpx import ASGITransport, AsyncClient
+        from pydantic import BaseModel, model_validator
+        from app.dependencies import UnitOfWorkRoute, get_db
+        from app.main import app
+
+        seen = {}
+
+        class Probe(BaseModel):
+            value: int
+
+            @model_validator(mode="before")
+            @classmethod
+            def record(cls, data):
+                seen["in_transaction"] = seen["session"].in_transaction()
+                return data
+
+        router = APIRouter(route_class=UnitOfWorkRoute)
+
+        @router.get("/probe", response_model=Probe)
+        async def probe(db=Depends(get_db, scope="function")):
+            seen["session"] = db
+            return {"value": (await db.execute(text("SELECT 1"))).scalar()}
+
+        probe_app = FastAPI()
+        probe_app.include_router(router)
+        probe_app.dependency_overrides = app.dependency_overrides
+        async with AsyncClient(transport=ASGITransport(app=probe_app), base_url="http://test") as client:
+            response = await client.get("/probe")
+
+        assert response.json() == {"value": 1}
+        assert seen["in_transaction"] is False
+
+
+class TestStatementTimeout:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("method,path,expected", [
+        ("get", "/users/me", 5.0),
+        ("get", "/all", 2.0),
+        ("get", "/posts?search=x", 2.0),
+        ("post", "/admin/cleanup-unverified?dry_run=true", 60.0),
+    ])
+    async def test_timeout_per_route(self, method, path, expected, verified_user, async_client):
+        from sqlalchemy.orm import Session
+        from app.core.statement_timeout import current_statement_timeout
+
+        seen = []
+        listener = lambda session, transaction, connection: seen.append(current_statement_timeout())
+        event.listen(Session, "after_begin", listener)
+        try:
+            response = await getattr(async_client, method)(path, headers=verified_user["headers"])
+        finally:
+            event.remove(Session, "after_begin", listener)
+
+        assert response.status_code == 200
+        assert seen and set(seen) == {expected}
+        assert current_statement_timeout() is None
+
+    def test_set_local_on_postgres_only(self):
+        from types import SimpleNamespace
+        from app.core.statement_timeout import _set_local_timeout, _statement_timeout
+
+        executed = []
+        connection = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), exec_driver_sql=executed.append)
+        token = _statement_timeout.set(2.5)
+        try:
+            _set_local_timeout(None, None, connection)
+            connection.dialect.name = "sqlite"
+            _set_local_timeout(None, None, connection)
+        finally:
+            _statement_timeout.reset(token)
+        _set_local_timeout(None, None, SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+
+        assert executed == ["SET LOCAL statement_timeout = 2500"]
+
+    @pytest.fixture
+    def failing_feed(self):
+        from app.dependencies import get_feed_service
+        from app.main import app
+
+        def fail_with(error):
+            class FailingFeed:
+                async def get_feed(self, page, page_size):
+                    raise error
+            app.dependency_overrides[get_feed_service] = lambda: FailingFeed()
+
+        yield fail_with
+        app.dependency_overrides.pop(get_feed_service, None)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_statement_returns_504(self, failing_feed, async_client):
+        class QueryCanceled(Exception):
+            sqlstate = "57014"
+
+        failing_feed(exc.DBAPIError("SELECT ...", {}, QueryCanceled("canceling statement due to statement timeout")))
+        before = metrics.get("db_statement_timeouts_total", route="get_feed") or 0
+
+        response = await async_client.get("/all")
+
+        assert response.status_code == 504
+        assert response.json() == {"detail": "Database query timed out"}
+        assert metrics.get("db_statement_timeouts_total", route="get_feed") == before + 1
+
+    @pytest.mark.asyncio
+    async def test_pool_timeout_returns_503(self, failing_feed, async_client):
+        failing_feed(exc.TimeoutError("QueuePool limit reached"))
+
+        response = await async_client.get("/all")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+    @pytest.mark.asyncio
+    async def test_other_database_errors_propagate(self, failing_feed, async_client):
+        failing_feed(exc.DBAPIError("SELECT ...", {}, Exception("connection reset")))
+
+        with pytest.raises(exc.DBAPIError):
+            await async_client.get("/all")
@@ -0,0 +1,157 @@
+import asyncio
+import pytest
+import aiosmtplib
+from email.message import EmailMessage
+
+from app.core import smtp_pool
+from app.core.email import build_verification_message, conf
+
+
+def make_message(recipient: str = "user@example.com") -> EmailMessage:
+    message = EmailMessage()
+    message["To"] = recipient
+    message["Subject"] = "Test"
+    message.set_content("body")
+    return message
+
+
+class TestSMTPConnectionPool:
+
+    @pytest.mark.asyncio
+    async def test_reuses_connection_across_messages(self, fake_smtp):
+        pool = smtp_pool.SMTPConnectionPool(conf, max_size=2)
+
+        for _ in range(3):
+            await pool.send_message(make_message())
+
+        assert len(fake_smtp.instances) == 1
+        assert len(fake_smtp.instances[0].sent) == 3
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_disconnect(self, fake_smtp):
+        pool = smtp_pool.SMTPConnectionPool(conf, max_size=1)
+        await pool.send_message(make_message())
+        fake_smtp.instances[0].fail_next_send = True
+
+        await pool.send_message(make_message())
+
+        assert len(fake_smtp.instances) == 2
+        assert len(fake_smtp.instances[1].sent) == 1
+
+    @pytest.mark.asyncio
+    async def test_caps_concurrent_sessions(self, fake_smtp):
+        pool = smtp_pool.SMTPConnectionPool(conf, max_size=2)
+
+        await asyncio.gather(*(pool.send_message(make_message()) for _ in range(6)))
+
+        assert len(fake_smtp.instances) == 2
+        assert sum(len(smtp.sent) for smtp in fake_smtp.instances) == 6
+
+    @pytest.mark.asyncio
+    async def test_recycles_after_max_messages(self, fake_smtp):
+        pool = smtp_pool.SMTPConnectionPool(conf, max_size=1, max_messages=2)
+
+        for _ in range(3):
+            await pool.send_message(make_message())
+
+        assert len(fake_smtp.instances) == 2
+
+    @pytest.mark.asyncio
+    async def test_drops_idle_connection(self, fake_smtp):
+        pool = smtp_pool.SMTPConnectionPool(conf, max_size=1, idle_timeout=0)
+
+        await pool.send_message(make_message())
+        await asyncio.sleep(0.01)
+        await pool.send_message(make_message())
+
+        assert len(fake_smtp.instances) == 2
+        assert not fake_smtp.instances[0].is_connected
+
+
+class TestVerificationMessage:
+
+    def test_builds_html_message_with_link(self):
+        message = build_verification_message("user@example.com", "abc123")
+
+        assert message["To"] == "user@example.com"
+        assert message["From"] == conf.MAIL_FROM
+        assert message["Subject"] == "Verify Your Email"
+        assert message["Message-ID"] and message["Date"]
+        assert message.get_content_type() == "text/html"
+        assert "/auth/verify-email?token=abc123" in message.get_content()
+
+
+class TestBatchSending:
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_one_session(self, fake_smtp, monkeypatch):
+        from app.core.email import EmailJob, send_verification_emails
+
+        monkeypatch.setattr(smtp_pool, "_pools", smtp_pool.weakref.WeakKeyDictionary())
+        jobs = [EmailJob(email=f"user{i}@example.com", token=f"token{i}") for i in range(3)]
+
+        failed = await send_verification_emails(jobs)
+
+        assert failed == []
+        assert len(fake_smtp.instances) == 1
+        assert len(fake_smtp.instances[0].sent) == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_reports_per_recipient_failures(self, fake_smtp, monkeypatch):
+        from app.core.email import EmailJob, send_verification_emails
+
+        monkeypatch.setattr(smtp_pool, "_pools", smtp_pool.weakref.WeakKeyDictionary())
+        original_send = fake_smtp.send_message
+
+        async def send_message(self, message):
+            if "unknown@example.com" in message["To"]:
+                raise aiosmtplib.SMTPRecipientRefused(550, "No such user", "unknown@example.com")
+            if "busy@example.com" in message["To"]:
+                raise aiosmtplib.SMTPRecipientRefused(451, "Try again later", "busy@example.com")
+            await original_send(self, message)
+
+        monkeypatch.setattr(fake_smtp, "send_message", send_message)
+        jobs = [
+            EmailJob(email="unknown@example.com", token="a"),
+            EmailJob(email="busy@example.com", token="b"),
+            EmailJob(email="ok@example.com", token="c"),
+        ]
+
+        failed = await send_verification_emails(jobs)
+
+        assert [(f.job.email, f.retryable) for f in failed] == [
+            ("unknown@example.com", False),
+            ("busy@example.com", True),
+        ]
+        assert len(fake_smtp.instances[0].sent) == 1
+
+    def test_batch_task_retries_only_retryable_failures(self, monkeypatch):
+        from celery.exceptions import Retry
+        from app import tasks
+        from app.core.email import EmailJob, FailedEmailJob
+
+        async def fake_send(jobs):
+            return [
+                FailedEmailJob(EmailJob("unknown@example.com", "a"), "550", False),
+                FailedEmailJob(EmailJob("busy@example.com", "b"), "451", True),
+            ]
+
+        retried = {}
+
+        def fake_retry(args, countdown):
+            retried["args"] = args
+            retried["countdown"] = countdown
+            return Retry()
+
+        monkeypatch.setattr(tasks, "send_verification_emails", fake_send)
+        monkeypatch.setattr(tasks.send_email_batch_task.celery, "retry", fake_retry)
+
+        with pytest.raises(Retry):
+            tasks.send_email_batch_task.celery.run([
+                {"email": "unknown@example.com", "token": "a"},
+                {"email": "busy@example.com", "token": "b"},
+                {"email": "ok@example.com", "token": "c"},
+            ])
+
+        assert retried["args"] == [[{"email": "busy@example.com", "token": "b"}]]
+        assert retried["countdown"] == 30
@@ -0,0 +1,75 @@
+import pytest
+
+
+class RecordingBackend:
+
+    def __init__(self):
+        self.enqueued = []
+
+    async def enqueue(self, name, *args):
+        self.enqueued.append((name, args))
+
+
+class TestOutboxRelay:
+
+    @pytest.mark.asyncio
+    async def test_registration_writes_outbox_row(self, async_client, test_user_data, db_session):
+        from sqlalchemy import select
+        from app.models import OutboxMessage, EmailVerificationToken
+        from app.tasks import send_email_batch_task
+
+        response = await async_client.post("/auth/register", json=test_user_data)
+
+        assert response.status_code == 201
+        message = (await db_session.execute(select(OutboxMessage))).scalars().one()
+        token = (await db_session.execute(select(EmailVerificationToken))).scalars().one()
+        assert message.task == send_email_batch_task.name
+        assert message.payload == {"email": test_user_data["email"], "token": token.token}
+
+    @pytest.mark.asyncio
+    async def test_relay_publishes_one_batch_per_task_and_deletes_rows(self, db_session):
+        from sqlalchemy import select, func
+        from app.core.outbox_relay import OutboxRelay
+        from app.models import OutboxMessage
+        from app.repositories.outbox_repository import OutboxRepository
+        from tests.conftest import TestingSessionLocal
+
+        repo = OutboxRepository(db_session)
+        for i in range(3):
+            repo.add("app.tasks.send_email_batch_task", {"email": f"user{i}@example.com", "token": f"t{i}"})
+        repo.add("app.tasks.other_task", {"id": 1})
+        await db_session.commit()
+
+        backend = RecordingBackend()
+        relay = OutboxRelay(TestingSessionLocal, backend, batch_size=10)
+
+        assert await relay.relay_once() == 4
+        assert backend.enqueued == [
+            ("app.tasks.send_email_batch_task", ([
+                {"email": f"user{i}@example.com", "token": f"t{i}"} for i in range(3)
+            ],)),
+            ("app.tasks.other_task", ([{"id": 1}],)),
+        ]
+        assert await db_session.scalar(select(func.count()).select_from(OutboxMessage)) == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_publish_keeps_rows(self, db_session):
+        from sqlalchemy import select, func
+        from app.core.outbox_relay import OutboxRelay
+        from app.core.task_backend import TaskBackend
+        from app.models import OutboxMessage
+        from app.repositories.outbox_repository import OutboxRepository
+        from tests.conftest import TestingSessionLocal
+
+        OutboxRepository(db_session).add("app.tasks.send_email_batch_task", {"email": "a@example.com", "token": "t"})
+        await db_session.commit()
+
+        class BrokerDown(TaskBackend):
+            async def enqueue(self, name, *args):
+                raise ConnectionError("broker unavailable")
+
+        relay = OutboxRelay(TestingSessionLocal, BrokerDown(), batch_size=10)
+
+        with pytest.raises(ConnectionError):
+            await relay.relay_once()
+        assert await db_session.scalar(select(func.count()).select_from(OutboxMessage)) == 1
@@ -0,0 +1,258 @@
+import os
+import pytest
+import pytest_asyncio
+from datetime import date, datetime, timezone
+from sqlalchemy import create_engine, event, exc, text
+
+from app.core.partitions import (
+    COMMENTS_PARTITIONED,
+    COMMENTS_PLAIN,
+    LIKES_PARTITIONED,
+    LIKES_PLAIN,
+    _build_copy,
+    _month,
+    comment_partition_ddl,
+    ensure_comment_partitions,
+    is_partitioned,
+    rebuild_table,
+)
+
+
+class TestLayouts:
+
+    def test_unique_constraints_include_partition_key(self):
+        assert "post_id" in LIKES_PARTITIONED.key
+        assert "created_at" in COMMENTS_PARTITIONED.key
+        assert LIKES_PARTITIONED.constraints["uq_user_post_like"] == "UNIQUE (user_id, post_id)"
+
+    def test_comment_partition_bounds(self):
+        assert comment_partition_ddl(date(2026, 12, 17)) == (
+            "CREATE TABLE IF NOT EXISTS comments_y2026m12 PARTITION OF comments "
+            "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+        )
+
+
+@pytest.fixture
+def statements(db_session):
+    captured = []
+    listener = lambda conn, cursor, statement, *args: captured.append(" ".join(statement.split()))
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", listener)
+    yield captured
+    event.remove(engine, "before_cursor_execute", listener)
+
+
+def touching(statements: list[str], table: str) -> list[str]:
+    return [s for s in statements if f"FROM {table} " in s or s.startswith(f"DELETE FROM {table}")]
+
+
+@pytest_asyncio.fixture
+async def seeded_like(db_session):
+    from app.models import Like, Post, User
+
+    author = User(email="author@example.com", username="author", full_name="Author", password_hash="x")
+    fan = User(email="fan@example.com", username="fan", full_name="Fan", password_hash="x")
+    db_session.add_all([author, fan])
+    await db_session.flush()
+    post = Post(author_id=author.id, title="Post", content="content")
+    db_session.add(post)
+    await db_session.flush()
+    like = Like(post_id=post.id, user_id=fan.id)
+    db_session.add(like)
+    await db_session.commit()
+    return like
+
+
+class TestPartitionKeyInQueries:
+    """
+    Every query on likes filters on post_id and every query on comments
+    bounds created_at, so a partitioned table prunes.
+    """
+
+    @pytest.mark.asyncio
+    async def test_comment_queries(self, post_with_comment, async_client, statements):
+        post_id = post_with_comment["post"]["id"]
+        comment_id = post_with_comment["comment"]["id"]
+
+        await async_client.get(f"/posts/{post_id}")
+        await async_client.get(f"/posts/{post_id}/comments")
+        response = await async_client.delete(
+            f"/posts/{post_id}/comments/{comment_id}", headers=post_with_comment["commenter"]["headers"]
+        )
+
+        assert response.status_code == 204
+        queries = touching(statements, "comments")
+        assert queries
+        assert all("comments.created_at >=" in query for query in queries), queries
+
+    @pytest.mark.asyncio
+    async def test_like_queries(self, db_session, seeded_like, statements):
+        from app.repositories.like_repository import LikeRepository
+
+        repo = LikeRepository(db_session)
+        like = seeded_like
+        await repo.get_by_user_and_post(like.user_id, like.post_id)
+        await repo.count_by_post_id(like.post_id)
+        await repo.get_user_ids_by_post(like.post_id)
+        await repo.delete(like)
+
+        queries = touching(statements, "likes")
+        assert len(queries) == 4
+        assert all("likes.post_id =" in query for query in queries), queries
+
+
+
+@pytest.fixture
+def pg():
+    """
+    An empty Postgres database from TEST_POSTGRES_URL (postgresql+psycopg2://...),
+    e.g. a throwaway local instance or a CI service container.
+    """
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL not set")
+    engine = create_engine(url, isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        conn.exec_driver_sql("DROP SCHEMA public CASCADE; CREATE SCHEMA public")
+    yield engine
+    engine.dispose()
+
+
+def seed(conn, likes: int = 30) -> dict:
+    # Plain SQL, so it also works on the schema of older revisions.
+    from app.core.ids import uuid7
+
+    user_ids, post_ids = [uuid7() for _ in range(likes)], [uuid7() for _ in range(3)]
+    conn.execute(text(
+        "INSERT INTO users (id, email, username, full_name, password_hash, is_verified) "
+        "VALUES (:id, :email, :username, 'User', 'x', false)"
+    ), [{"id": user_id, "email": f"user{i}@example.com", "username": f"user{i}"} for i, user_id in enumerate(user_ids)])
+    conn.execute(text(
+        "INSERT INTO posts (id, author_id, title, content) VALUES (:id, :author, 'Post', 'content')"
+    ), [{"id": post_id, "author": user_ids[0]} for post_id in post_ids])
+    conn.execute(text(
+        "INSERT INTO likes (id, user_id, post_id) VALUES (:id, :user, :post)"
+    ), [{"id": uuid7(), "user": user_id, "post": post_ids[i % 3]} for i, user_id in enumerate(user_ids)])
+    conn.execute(text(
+        "INSERT INTO comments (id, post_id, author_id, content, created_at) VALUES (:id, :post, :author, :content, :at)"
+    ), [
+        {"id": uuid7(), "post": post_ids[0], "author": user_ids[1], "content": "old", "at": datetime(2025, 1, 15)},
+        {"id": uuid7(), "post": post_ids[1], "author": user_ids[2], "content": "new", "at": datetime.now()},
+    ])
+    return {"users": user_ids, "posts": post_ids}
+
+
+def count(conn, table: str) -> int:
+    return conn.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+
+
+class TestRebuildOnPostgres:
+
+    @pytest.fixture
+    def conn(self, pg):
+        from app.models import Base
+
+        Base.metadata.create_all(pg)
+        with pg.connect() as conn:
+            yield conn
+
+    def test_round_trip(self, conn):
+        seeded = seed(conn)
+
+        assert rebuild_table(conn, LIKES_PARTITIONED, batch_size=7) == 30
+        assert rebuild_table(conn, COMMENTS_PARTITIONED) == 2
+        assert is_partitioned(conn, "likes") and is_partitioned(conn, "comments")
+        assert count(conn, "likes") == 30
+        assert conn.execute(text(
+            "SELECT tableoid::regclass::text FROM comments WHERE content = 'old'"
+        )).scalar() == "comments_y2025m01"
+        constraints = conn.execute(text(
+            "SELECT conname FROM pg_constraint WHERE conrelid = 'likes'::regclass"
+        )).scalars().all()
+        assert set(constraints) == set(LIKES_PARTITIONED.constraints)
+        with pytest.raises(exc.IntegrityError):
+            conn.execute(text("INSERT INTO likes (id, user_id, post_id) VALUES (gen_random_uuid(), :user, :post)"),
+                         {"user": seeded["users"][0], "post": seeded["posts"][0]})
+
+        rebuild_table(conn, COMMENTS_PLAIN)
+        rebuild_table(conn, LIKES_PLAIN)
+        assert not is_partitioned(conn, "likes") and not is_partitioned(conn, "comments")
+        assert count(conn, "likes") == 30
+        assert count(conn, "comments") == 2
+
+    def test_resume_keeps_writes_made_meanwhile(self, conn):
+        seeded = seed(conn)
+        # An interrupted run: the copy and its trigger exist, nothing backfilled.
+        _build_copy(conn, LIKES_PARTITIONED, "likes_new")
+        conn.execute(text("DELETE FROM likes WHERE user_id = :user"), {"user": seeded["users"][0]})
+        conn.execute(text("INSERT INTO likes (id, user_id, post_id) VALUES (gen_random_uuid(), :user, :post)"),
+                     {"user": seeded["users"][1], "post": seeded["posts"][2]})
+
+        rebuild_table(conn, LIKES_PARTITIONED, batch_size=7)
+
+        assert count(conn, "likes") == 30
+        assert conn.execute(text("SELECT count(*) FROM likes WHERE user_id = :user"), {"user": seeded["users"][0]}).scalar() == 0
+        assert conn.execute(text("SELECT to_regclass('likes_new')")).scalar() is None
+
+    def test_refuses_to_swap_out_of_sync_copy(self, conn):
+        seeded = seed(conn)
+        _build_copy(conn, LIKES_PARTITIONED, "likes_new")
+        # A row the live table doesn't have, as if a mirrored delete went missing.
+        conn.execute(text("INSERT INTO likes_new (id, user_id, post_id) VALUES (gen_random_uuid(), :user, :post)"),
+                     {"user": seeded["users"][0], "post": seeded["posts"][2]})
+
+        with pytest.raises(RuntimeError, match="re-run"):
+            rebuild_table(conn, LIKES_PARTITIONED)
+        assert not is_partitioned(conn, "likes")
+        assert count(conn, "likes") == 30
+
+    def test_creates_partition_for_rows_in_default(self, conn):
+        seeded = seed(conn)
+        rebuild_table(conn, COMMENTS_PARTITIONED)
+        next_month = _month(datetime.now(timezone.utc).date(), 1)
+        name = f"comments_y{next_month.year}m{next_month.month:02d}"
+        # As if the scheduled job had not run: next month's rows land in the default.
+        conn.exec_driver_sql(f"DROP TABLE {name}")
+        conn.execute(text(
+            "INSERT INTO comments (id, post_id, author_id, content, created_at) "
+            "VALUES (gen_random_uuid(), :post, :author, 'early', :at)"
+        ), {"post": seeded["posts"][0], "author": seeded["users"][0], "at": next_month})
+
+        assert ensure_comment_partitions(conn) == 1
+        assert conn.execute(text(
+            "SELECT tableoid::regclass::text FROM comments WHERE content = 'early'"
+        )).scalar() == name
+        assert count(conn, "comments_default") == 0
+        assert ensure_comment_partitions(conn) == 0
+
+
+class TestPartitionMigrationOnPostgres:
+
+    def alembic(self, pg, *x: str):
+        from argparse import Namespace
+        from alembic.config import Config
+
+        # No ini file, so env.py leaves the test run's logging alone.
+        config = Config(cmd_opts=Namespace(x=list(x)))
+        config.set_main_option("script_location", "alembic")
+        config.set_main_option("sqlalchemy.url", pg.url.render_as_string(hide_password=False).replace("%", "%%"))
+        return config
+
+    def test_upgrade_and_downgrade(self, pg, monkeypatch):
+        from alembic import command
+
+        monkeypatch.delenv("DATABASE_URL", raising=False)
+        command.upgrade(self.alembic(pg), "5c8e1f0a7b32")
+        with pg.connect() as conn:
+            seed(conn)
+
+        command.upgrade(self.alembic(pg, "partition=true"), "head")
+        with pg.connect() as conn:
+            assert is_partitioned(conn, "likes") and is_partitioned(conn, "comments")
+            assert count(conn, "likes") == 30
+            assert count(conn, "comments") == 2
+
+        command.downgrade(self.alembic(pg), "5c8e1f0a7b32")
+        with pg.connect() as conn:
+            assert not is_partitioned(conn, "likes") and not is_partitioned(conn, "comments")
+            assert count(conn, "likes") == 30
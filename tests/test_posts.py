@@ -261,6 +261,22 @@ class TestListPosts:
         assert data["total"] == 5
         assert data["pages"] == 3
 
+    @pytest.mark.asyncio
+    async def test_list_posts_newest_first_within_same_second(self, verified_user, async_client):
+        # SQLite timestamps have one-second resolution, so these share
+        # created_at and only the time-ordered ids tell them apart.
+        for i in range(5):
+            post_data = {"title": f"Post number {i+1}", "content": f"Content for post {i+1}"}
+            await async_client.post("/posts", json=post_data, headers=verified_user["headers"])
+
+        pages = [
+            (await async_client.get(f"/posts?page={page}&page_size=2")).json()["items"]
+            for page in (1, 2, 3)
+        ]
+
+        titles = [item["title"] for items in pages for item in items]
+        assert titles == [f"Post number {i}" for i in range(5, 0, -1)]
+
     @pytest.mark.asyncio
     async def test_list_posts_search(self, verified_user, async_client):
         await async_client.post(
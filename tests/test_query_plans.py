@@ -0,0 +1,189 @@
+import re
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import event, literal_column, select, text
+
+from app.models import Base
+
+
+async def query_plan(session, statement) -> str:
+    compiled = statement.compile(session.bind, compile_kwargs={"literal_binds": True})
+    rows = (await session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+# Plan lines that read a whole table: a plain "SCAN posts", a walk over a
+# whole index ("SCAN likes USING COVERING INDEX ..."; fine only when a LIMIT
+# stops it early), or an AUTOMATIC index SQLite builds per query by scanning.
+FULL_SCAN = re.compile(
+    r"^(?:SCAN (?:TABLE )?(\w+)(?: AS \w+)?( USING .*INDEX .*)?|SEARCH (\w+)(?: AS \w+)? USING AUTOMATIC .*)$",
+    re.MULTILINE
+)
+# Unfiltered pagination totals count the whole table by design.
+WHOLE_TABLE_COUNT = re.compile(r"^SELECT count\([^)]*\)(?: AS \w+)? FROM \w+$")
+
+
+def full_scans(statement: str, plan: str) -> list[str]:
+    scanned = []
+    for table, index, automatic in FULL_SCAN.findall(plan):
+        if automatic:
+            scanned.append(automatic)
+        elif not (index and "LIMIT" in statement):
+            scanned.append(table)
+    return scanned
+
+
+@pytest_asyncio.fixture
+async def seeded(db_session):
+    from app.models import Comment, Like, Post, User
+
+    users = [
+        User(email=f"user{i}@example.com", username=f"user{i}", full_name=f"User {i}", password_hash="x")
+        for i in range(3)
+    ]
+    db_session.add_all(users)
+    await db_session.flush()
+    posts = [
+        Post(author_id=users[i % 3].id, title=f"Post {i}", content="content", created_at=datetime(2026, 1, 1) + timedelta(hours=i))
+        for i in range(6)
+    ]
+    db_session.add_all(posts)
+    await db_session.flush()
+    for i, post in enumerate(posts):
+        db_session.add(Comment(post_id=post.id, author_id=users[(i + 1) % 3].id, content="comment"))
+        db_session.add(Like(post_id=post.id, user_id=users[(i + 2) % 3].id))
+    await db_session.commit()
+    return users, posts
+
+
+class CapturedQueries:
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append((statement, parameters))
+
+    async def full_scans(self, session) -> list[str]:
+        tables = set(Base.metadata.tables)
+        scans = []
+        connection = await session.connection()
+        for statement, parameters in self.statements:
+            if WHOLE_TABLE_COUNT.match(" ".join(statement.split())):
+                continue
+            rows = (await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+            plan = "\n".join(row[-1] for row in rows)
+            scans += [f"{table} in: {statement}" for table in full_scans(statement, plan) if table in tables]
+        return scans
+
+
+@pytest_asyncio.fixture
+async def captured(db_session, seeded):
+    """
+    Records the SELECTs emitted while a test runs repository methods, so the
+    plans checked are those of the real queries, selectinloads included.
+    """
+    capture = CapturedQueries(db_session.bind.sync_engine)
+    event.listen(capture.engine, "before_cursor_execute", capture)
+    yield capture
+    event.remove(capture.engine, "before_cursor_execute", capture)
+
+
+class TestRepositoryPlans:
+
+    @pytest.mark.asyncio
+    async def test_post_list(self, db_session, captured):
+        from app.repositories.post_repository import PostRepository
+
+        results, total = await PostRepository(db_session).get_list(page=2, page_size=2)
+        await PostRepository(db_session).get_list(date_from=datetime(2026, 1, 1, 2))
+
+        assert total == 6 and len(results) == 2
+        assert await captured.full_scans(db_session) == []
+
+    @pytest.mark.asyncio
+    async def test_post_details(self, db_session, seeded, captured):
+        from app.repositories.like_repository import LikeRepository
+        from app.repositories.post_repository import PostRepository
+
+        _, posts = seeded
+        details = await PostRepository(db_session).get_by_id(posts[0].id)
+        await LikeRepository(db_session).get_user_ids_by_post(posts[0].id)
+        await LikeRepository(db_session).count_by_post_id(posts[0].id)
+
+        assert details["likes_count"] == 1 and details["comments_count"] == 1
+        assert await captured.full_scans(db_session) == []
+
+    @pytest.mark.asyncio
+    async def test_author_posts(self, db_session, seeded, captured):
+        from app.repositories.post_repository import PostRepository
+
+        users, _ = seeded
+        await PostRepository(db_session).get_posts_by_author(users[0].id)
+
+        assert await captured.full_scans(db_session) == []
+
+    @pytest.mark.asyncio
+    async def test_comment_listing(self, db_session, seeded, captured):
+        from app.repositories.comment_repository import CommentRepository
+
+        _, posts = seeded
+        comments = await CommentRepository(db_session).get_by_post_id(posts[0].id)
+
+        assert len(comments) == 1
+        assert await captured.full_scans(db_session) == []
+
+    @pytest.mark.asyncio
+    async def test_like_lookup(self, db_session, seeded, captured):
+        from app.repositories.like_repository import LikeRepository
+
+        users, posts = seeded
+        await LikeRepository(db_session).get_by_user_and_post(users[2].id, posts[0].id)
+        await LikeRepository(db_session).get_by_post_id(posts[0].id)
+
+        assert await captured.full_scans(db_session) == []
+
+    @pytest.mark.asyncio
+    async def test_feed(self, db_session, captured):
+        from app.repositories.feed_repository import FeedRepository
+
+        users, total = await FeedRepository(db_session).get_feed(page=1, page_size=2)
+
+        assert total == 3 and len(users) == 2
+        assert await captured.full_scans(db_session) == []
+
+    @pytest.mark.asyncio
+    async def test_detects_full_scans(self, db_session, captured):
+        from app.models import Post
+
+        await db_session.execute(select(Post).where(Post.title == "Post 1"))
+
+        assert len(await captured.full_scans(db_session)) == 1
+
+
+class TestVerificationTokenPlans:
+
+    @pytest.mark.asyncio
+    async def test_prune_batch_uses_expiry_index(self, db_session):
+        from app.models import EmailVerificationToken as Token
+
+        plan = await query_plan(
+            db_session,
+            select(Token.id).where(Token.expires_at < datetime(2026, 1, 1)).limit(1000)
+        )
+
+        assert "ix_email_verification_tokens_expires_at" in plan
+
+    @pytest.mark.asyncio
+    async def test_per_user_delete_uses_user_index(self, db_session):
+        from app.models import EmailVerificationToken as Token
+
+        plan = await query_plan(
+            db_session,
+            select(Token.id).where(Token.user_id == literal_column("'user-id'"))
+        )
+
+        assert "ix_email_verification_tokens_user_id" in plan
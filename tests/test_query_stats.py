@@ -0,0 +1,88 @@
+import re
+import pytest
+
+from app.core.metrics import metrics
+from app.core.query_stats import fingerprint, QueryStats
+
+
+class TestFingerprint:
+
+    def test_literals_and_placeholders_collapse(self):
+        assert fingerprint("SELECT * FROM users WHERE id = 42 AND email = 'a@b.c'") == \
+            "SELECT * FROM users WHERE id = ? AND email = ?"
+        assert fingerprint("SELECT * FROM users WHERE id = $1") == "SELECT * FROM users WHERE id = ?"
+
+    def test_in_lists_of_any_length_compare_equal(self):
+        assert fingerprint("SELECT * FROM users WHERE id IN (?, ?)") == \
+            fingerprint("SELECT * FROM users WHERE id IN (?,\n  ?, ?)")
+
+    def test_repeated_statements(self):
+        stats = QueryStats()
+        for user_id in range(3):
+            stats.record(f"SELECT * FROM users WHERE id = {user_id}", 0.001)
+        stats.record("SELECT count(*) FROM posts", 0.001)
+
+        assert stats.count == 4
+        assert stats.repeated() == {"SELECT * FROM users WHERE id = ?": 3}
+
+
+class TestServerTiming:
+
+    @pytest.mark.asyncio
+    async def test_header_reports_queries(self, user_with_post, async_client):
+        response = await async_client.get(f"/posts/{user_with_post['post']['id']}")
+
+        assert response.status_code == 200
+        match = re.fullmatch(r'db;dur=([\d.]+);desc="(\d+) queries"', response.headers["server-timing"])
+        assert match
+        assert int(match.group(2)) > 0
+
+    @pytest.mark.asyncio
+    async def test_metrics_labelled_by_route(self, verified_user, async_client):
+        before = metrics.get("http_db_queries", route="get_profile") or 0
+
+        await async_client.get("/users/me", headers=verified_user["headers"])
+
+        assert metrics.get("http_db_queries", route="get_profile") == before + 1
+
+
+class TestQueryBudgets:
+
+    @pytest.mark.asyncio
+    async def test_list_posts(self, user_with_post, async_client, query_budget):
+        with query_budget(3):
+            response = await async_client.get("/posts")
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_get_post(self, post_with_comment, async_client, query_budget):
+        # Post and comment authors are two selectinloads of the same shape.
+        with query_budget(5, allow_repeats=True):
+            response = await async_client.get(f"/posts/{post_with_comment['post']['id']}")
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_create_post(self, verified_user, async_client, test_post_data, query_budget):
+        with query_budget(2):
+            response = await async_client.post("/posts", json=test_post_data, headers=verified_user["headers"])
+        assert response.status_code == 201
+
+    @pytest.mark.asyncio
+    async def test_update_profile(self, verified_user, async_client, query_budget):
+        with query_budget(2):
+            response = await async_client.patch(
+                "/users/me", json={"full_name": "Renamed"}, headers=verified_user["headers"]
+            )
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_feed(self, verified_user, async_client, query_budget):
+        with query_budget(4):
+            response = await async_client.get("/all")
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_repeats_are_flagged(self, post_with_comment, async_client, query_budget):
+        with pytest.raises(AssertionError, match="repeated statements"):
+            with query_budget(10):
+                await async_client.get(f"/posts/{post_with_comment['post']['id']}")
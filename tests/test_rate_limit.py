@@ -0,0 +1,198 @@
+import time
+import pytest
+from starlette.requests import Request
+
+from app.core import limiter as limiter_module
+from app.core.limiter import Limiter, parse_rate, get_user_or_remote_address, limiter
+from app.core.security import create_access_token
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock(1000.0)
+    monkeypatch.setattr(limiter_module, "time", fake)
+    return fake
+
+
+def make_request(headers: dict | None = None, client_host: str = "10.0.0.1") -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": (client_host, 1234),
+    })
+
+
+class TestTokenBucket:
+
+    def test_parse_rate(self):
+        assert parse_rate("5/minute").amount == 5
+        assert parse_rate("5/minute").period == 60
+        assert parse_rate("100 per hour").period == 3600
+        with pytest.raises(ValueError):
+            parse_rate("lots")
+
+    def test_bucket_refills_over_time(self):
+        local = Limiter(key_func=get_user_or_remote_address)
+        rate = parse_rate("2/second")
+
+        assert local.hit("scope", "key", rate, now=0.0)
+        assert local.hit("scope", "key", rate, now=0.0)
+        assert not local.hit("scope", "key", rate, now=0.0)
+        assert local.hit("scope", "key", rate, now=0.5)
+
+    def test_keys_are_independent(self):
+        local = Limiter(key_func=get_user_or_remote_address)
+        rate = parse_rate("1/minute")
+
+        assert local.hit("scope", "a", rate, now=0.0)
+        assert local.hit("scope", "b", rate, now=0.0)
+        assert not local.hit("scope", "a", rate, now=0.0)
+
+
+class TestKeyFunc:
+
+    def test_anonymous_request_keyed_by_ip(self):
+        assert get_user_or_remote_address(make_request()) == "ip:10.0.0.1"
+
+    def test_authenticated_request_keyed_by_user(self):
+        token = create_access_token({"sub": "a1b2"})
+        request = make_request({"Authorization": f"Bearer {token}"})
+        assert get_user_or_remote_address(request) == "user:a1b2"
+
+    def test_invalid_token_falls_back_to_ip(self):
+        request = make_request({"Authorization": "Bearer garbage"})
+        assert get_user_or_remote_address(request) == "ip:10.0.0.1"
+
+
+class TestRedisSync:
+
+    @pytest.mark.asyncio
+    async def test_sync_pushes_hits_to_redis(self, fake_redis):
+        local = Limiter(key_func=get_user_or_remote_address)
+        rate = parse_rate("10/minute")
+        local.hit("scope", "key", rate)
+        local.hit("scope", "key", rate)
+
+        await local.sync()
+
+        window = int(time.time() // 60)
+        assert await fake_redis.get(f"ratelimit:scope:key:{window}") == "2"
+
+    @pytest.mark.asyncio
+    async def test_global_count_blocks_key(self, fake_redis):
+        local = Limiter(key_func=get_user_or_remote_address)
+        rate = parse_rate("10/minute")
+        window = int(time.time() // 60)
+        await fake_redis.set(f"ratelimit:scope:key:{window}", 9)
+
+        assert local.hit("scope", "key", rate)
+        await local.sync()
+
+        assert not local.hit("scope", "key", rate)
+
+    @pytest.mark.asyncio
+    async def test_sync_fails_open(self, fake_redis):
+        local = Limiter(key_func=get_user_or_remote_address)
+        rate = parse_rate("10/minute")
+
+        def unavailable(*args, **kwargs):
+            raise ConnectionError("redis is down")
+
+        fake_redis.pipeline = unavailable
+        assert local.hit("scope", "key", rate)
+        await local.sync()
+
+        assert local.hit("scope", "key", rate)
+
+    @pytest.mark.asyncio
+    async def test_hits_from_an_outage_are_not_counted_late(self, fake_redis, clock):
+        local = Limiter(key_func=get_user_or_remote_address)
+        rate = parse_rate("5/second")
+
+        def unavailable(*args, **kwargs):
+            raise ConnectionError("redis is down")
+
+        fake_redis.pipeline = unavailable
+        # Five hits over 2.5 seconds never exceed five per second.
+        for _ in range(5):
+            assert local.hit("scope", "key", rate)
+            await local.sync()
+            clock.now += 0.5
+
+        del fake_redis.pipeline
+        await local.sync()
+
+        assert local.hit("scope", "key", rate)
+        assert await fake_redis.get("ratelimit:scope:key:1002") == "1"
+
+    @pytest.mark.asyncio
+    async def test_idle_buckets_pruned_while_redis_is_down(self, fake_redis, clock):
+        local = Limiter(key_func=get_user_or_remote_address)
+        rate = parse_rate("5/second")
+
+        def unavailable(*args, **kwargs):
+            raise ConnectionError("redis is down")
+
+        fake_redis.pipeline = unavailable
+        for i in range(100):
+            local.hit("scope", f"key{i}", rate)
+        await local.sync()
+        assert len(local._buckets) == 100
+
+        clock.now += 2
+        await local.sync()
+
+        assert local._buckets == {}
+
+
+class TestLoginRateLimit:
+
+    @pytest.mark.asyncio
+    async def test_login_limited_after_five_attempts(self, async_client, monkeypatch):
+        monkeypatch.setattr(limiter, "enabled", True)
+        monkeypatch.setattr(limiter, "_buckets", {})
+
+        for _ in range(5):
+            response = await async_client.post(
+                "/auth/login",
+                data={"username": "nobody@example.com", "password": "password123"}
+            )
+            assert response.status_code == 401
+
+        response = await async_client.post(
+            "/auth/login",
+            data={"username": "nobody@example.com", "password": "password123"}
+        )
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+
+    @pytest.mark.asyncio
+    async def test_bearer_tokens_do_not_reset_login_limit(self, async_client, monkeypatch):
+        monkeypatch.setattr(limiter, "enabled", True)
+        monkeypatch.setattr(limiter, "_buckets", {})
+        tokens = [create_access_token({"sub": f"account-{i}"}) for i in range(4)]
+
+        statuses = []
+        for i in range(20):
+            response = await async_client.post(
+                "/auth/login",
+                data={"username": "victim@example.com", "password": "guess"},
+                headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+            )
+            statuses.append(response.status_code)
+
+        assert statuses[:5] == [401] * 5
+        assert set(statuses[5:]) == {429}
@@ -0,0 +1,270 @@
+import asyncio
+import pytest
+
+
+class TestCeleryRouting:
+
+    @pytest.mark.parametrize("name", ["app.tasks.send_email_task", "app.tasks.send_email_batch_task"])
+    def test_email_tasks_use_email_queue_without_results(self, name):
+        from app import tasks  # noqa: F401 - registers the tasks
+        from app.core.celery_app import celery, EMAIL_QUEUE
+
+        task = celery.tasks[name]
+        assert celery.amqp.router.route({}, name)["queue"].name == EMAIL_QUEUE
+        assert task.ignore_result
+        assert not task.acks_late
+        assert task.priority == 0
+
+    def test_maintenance_tasks_ack_late(self):
+        from app import tasks
+        from app.core.celery_app import celery
+
+        assert celery.tasks[tasks.cleanup_unverified_users_task.name].acks_late
+
+    def test_unrouted_tasks_go_to_maintenance(self):
+        from app.core.celery_app import celery, MAINTENANCE_QUEUE
+
+        assert celery.amqp.router.route({}, "app.tasks.something_else")["queue"].name == MAINTENANCE_QUEUE
+
+
+class TestWorkerLoop:
+
+    @pytest.fixture(autouse=True)
+    def worker_loop(self):
+        from app.core import worker_loop
+        yield worker_loop
+        worker_loop.stop_worker_loop()
+
+    def test_tasks_share_one_loop_and_smtp_session(self, fake_smtp):
+        from app import tasks
+
+        tasks.send_email_task.celery.run("first@example.com", "a")
+        tasks.send_email_task.celery.run("second@example.com", "b")
+
+        assert len(fake_smtp.instances) == 1
+        assert len(fake_smtp.instances[0].sent) == 2
+
+    def test_shutdown_closes_pooled_sessions(self, fake_smtp, worker_loop):
+        from app import tasks
+
+        tasks.send_email_task.celery.run("first@example.com", "a")
+        worker_loop.stop_worker_loop()
+
+        assert not fake_smtp.instances[0].is_connected
+
+    def test_exceptions_propagate_to_caller(self, worker_loop):
+        async def boom():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            worker_loop.run_async(boom())
+
+    def run_as_worker(self, celery_task, *args, retries=0):
+        # What the worker does: push the request context on this thread, then run.
+        celery_task.push_request(id="task-id", args=list(args), kwargs={}, retries=retries, called_directly=False)
+        try:
+            return celery_task.run(*args)
+        finally:
+            celery_task.pop_request()
+
+    def test_failed_task_is_republished_with_backoff(self, monkeypatch):
+        from celery.exceptions import Retry
+        from app.core import task_backend
+        from app.core.task_backend import task
+
+        monkeypatch.setattr(task_backend, "_registry", {})
+
+        @task("tests.flaky_task", max_retries=3, retry_backoff=10.0)
+        async def flaky(value):
+            raise RuntimeError("down")
+
+        published = []
+        monkeypatch.setattr(flaky.celery, "apply_async", lambda *args, **options: published.append((args, options)))
+
+        with pytest.raises(Retry):
+            self.run_as_worker(flaky.celery, "x", retries=1)
+
+        [((args, kwargs), options)] = published
+        assert list(args) == ["x"]
+        assert options["retries"] == 2
+        assert options["countdown"] == 20.0
+
+    def test_gives_up_after_max_retries(self, monkeypatch):
+        from app.core import task_backend
+        from app.core.task_backend import task
+
+        monkeypatch.setattr(task_backend, "_registry", {})
+
+        @task("tests.broken_task", max_retries=2)
+        async def broken():
+            raise RuntimeError("down")
+
+        published = []
+        monkeypatch.setattr(broken.celery, "apply_async", lambda *args, **options: published.append(args))
+
+        with pytest.raises(RuntimeError):
+            self.run_as_worker(broken.celery, retries=2)
+        assert published == []
+
+    def test_batch_retries_only_failed_recipients(self, monkeypatch):
+        from celery.exceptions import Retry
+        from app import tasks
+        from app.core.email import EmailJob, FailedEmailJob
+
+        async def send(jobs):
+            return [
+                FailedEmailJob(EmailJob("busy@example.com", "b"), "try later", retryable=True),
+                FailedEmailJob(EmailJob("gone@example.com", "c"), "no such user", retryable=False),
+            ]
+
+        published = []
+        monkeypatch.setattr(tasks, "send_verification_emails", send)
+        monkeypatch.setattr(tasks.send_email_batch_task.celery, "apply_async", lambda *args, **options: published.append((args, options)))
+
+        jobs = [{"email": f"{name}@example.com", "token": token} for name, token in [("sent", "a"), ("busy", "b"), ("gone", "c")]]
+        with pytest.raises(Retry):
+            self.run_as_worker(tasks.send_email_batch_task.celery, jobs)
+
+        [((args, kwargs), options)] = published
+        assert list(args) == [[{"email": "busy@example.com", "token": "b"}]]
+        assert options["retries"] == 1
+
+
+class TestInProcessTaskBackend:
+
+    @pytest.fixture
+    def registry(self, monkeypatch):
+        from app.core import task_backend
+
+        registry = {}
+        monkeypatch.setattr(task_backend, "_registry", registry)
+
+        def register(name, func, max_retries=3, retry_backoff=0.0):
+            registry[name] = task_backend.TaskSpec(name, func, max_retries, retry_backoff)
+
+        return register
+
+    def make_backend(self, **kwargs):
+        from app.core.task_backend import InProcessTaskBackend
+
+        options = {"max_queue_size": 10, "concurrency": 2, "drain_timeout": 5}
+        return InProcessTaskBackend(**{**options, **kwargs})
+
+    def test_backend_must_implement_enqueue(self):
+        from app.core.task_backend import TaskBackend
+
+        class Incomplete(TaskBackend):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    @pytest.mark.asyncio
+    async def test_runs_tasks_and_drains(self, registry):
+        done = []
+
+        async def record(value):
+            await asyncio.sleep(0.01)
+            done.append(value)
+
+        registry("record", record)
+        backend = self.make_backend()
+        for i in range(5):
+            await backend.enqueue("record", i)
+        await backend.drain()
+
+        assert sorted(done) == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_respects_concurrency_limit(self, registry):
+        running = peak = 0
+
+        async def slow():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        registry("slow", slow)
+        backend = self.make_backend(concurrency=3)
+        for _ in range(9):
+            await backend.enqueue("slow")
+        await backend.drain()
+
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_retry_reruns_with_new_arguments(self, registry):
+        from app.core.task_backend import Retry
+
+        calls = []
+
+        async def flaky(items):
+            calls.append(items)
+            if len(items) > 1:
+                raise Retry(args=[items[1:]])
+
+        registry("flaky", flaky)
+        backend = self.make_backend()
+        await backend.enqueue("flaky", ["sent", "busy"])
+        await asyncio.sleep(0.05)
+        await backend.drain()
+
+        assert calls == [["sent", "busy"], ["busy"]]
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, registry):
+        calls = 0
+
+        async def broken():
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("down")
+
+        registry("broken", broken, max_retries=2)
+        backend = self.make_backend()
+        await backend.enqueue("broken")
+        await asyncio.sleep(0.05)
+        await backend.drain()
+
+        assert calls == 3
+
+    @pytest.mark.asyncio
+    async def test_full_queue_blocks_producer(self, registry):
+        release = asyncio.Event()
+
+        async def wait():
+            await release.wait()
+
+        registry("wait", wait)
+        backend = self.make_backend(max_queue_size=1, concurrency=1)
+        await backend.enqueue("wait")
+        await asyncio.sleep(0)
+        await backend.enqueue("wait")
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(backend.enqueue("wait"), 0.05)
+
+        release.set()
+        await backend.drain()
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_task(self, registry):
+        backend = self.make_backend()
+
+        with pytest.raises(KeyError):
+            await backend.enqueue("missing")
+
+    @pytest.mark.asyncio
+    async def test_sends_verification_batch(self, fake_smtp):
+        from app.core.task_backend import task_backend
+        from app.tasks import send_email_batch_task
+
+        await task_backend.enqueue(send_email_batch_task.name, [
+            {"email": "a@example.com", "token": "a"},
+            {"email": "b@example.com", "token": "b"},
+        ])
+        await task_backend.drain()
+
+        assert len(fake_smtp.instances[0].sent) == 2
@@ -1,13 +1,11 @@
 import pytest
-from unittest.mock import patch
 
 
 class TestGetProfile:
 
     @pytest.mark.asyncio
     async def test_get_profile_authenticated(self, async_client, test_user_data):
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=test_user_data)
+        await async_client.post("/auth/register", json=test_user_data)
 
         login_response = await async_client.post(
             "/auth/login",
@@ -47,9 +45,8 @@ class TestUpdateProfile:
 
     @pytest.mark.asyncio
     async def test_update_username_already_taken(self, async_client, test_user_data, test_user_data_2):
-        with patch("app.services.auth_service.send_email_task"):
-            await async_client.post("/auth/register", json=test_user_data)
-            await async_client.post("/auth/register", json=test_user_data_2)
+        await async_client.post("/auth/register", json=test_user_data)
+        await async_client.post("/auth/register", json=test_user_data_2)
 
         login_response = await async_client.post(
             "/auth/login",